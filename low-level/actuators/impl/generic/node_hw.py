@@ -67,10 +67,11 @@ class NodeHWactuator(Actuator, Debug):
         try:
             if self.sensor_id_map:
                 fru_dict = self.sensor_id_map[fru.lower()]
-                for sensor_id in fru_dict.values():
-                    if sensor_id == '':
-                        continue
-                    sensor_common_info, sensor_specific_info = self._executor.get_sensor_props(sensor_id)
+                sensor_props = self._executor.get_sensor_props_many(
+                    [sensor_id for sensor_id in fru_dict.values()
+                     if sensor_id != ''])
+                for sensor_id, (sensor_common_info, sensor_specific_info) \
+                        in sensor_props.items():
                     self.fru_specific_info[sensor_id] = sensor_specific_info
                 if self.fru_specific_info is not None:
                     resource_info = self._parse_fru_info(fru)
@@ -76,8 +76,8 @@ class Debug(object):
         "debug_enabled" : false signifying that all threads should turn
         debug mode persistence off and reset to default startup"""
 
-        # Handle raw strings
-        if isinstance(jsonMsgRaw, dict) is False:
+        # Handle raw strings, dicts and InternalMsg are used as they are
+        if isinstance(jsonMsgRaw, (str, bytes)):
             jsonMsg = json.loads(jsonMsgRaw)
         else:
             jsonMsg = jsonMsgRaw
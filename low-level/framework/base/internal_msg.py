@@ -0,0 +1,83 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Immutable message passed through the internal message
+                    queues, serialized at most once
+ ****************************************************************************
+"""
+
+import json
+from collections.abc import Mapping
+
+
+class InternalMsg(Mapping):
+    """Read-only view of a validated message plus its cached JSON text.
+
+    Modules read it like the dict _check_debug used to return. Nested
+    values are handed out as they are and must not be modified either, the
+    same object may be queued to several modules or transmitted again.
+    Whoever needs to change the message takes a copy with to_dict().
+    """
+
+    __slots__ = ("_msg", "_json", "_body")
+
+    def __init__(self, msg, json_str=None):
+        self._msg = msg
+        self._json = json_str
+        # (keys left out, JSON text of the rest) for to_json(extra, omit)
+        self._body = None
+
+    def __getitem__(self, key):
+        return self._msg[key]
+
+    def __iter__(self):
+        return iter(self._msg)
+
+    def __len__(self):
+        return len(self._msg)
+
+    def __repr__(self):
+        return repr(self._msg)
+
+    def __str__(self):
+        return str(self._msg)
+
+    def to_dict(self):
+        """Returns a modifiable copy of the message"""
+        return json.loads(self.to_json())
+
+    def to_json(self, extra=None, omit=()):
+        """Returns the message as JSON text with the top level fields in
+        extra set and the ones in omit left out, like the egress signature.
+        The rest of the message is serialized only once however often it is
+        transmitted."""
+        if not extra and not omit:
+            if self._json is None:
+                self._json = json.dumps(self._msg)
+            return self._json
+
+        keys = frozenset(extra or ()) | frozenset(omit)
+        if self._body is None or self._body[0] != keys:
+            self._body = (keys, json.dumps(
+                {key: value for key, value in self._msg.items()
+                 if key not in keys}))
+        body = self._body[1]
+        if not extra:
+            return body
+        if body == "{}":
+            return json.dumps(extra)
+        return f"{body[:-1]}, {json.dumps(extra)[1:]}"
@@ -20,6 +20,10 @@
                     another.
  ****************************************************************************
 """
+import logging
+import queue
+import time
+
 from framework.utils.service_logging import logger
 
 class InternalMsgQ(object):
@@ -85,10 +89,110 @@ class InternalMsgQ(object):
         except Exception as e:
             logger.exception("_read_my_msgQ_noWait: %r" % e)
 
+    def _read_my_msgQ_batch(self, max_items, linger, wait=0):
+        """Drains up to max_items messages from this module's queue
+
+        Blocks up to wait seconds for the first message and then keeps
+        collecting for at most linger seconds. Returns a list of
+        (jsonMsg, event) tuples which is empty if nothing arrived."""
+        batch = []
+        q = self._msgQlist[self.name()]
+        deadline = None
+        while len(batch) < max_items:
+            try:
+                if deadline is None:
+                    if wait > 0:
+                        jsonMsg, event = q.get(timeout=wait)
+                    else:
+                        jsonMsg, event = q.get_nowait()
+                    deadline = time.time() + linger
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        jsonMsg, event = q.get_nowait()
+                    else:
+                        jsonMsg, event = q.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if jsonMsg is None:
+                continue
+
+            try:
+                # Check for debugging being activated in the message header
+                global_debug_off, jsonMsg = self._check_debug(jsonMsg)
+                if global_debug_off is True:
+                    self._debug_off_globally()
+            except Exception as e:
+                logger.exception("_read_my_msgQ_batch: %r" % e)
+                continue
+
+            if jsonMsg is not None:
+                batch.append((jsonMsg, event))
+
+        if batch:
+            self._log_debug("_read_my_msgQ_batch: %s, read %d msgs" %
+                            (self.name(), len(batch)))
+        return batch
+
+    def read_with_deadline(self, timeout):
+        """Blocks up to timeout seconds on this module's queue
+
+        Returns the (jsonMsg, event) read, or (None, None) if nothing
+        arrived in time. Wakes up as soon as a message is queued, unlike
+        polling _read_my_msgQ_noWait in a sleep loop."""
+        jsonMsg, event, _ = self.wait_msg_or_deadlines(
+            {None: time.time() + max(timeout, 0)})
+        return jsonMsg, event
+
+    def wait_msg_or_deadlines(self, deadlines):
+        """Blocks until a message is queued for this module or the earliest
+        of deadlines, absolute time.time() values by name, has passed
+
+        Returns (jsonMsg, event, due) where due lists the names of the
+        deadlines which have passed, the message is None if no message
+        woke us up. Lets a module serve requests right away while still
+        running its periodic work on time."""
+        q = self._msgQlist[self.name()]
+        while True:
+            now = time.time()
+            due = [name for name, deadline in deadlines.items()
+                   if deadline <= now]
+            try:
+                if due:
+                    jsonMsg, event = q.get_nowait()
+                else:
+                    jsonMsg, event = q.get(
+                        timeout=min(deadlines.values()) - now)
+            except queue.Empty:
+                if due:
+                    return None, None, due
+                continue
+
+            if jsonMsg is None:
+                continue
+
+            try:
+                # Check for debugging being activated in the message header
+                global_debug_off, jsonMsg = self._check_debug(jsonMsg)
+                if global_debug_off is True:
+                    self._debug_off_globally()
+            except Exception as e:
+                logger.exception("wait_msg_or_deadlines: %r" % e)
+                continue
+
+            if jsonMsg is not None:
+                return jsonMsg, event, due
+
     def _write_internal_msgQ(self, toModule, jsonMsg, event=None):
-        """writes a json message to an internal message queue"""
-        self._log_debug("_write_internal_msgQ: From %s, To %s, Msg:%s" %
-                       (self.name(), toModule, jsonMsg))
+        """writes a json message to an internal message queue
+
+        jsonMsg is a dict, an InternalMsg from BaseMsg.getMsg() or a JSON
+        string from BaseMsg.getJson()"""
+        # Formatting the message costs as much as serializing it
+        if logger.isEnabledFor(logging.DEBUG):
+            self._log_debug("_write_internal_msgQ: From %s, To %s, Msg:%s" %
+                           (self.name(), toModule, jsonMsg))
 
         q = self._msgQlist[toModule]
         q.put((jsonMsg, event))
@@ -98,6 +202,13 @@ class InternalMsgQ(object):
         with self._msgQlist[module_name].mutex:
            return list(self._msgQlist[module_name].queue)
 
+    def _get_msgQ_stats(self):
+        """Returns the depth and counters of every module's message queue
+        which keeps them, see ModuleQueue.get_stats"""
+        return {module_name: q.get_stats()
+                for module_name, q in self._msgQlist.items()
+                if hasattr(q, "get_stats")}
+
     def _debug_off_globally(self):
         """Turns debug mode off on all threads"""
         jsonMsg = {'sspl_ll_debug': {'debug_component':'all', 'debug_enabled' : False}}
@@ -0,0 +1,262 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Bounded queue used as a module's internal message
+                    queue, ACKs ahead of alerts served in arrival order
+ ****************************************************************************
+"""
+
+import json
+import queue
+import time
+from collections import deque
+from collections.abc import Mapping
+
+from framework.utils.conf_utils import MESSAGE_QUEUES, SSPL_CONF, Conf
+from framework.utils.service_logging import logger
+
+# Priority lanes, ACKs are served first and lower is kept longest on
+# overflow
+ACK = 0
+CRITICAL = 1
+NORMAL = 2
+INFORMATIONAL = 3
+LANES = ("ack", "critical", "normal", "informational")
+
+CRITICAL_SEVERITIES = ("critical", "error")
+
+
+def message_lane(jsonMsg):
+    """Returns the priority lane of a message queued between modules.
+
+    Actuator responses and ACKs rank first, then alerts with a critical
+    or error severity or of fault type, informational alerts come last.
+    """
+    if jsonMsg is None:
+        return ACK
+    if isinstance(jsonMsg, (str, bytes)):
+        try:
+            jsonMsg = json.loads(jsonMsg)
+        except ValueError:
+            return NORMAL
+    if not isinstance(jsonMsg, Mapping):
+        return NORMAL
+
+    message = jsonMsg.get("message")
+    if not isinstance(message, Mapping):
+        message = jsonMsg
+    if message.get("actuator_response_type") is not None:
+        return ACK
+    response = message.get("sensor_response_type")
+    if not isinstance(response, Mapping):
+        response = message
+    severity = response.get("severity")
+    if severity in CRITICAL_SEVERITIES or \
+            response.get("alert_type") == "fault":
+        return CRITICAL
+    if severity == "informational":
+        return INFORMATIONAL
+    return NORMAL
+
+
+class ModuleQueue(queue.Queue):
+    """queue.Queue of (jsonMsg, event) items with a capacity and priority
+    lanes.
+
+    ACKs and actuator responses are served first, they carry no alert
+    state. Every other item is served in the order it was queued, so state
+    changes for a resource reach the module in sequence whatever their
+    severity. Beyond that the lane of an item, see message_lane, decides
+    what is given up once capacity items are queued, the overflow policy
+    then applies:
+      drop  - the oldest item of the lowest priority lane is dropped, the
+              new item itself if it has the lowest priority
+      block - the writer waits up to block_timeout seconds for space, then
+              the new item is dropped
+      spill - like drop, but the item is handed to spill(jsonMsg) instead,
+              EgressProcessor adds it to the persistent store
+    The event of a dropped item is set so that no writer waits on it.
+    """
+
+    DROP = "drop"
+    BLOCK = "block"
+    SPILL = "spill"
+
+    def __init__(self, name, capacity=0, policy=DROP, block_timeout=5,
+                 spill=None):
+        super(ModuleQueue, self).__init__(maxsize=capacity)
+        self._name = name
+        self._policy = policy
+        self._block_timeout = block_timeout
+        self._spill = spill
+        if policy == self.SPILL and spill is None:
+            logger.warning(f"ModuleQueue, {name} cannot spill, dropping "
+                           f"messages on overflow instead")
+            self._policy = self.DROP
+        self._stats = {"enqueued": 0, "dequeued": 0, "dropped": 0,
+                       "spilled": 0}
+        self._rate_since = time.time()
+        self._rate_enqueued = 0
+
+    # queue.Queue storage hooks, called with the mutex held
+    def _init(self, maxsize):
+        # (queued at, lane, item) in arrival order, ACKs and the rest
+        self._acks = deque()
+        self._items = deque()
+        self._lane_depth = [0] * len(LANES)
+
+    def _items_of(self, lane):
+        return self._acks if lane == ACK else self._items
+
+    def _qsize(self):
+        return len(self._acks) + len(self._items)
+
+    def _put(self, item):
+        lane = message_lane(item[0])
+        self._items_of(lane).append((time.time(), lane, item))
+        self._lane_depth[lane] += 1
+        self._stats["enqueued"] += 1
+
+    def _get(self):
+        _, lane, item = (self._acks or self._items).popleft()
+        self._lane_depth[lane] -= 1
+        self._stats["dequeued"] += 1
+        return item
+
+    @property
+    def queue(self):
+        """Queued items in the order they will be served"""
+        return [item for items in (self._acks, self._items)
+                for _, _, item in items]
+
+    def put(self, item, block=True, timeout=None):
+        """Queue item, applying the overflow policy when full"""
+        victim = None
+        with self.not_full:
+            if 0 < self.maxsize <= self._qsize():
+                if self._policy == self.BLOCK and block:
+                    timeout = self._block_timeout if timeout is None \
+                        else min(timeout, self._block_timeout)
+                    end = time.time() + timeout
+                    while self._qsize() >= self.maxsize:
+                        remaining = end - time.time()
+                        if remaining <= 0:
+                            break
+                        self.not_full.wait(remaining)
+                if self._qsize() >= self.maxsize:
+                    victim = self._evict(message_lane(item[0]))
+                    if victim is None:
+                        victim, item = item, None
+            if item is not None:
+                self._put(item)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+
+        if victim is not None:
+            self._overflow(victim)
+
+    def _evict(self, lane):
+        """Removes and returns the oldest item of the lowest priority lane
+        not above lane, None if every queued item has a higher priority"""
+        for victim_lane in range(len(LANES) - 1, lane - 1, -1):
+            if not self._lane_depth[victim_lane]:
+                continue
+            items = self._items_of(victim_lane)
+            for index, (_, item_lane, item) in enumerate(items):
+                if item_lane == victim_lane:
+                    del items[index]
+                    self._lane_depth[victim_lane] -= 1
+                    return item
+        return None
+
+    def _overflow(self, item):
+        jsonMsg, event = item
+        if self._policy == self.SPILL:
+            try:
+                self._spill(jsonMsg)
+                with self.mutex:
+                    self._stats["spilled"] += 1
+                return
+            except Exception as err:
+                logger.error(f"ModuleQueue, {self._name}, spilling failed: {err}")
+        with self.mutex:
+            self._stats["dropped"] += 1
+            dropped = self._stats["dropped"]
+        if dropped == 1 or dropped % 1000 == 0:
+            logger.warning(f"ModuleQueue, {self._name} is full, "
+                           f"{dropped} messages dropped so far")
+        if event is not None:
+            event.set()
+
+    def get_stats(self):
+        """Returns the depth per lane, the age of the oldest item in seconds,
+        the enqueue rate since the previous call and the item counters"""
+        with self.mutex:
+            now = time.time()
+            stats = dict(self._stats)
+            stats["depth"] = self._qsize()
+            stats["capacity"] = self.maxsize
+            stats["lanes"] = dict(zip(LANES, self._lane_depth))
+            oldest = [items[0][0] for items in (self._acks, self._items)
+                      if items]
+            stats["oldest_age"] = now - min(oldest) if oldest else 0
+            elapsed = now - self._rate_since
+            stats["enqueue_rate"] = \
+                (stats["enqueued"] - self._rate_enqueued) / elapsed \
+                if elapsed > 0 else 0
+            self._rate_since = now
+            self._rate_enqueued = stats["enqueued"]
+        return stats
+
+
+class ModuleQueueFactory(object):
+    """Creates module queues from the MESSAGE_QUEUES section.
+
+    capacity, overflow_policy and block_timeout apply to every module,
+    MESSAGE_QUEUES>modules>ModuleName overrides them per module. A module
+    which spills provides a spill_msg(jsonMsg) method.
+    """
+
+    CAPACITY = 'capacity'
+    OVERFLOW_POLICY = 'overflow_policy'
+    BLOCK_TIMEOUT = 'block_timeout'
+    MODULES = 'modules'
+
+    @staticmethod
+    def _get(name, key, default):
+        value = Conf.get(SSPL_CONF,
+            f"{MESSAGE_QUEUES}>{ModuleQueueFactory.MODULES}>{name}>{key}",
+            None)
+        if value is None:
+            value = Conf.get(SSPL_CONF, f"{MESSAGE_QUEUES}>{key}", default)
+        return value
+
+    @staticmethod
+    def get_queue(name, module=None):
+        capacity = int(ModuleQueueFactory._get(
+            name, ModuleQueueFactory.CAPACITY, 0))
+        policy = ModuleQueueFactory._get(
+            name, ModuleQueueFactory.OVERFLOW_POLICY, ModuleQueue.DROP)
+        block_timeout = float(ModuleQueueFactory._get(
+            name, ModuleQueueFactory.BLOCK_TIMEOUT, 5))
+        if policy not in (ModuleQueue.DROP, ModuleQueue.BLOCK,
+                          ModuleQueue.SPILL):
+            logger.warning(f"ModuleQueueFactory, unknown overflow policy "
+                           f"{policy} for {name}, dropping instead")
+            policy = ModuleQueue.DROP
+        return ModuleQueue(name, capacity, policy, block_timeout,
+                           getattr(module, "spill_msg", None))
@@ -23,9 +23,8 @@
 import abc
 import json
 import threading
-import time
-from sched import scheduler
 from .debug import Debug
+from .shared_scheduler import SchedulerFactory
 from framework.utils.service_logging import logger
 
 class DependencyState(object):
@@ -68,10 +67,12 @@ class ScheduledModuleThread(ModuleThread, Debug):
     def __init__(self, module_name, priority):
         super(ScheduledModuleThread, self).__init__()
 
-        self._scheduler   = scheduler(time.time, time.sleep)
+        self._scheduler   = SchedulerFactory.get_scheduler(module_name,
+                                                           self._scheduler_error)
         self._module_name = module_name
         self._priority    = priority
         self._running     = False
+        self._error_handler = None
 
     def initialize(self, conf_reader):
         """Initialize the monitoring thread"""
@@ -81,8 +82,25 @@ class ScheduledModuleThread(ModuleThread, Debug):
         # Set the scheduler to fire the thread right away
         self._scheduler.enter(1, self._priority, self.run, ())
 
+    def set_error_handler(self, handler):
+        """Sets handler(err), called when an event fails on the shared
+        scheduler. Whoever starts the module passes the handling it applies
+        to an exception raised out of start_thread() on the module's own
+        thread."""
+        self._error_handler = handler
+
+    def _scheduler_error(self, err):
+        """An event failed on the shared scheduler, hand it to the error
+        handler or shut the module down when there is none"""
+        if self._error_handler is not None:
+            self._error_handler(err)
+        else:
+            logger.error(f"{self.name()} has encountered an error {err}, "
+                         f"error is unrecoverable , shutting down {self.name()}")
+            self.shutdown()
+
     def start(self):
-        """Run the scheduler"""
+        """Run the scheduler, returns right away on the shared scheduler"""
         self._running = True
         self._scheduler.run()
 
@@ -0,0 +1,247 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Scheduler engine shared by module threads. A single
+                    timer thread dispatches due events of every module to a
+                    bounded worker pool.
+ ****************************************************************************
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sched import scheduler
+
+from framework.utils.conf_utils import SCHEDULER, SSPL_CONF, Conf
+from framework.utils.service_logging import logger
+
+
+class ScheduledEvent(object):
+    """Event handed out by ModuleScheduler.enter, ordered like sched events
+    by time, then priority, then order of entry."""
+
+    __slots__ = ("time", "priority", "sequence", "action", "argument",
+                 "kwargs")
+
+    def __init__(self, time, priority, sequence, action, argument, kwargs):
+        self.time = time
+        self.priority = priority
+        self.sequence = sequence
+        self.action = action
+        self.argument = argument
+        self.kwargs = kwargs
+
+    def __lt__(self, other):
+        return (self.time, self.priority, self.sequence) < \
+            (other.time, other.priority, other.sequence)
+
+
+class SharedScheduler(object):
+    """Timer thread plus worker pool running the events of many modules.
+
+    Events of one module never run concurrently and run in (time,
+    priority) order, as they would on the module's own sched.scheduler.
+    """
+
+    def __init__(self, max_workers=8):
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="sspl-worker")
+        self._timer = threading.Thread(target=self._timer_loop,
+                                       name="sspl-scheduler", daemon=True)
+        self._timer_started = False
+        self._wakeups = 0
+        self._dispatched = 0
+
+    def schedule(self, module_scheduler, event):
+        with self._cond:
+            heapq.heappush(self._heap, (event.time, event.priority,
+                                        next(self._sequence),
+                                        module_scheduler, event))
+            if not self._timer_started:
+                self._timer_started = True
+                self._timer.start()
+            if self._heap[0][4] is event:
+                self._cond.notify()
+
+    def submit(self, func):
+        self._executor.submit(func)
+
+    def _timer_loop(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.time():
+                    timeout = self._heap[0][0] - time.time() \
+                        if self._heap else None
+                    self._cond.wait(timeout)
+                self._wakeups += 1
+                due = []
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap))
+            for _, _, _, module_scheduler, event in due:
+                self._dispatched += 1
+                module_scheduler._due(event)
+
+    def get_stats(self):
+        """Returns timer wake-ups, dispatched and pending event counts"""
+        with self._cond:
+            return {"wakeups": self._wakeups, "dispatched": self._dispatched,
+                    "pending": len(self._heap)}
+
+
+class ModuleScheduler(object):
+    """Drop-in replacement for sched.scheduler backed by SharedScheduler.
+
+    enter, enterabs, cancel, empty and queue behave as in sched. run()
+    does not block: it hands the module's events to the shared engine and
+    returns, so the module no longer holds a thread of its own. An
+    exception raised by an event is passed to on_error, where the module
+    applies the handling its launcher gives to an exception raised out of
+    sched.scheduler.run(). The module's other events keep being run until
+    that handling shuts it down.
+    """
+
+    def __init__(self, engine, name, on_error=None):
+        self._engine = engine
+        self._name = name
+        self._on_error = on_error
+        self._lock = threading.Lock()
+        self._events = set()
+        self._ready = []
+        self._started = False
+        self._busy = False
+        self._sequence = itertools.count()
+
+    def enterabs(self, time, priority, action, argument=(), kwargs=None):
+        event = ScheduledEvent(time, priority, next(self._sequence), action,
+                               argument, kwargs if kwargs is not None else {})
+        with self._lock:
+            self._events.add(event)
+            started = self._started
+        if started:
+            self._engine.schedule(self, event)
+        return event
+
+    def enter(self, delay, priority, action, argument=(), kwargs=None):
+        return self.enterabs(time.time() + delay, priority, action, argument,
+                             kwargs)
+
+    def cancel(self, event):
+        with self._lock:
+            # sched raises ValueError for unknown events, callers rely on it
+            self._events.remove(event)
+            if event in self._ready:
+                self._ready.remove(event)
+
+    def empty(self):
+        with self._lock:
+            return not self._events
+
+    @property
+    def queue(self):
+        with self._lock:
+            return sorted(self._events)
+
+    def run(self, blocking=True):
+        with self._lock:
+            self._started = True
+            events = list(self._events)
+        for event in events:
+            self._engine.schedule(self, event)
+
+    def _due(self, event):
+        with self._lock:
+            if event not in self._events:
+                # Cancelled while waiting in the engine
+                return
+            self._ready.append(event)
+            if self._busy:
+                return
+            self._busy = True
+        self._engine.submit(self._drain)
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._ready:
+                    self._busy = False
+                    return
+                event = min(self._ready)
+                self._ready.remove(event)
+                self._events.discard(event)
+            try:
+                event.action(*event.argument, **event.kwargs)
+            except Exception as err:
+                if self._on_error is None:
+                    logger.exception(f"{self._name} has encountered an error {err}")
+                else:
+                    try:
+                        self._on_error(err)
+                    except Exception as ex:
+                        logger.exception(ex)
+
+
+class SchedulerFactory(object):
+    """Returns the scheduler a module thread runs its events on.
+
+    With SCHEDULER>engine set to 'thread' every module gets its own
+    sched.scheduler, run on a thread of its own. With 'shared' modules get
+    a ModuleScheduler on one SharedScheduler, except the ones listed in
+    SCHEDULER>dedicated_modules whose events block for long, like message
+    bus consumers and GLib main loops.
+    """
+
+    ENGINE = 'engine'
+    WORKER_THREADS = 'worker_threads'
+    DEDICATED_MODULES = 'dedicated_modules'
+
+    THREAD = 'thread'
+    SHARED = 'shared'
+
+    # The main thread joins the ThreadController thread
+    ALWAYS_DEDICATED = ["ThreadController"]
+
+    __engine = None
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get_scheduler(module_name, on_error=None):
+        engine = Conf.get(SSPL_CONF,
+                          f"{SCHEDULER}>{SchedulerFactory.ENGINE}",
+                          SchedulerFactory.THREAD)
+        dedicated = Conf.get(SSPL_CONF,
+                             f"{SCHEDULER}>{SchedulerFactory.DEDICATED_MODULES}",
+                             []) or []
+        if engine != SchedulerFactory.SHARED or module_name in dedicated or \
+                module_name in SchedulerFactory.ALWAYS_DEDICATED:
+            return scheduler(time.time, time.sleep)
+        with SchedulerFactory.__lock:
+            if SchedulerFactory.__engine is None:
+                workers = int(Conf.get(SSPL_CONF,
+                    f"{SCHEDULER}>{SchedulerFactory.WORKER_THREADS}", 8))
+                SchedulerFactory.__engine = SharedScheduler(workers)
+        return ModuleScheduler(SchedulerFactory.__engine, module_name, on_error)
+
+    @staticmethod
+    def get_engine():
+        """Returns the shared engine, None unless a module is using it"""
+        return SchedulerFactory.__engine
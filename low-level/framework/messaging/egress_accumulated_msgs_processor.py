@@ -26,9 +26,9 @@ from cortx.utils.message_bus.error import MessageBusError
 
 from framework.base.internal_msgQ import InternalMsgQ
 from framework.base.module_thread import ScheduledModuleThread
-from framework.utils.conf_utils import SSPL_CONF, Conf
+from framework.utils.conf_utils import EGRESSPROCESSOR, SSPL_CONF, Conf
 from framework.utils.service_logging import logger
-from framework.utils.store_queue import StoreQueue
+from framework.utils.store_queue import StoreQueueFactory
 from . import producer_initialized
 
 
@@ -51,6 +51,9 @@ class EgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ):
     METHOD = 'method'
     # 300 seconds for 5 mins
     MSG_TIMEOUT = 300
+    ACCUMULATED_BATCH_SIZE = 'accumulated_batch_size'
+    # Runs a message may be rejected by the bus before it is dropped
+    MAX_SEND_ATTEMPTS = 3
 
     @staticmethod
     def name():
@@ -60,6 +63,8 @@ class EgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ):
     def __init__(self):
         super(EgressAccumulatedMsgsProcessor, self).__init__(
             self.SENSOR_NAME, self.PRIORITY)
+        # hash of a message rejected by the bus to the runs it failed in
+        self._send_failures = {}
 
     def initialize(self, conf_reader, msgQlist, products):
         """initialize configuration reader and internal msg queues"""
@@ -71,7 +76,7 @@ class EgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ):
         super(EgressAccumulatedMsgsProcessor, self).initialize_msgQ(
             msgQlist)
 
-        self.store_queue = StoreQueue()
+        self.store_queue = StoreQueueFactory.get_queue()
         self._read_config()
         producer_initialized.wait()
         self._producer = MessageProducer(producer_id="acuumulated processor",
@@ -109,20 +114,7 @@ class EgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ):
             # error out in case of failure (EOS-17626)
             if not self.store_queue.is_empty():
                 logger.debug("Found accumulated messages, trying to send again")
-                while not self.store_queue.is_empty():
-                    message = self.store_queue.get()
-                    if isinstance(message, bytes):
-                        message = message.decode()
-                    dict_msg = json.loads(message)
-                    if "actuator_response_type" in dict_msg["message"]:
-                        event_time = dict_msg["message"] \
-                            ["actuator_response_type"]["info"]["event_time"]
-                        time_diff = int(time.time()) - int(event_time)
-                        if time_diff > self.MSG_TIMEOUT:
-                            continue
-                    if "sensor_response_type" in dict_msg["message"]:
-                        logger.info(f"Publishing Accumulated Alert: {message}")
-                    self._producer.send([message])
+                self._drain_store_queue()
         except MessageBusError as e:
             logger.error("EgressAccumulatedMsgsProcessor, run, %r" % e)
         except Exception as e:
@@ -131,8 +123,110 @@ class EgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ):
             logger.debug("Consul accumulated processing ended")
             self._scheduler.enter(30, self._priority, self.run, ())
 
+    def _drain_store_queue(self):
+        """Send accumulated messages in batches.
+
+        The head of the store queue is only moved once the producer has
+        accepted a batch. Records that cannot be read are logged and dropped
+        with the batch. A batch the bus refuses is sent message by message,
+        see _send_one_by_one.
+        """
+        sent = 0
+        # Messages queued again in this run, they wait for the next one
+        requeued = set()
+        done = False
+        while not done:
+            batch = self.store_queue.get_batch(self._batch_size)
+            if not batch:
+                break
+            messages = []
+            last_index = None
+            for index, message in batch:
+                if message is None:
+                    logger.warning(f"Accumulated message {index} is missing, skipping")
+                    last_index = index
+                    continue
+                try:
+                    if isinstance(message, bytes):
+                        message = message.decode()
+                    if hash(message) in requeued:
+                        done = True
+                        break
+                    last_index = index
+                    if self._is_stale_response(message):
+                        continue
+                except Exception as e:
+                    logger.error(f"Dropping unreadable accumulated message {index}: {e!r}")
+                    last_index = index
+                    continue
+                messages.append(message)
+            if messages:
+                try:
+                    self._producer.send(messages)
+                except Exception as e:
+                    logger.warning(f"Sending {len(messages)} accumulated "
+                                   f"messages failed, sending one by one: {e!r}")
+                    messages = self._send_one_by_one(messages, requeued)
+                    if messages is None:
+                        break
+                for message in messages:
+                    logger.debug(f"Publishing Accumulated Alert: {message}")
+            if last_index is not None:
+                self.store_queue.commit(last_index)
+            sent += len(messages)
+        if sent:
+            logger.info(f"Published {sent} accumulated messages")
+
+    def _send_one_by_one(self, messages, requeued):
+        """Sends messages one at a time, returns the ones sent.
+
+        If none is accepted the bus is taken to be down and None is
+        returned, the batch stays queued. Otherwise the rejected messages
+        are queued again at the tail, so they no longer hold up the queue,
+        and added to requeued. They are dropped once they failed in
+        MAX_SEND_ATTEMPTS runs.
+        """
+        sent, rejected = [], []
+        for message in messages:
+            try:
+                self._producer.send([message])
+                sent.append(message)
+            except Exception as e:
+                rejected.append((message, e))
+        if not sent:
+            return None
+        for message, e in rejected:
+            key = hash(message)
+            attempts = self._send_failures.pop(key, 0) + 1
+            if attempts >= self.MAX_SEND_ATTEMPTS:
+                logger.error(f"Dropping accumulated message rejected "
+                             f"{attempts} times: {e!r}, {message}")
+                continue
+            self._send_failures[key] = attempts
+            self.store_queue.put(message)
+            requeued.add(key)
+        for message in sent:
+            self._send_failures.pop(hash(message), None)
+        return sent
+
+    def _is_stale_response(self, message):
+        """Returns True for actuator responses older than MSG_TIMEOUT.
+
+        Only messages mentioning actuator_response_type are decoded, sensor
+        alerts are passed through untouched."""
+        if '"actuator_response_type"' not in message:
+            return False
+        dict_msg = json.loads(message)
+        if "actuator_response_type" not in dict_msg["message"]:
+            return False
+        event_time = dict_msg["message"] \
+            ["actuator_response_type"]["info"]["event_time"]
+        time_diff = int(time.time()) - int(event_time)
+        return time_diff > self.MSG_TIMEOUT
+
     def _read_config(self):
         """Read config for messaging bus."""
+        self._batch_size = 500
         try:
             self._signature_user = Conf.get(SSPL_CONF,
                                             f"{self.PROCESSOR}>{self.SIGNATURE_USERNAME}",
@@ -152,6 +246,9 @@ class EgressAccumulatedMsgsProcessor(ScheduledModuleThread, InternalMsgQ):
             self._method = Conf.get(SSPL_CONF,
                                     f"{self.PROCESSOR}>{self.METHOD}",
                                     "sync")
+            self._batch_size = max(int(Conf.get(SSPL_CONF,
+                                    f"{EGRESSPROCESSOR}>{self.ACCUMULATED_BATCH_SIZE}",
+                                    500)), 1)
         except Exception as ex:
             logger.error("EgressProcessor, _read_config: %r" % ex)
 
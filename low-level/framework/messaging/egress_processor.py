@@ -19,28 +19,23 @@
  ****************************************************************************
 """
 
-import ctypes
 import json
+import logging
+import threading
 import time
 
 from cortx.utils.message_bus import MessageProducer
 from cortx.utils.message_bus.error import MessageBusError
 
+from framework.base.internal_msg import InternalMsg
 from framework.base.internal_msgQ import InternalMsgQ
 from framework.base.module_thread import ScheduledModuleThread
 from framework.utils.conf_utils import SSPL_CONF, Conf
 from framework.utils.service_logging import logger
-from framework.utils.store_queue import StoreQueue
+from framework.utils.store_queue import StoreQueueFactory
+from .message_signing import MessageSigner
 from . import producer_initialized
 
-try:
-    use_security_lib = True
-    SSPL_SEC = ctypes.cdll.LoadLibrary('libsspl_sec.so.0')
-except Exception as ae:
-    logger.info(
-        "EgressProcessor, libsspl_sec not found, disabling authentication on egress msgs")
-    use_security_lib = False
-
 
 class EgressProcessor(ScheduledModuleThread, InternalMsgQ):
     """Handles outgoing messages via messaging bus over localhost."""
@@ -57,6 +52,12 @@ class EgressProcessor(ScheduledModuleThread, InternalMsgQ):
     PRODUCER_ID = 'producer_id'
     MESSAGE_TYPE = 'message_type'
     METHOD = 'method'
+    BATCH_SIZE = 'batch_size'
+    BATCH_LINGER_MS = 'batch_linger_ms'
+    THROUGHPUT_LOG_INTERVAL = 'throughput_log_interval'
+
+    # Seconds to block on an empty queue before the scheduler runs us again
+    IDLE_WAIT = 1
 
     @staticmethod
     def name():
@@ -75,15 +76,21 @@ class EgressProcessor(ScheduledModuleThread, InternalMsgQ):
         # Initialize internal message queues for this module
         super(EgressProcessor, self).initialize_msgQ(msgQlist)
 
-        self.store_queue = StoreQueue()
+        self.store_queue = StoreQueueFactory.get_queue()
+        # Messages spilled by a full module queue are stored by the writer
+        self._store_lock = threading.Lock()
         # Flag denoting that a shutdown message has been placed
         #  into our message queue from the main sspl_ll_d handler
         self._request_shutdown = False
 
         self._read_config()
+        self._signer = MessageSigner(self._signature_user,
+                                     self._signature_token,
+                                     self._signature_expires)
         self._producer = MessageProducer(producer_id=self._producer_id,
                                          message_type=self._message_type,
                                          method=self._method)
+        self._reset_throughput()
         producer_initialized.set()
 
     def run(self):
@@ -94,17 +101,20 @@ class EgressProcessor(ScheduledModuleThread, InternalMsgQ):
         # self._set_debug_persist(True)
 
         try:
-            # Loop thru all messages in queue until and transmit
-            while not self._is_my_msgQ_empty():
-                self._jsonMsg, self._event = self._read_my_msgQ()
-
-                if self._jsonMsg is not None:
-                    self._transmit_msg_on_exchange()
+            # Wait for the first message, then drain the queue in batches
+            batch = self._read_my_msgQ_batch(self._batch_size,
+                                             self._batch_linger,
+                                             self.IDLE_WAIT)
+            while batch:
+                self._transmit_batch(batch)
+                batch = self._read_my_msgQ_batch(self._batch_size,
+                                                 self._batch_linger)
 
         except Exception:
             # Log it and restart the whole process when a failure occurs
             logger.error("EgressProcessor restarting")
 
+        self._log_throughput()
         self._log_debug("Finished processing successfully")
 
         # Shutdown is requested by the sspl_ll_d shutdown handler
@@ -113,10 +123,13 @@ class EgressProcessor(ScheduledModuleThread, InternalMsgQ):
         if self._request_shutdown is True:
             self.shutdown()
         else:
-            self._scheduler.enter(1, self._priority, self.run, ())
+            self._scheduler.enter(0, self._priority, self.run, ())
 
     def _read_config(self):
         """Read the messaging bus configs."""
+        self._batch_size = 1
+        self._batch_linger = 0
+        self._throughput_log_interval = 60
         try:
             self._signature_user = Conf.get(SSPL_CONF,
                                             f"{self.PROCESSOR}>{self.SIGNATURE_USERNAME}",
@@ -136,106 +149,221 @@ class EgressProcessor(ScheduledModuleThread, InternalMsgQ):
             self._method = Conf.get(SSPL_CONF,
                                     f"{self.PROCESSOR}>{self.METHOD}",
                                     "sync")
+            self._batch_size = max(int(Conf.get(SSPL_CONF,
+                                    f"{self.PROCESSOR}>{self.BATCH_SIZE}",
+                                    100)), 1)
+            self._batch_linger = max(int(Conf.get(SSPL_CONF,
+                                    f"{self.PROCESSOR}>{self.BATCH_LINGER_MS}",
+                                    50)), 0) / 1000
+            self._throughput_log_interval = int(Conf.get(SSPL_CONF,
+                                    f"{self.PROCESSOR}>{self.THROUGHPUT_LOG_INTERVAL}",
+                                    60))
 
         except Exception as ex:
             logger.error("EgressProcessor, _read_config: %r" % ex)
 
-    def _add_signature(self):
-        """Adds the authentication signature to the message"""
-        self._log_debug("_add_signature, jsonMsg: %s" % self._jsonMsg)
-        self._jsonMsg["username"] = self._signature_user
-        self._jsonMsg["expires"] = int(self._signature_expires)
-        self._jsonMsg["time"] = str(int(time.time()))
-
-        if use_security_lib:
-            authn_token_len = len(self._signature_token) + 1
-            session_length = int(self._signature_expires)
-            token = ctypes.create_string_buffer(
-                SSPL_SEC.sspl_get_token_length())
-
-            SSPL_SEC.sspl_generate_session_token(
-                self._signature_user, authn_token_len,
-                self._signature_token, session_length, token)
-
-            # Generate the signature
-            msg_len = len(self._jsonMsg) + 1
-            sig = ctypes.create_string_buffer(SSPL_SEC.sspl_get_sig_length())
-            SSPL_SEC.sspl_sign_message(msg_len, str(self._jsonMsg),
-                                       self._signature_user,
-                                       token, sig)
-
-            self._jsonMsg["signature"] = str(sig.raw, encoding='utf-8')
-        else:
-            self._jsonMsg["signature"] = "SecurityLibNotInstalled"
-
-    def _transmit_msg_on_exchange(self):
-        """Transmit json message onto messaging bus."""
-        self._log_debug(
-            "_transmit_msg_on_exchange, jsonMsg: %s" % self._jsonMsg)
+    def _serialize_batch(self, batch):
+        """Returns the signed JSON text of every message in the batch, None
+        for messages which could not be serialized.
+
+        The signature covers the message text with the username, expires
+        and time fields set and without the signature field, the batch is
+        signed with one call to the signer."""
+        fields = {
+            "username": self._signature_user,
+            "expires": int(self._signature_expires),
+            "time": str(int(time.time()))
+        }
+        texts = []
+        for jsonMsg, _ in batch:
+            try:
+                if not isinstance(jsonMsg, InternalMsg):
+                    jsonMsg = InternalMsg(jsonMsg)
+                texts.append(jsonMsg.to_json(fields, omit=("signature",)))
+            except Exception as ex:
+                logger.error(
+                    f'EgressProcessor, _serialize_batch, problem serializing the message:{ex}, dropping message: {jsonMsg}')
+                texts.append(None)
+
+        signatures = iter(self._signer.sign_many(
+            [text for text in texts if text is not None]))
+        return [None if text is None else
+                f'{text[:-1]}, "signature": {json.dumps(next(signatures))}}}'
+                for text in texts]
+
+    def _serialize(self, jsonMsg):
+        """Returns the signed JSON text of a single message"""
+        return self._serialize_batch([(jsonMsg, None)])[0]
+
+    def _is_shutdown_msg(self, jsonMsg):
+        """Returns True for the global shutdown message from sspl_ll_d"""
+        actuator_response = jsonMsg.get("message").get("actuator_response_type")
+        return actuator_response is not None and \
+            actuator_response.get("thread_controller") is not None and \
+            actuator_response.get("thread_controller").get(
+                "thread_response") == "SSPL-LL is shutting down"
+
+    def _is_ack_msg(self, jsonMsg):
+        """Returns True for messages routed straight to the ACK channel"""
+        # NOTE: We need to route ThreadController messages to ACK channel.
+        # We can't modify schema as it will affect other modules too. As a
+        # temporary solution we have added a extra check to see if actuator_response_type
+        # is "thread_controller".
+        # TODO: Find a proper way to solve this issue. Avoid changing
+        # core egress processor code
+        actuator_response = jsonMsg.get("message").get("actuator_response_type")
+        return actuator_response is not None and \
+            (actuator_response.get("ack") is not None or
+             actuator_response.get("thread_controller") is not None)
+
+    def _transmit_batch(self, batch):
+        """Sign a batch of messages and publish them with a single send.
+
+        ACK and thread controller responses are sent one by one as before.
+        Alerts are published together; if the accumulated msg queue is not
+        empty or publishing fails they are added to the persistent store."""
+        alerts = []
+        events = []
+        for (jsonMsg, event), msgString in zip(batch,
+                                               self._serialize_batch(batch)):
+            if logger.isEnabledFor(logging.DEBUG):
+                self._log_debug(
+                    "_transmit_batch, jsonMsg: %s" % jsonMsg)
+            try:
+                # Check for shut down message from sspl_ll_d and set a flag to shutdown
+                #  once our message queue is empty
+                if self._is_shutdown_msg(jsonMsg):
+                    logger.info(
+                        "EgressProcessor, _transmit_batch, received"
+                        "global shutdown message from sspl_ll_d")
+                    self._request_shutdown = True
+
+                if msgString is not None and self._is_ack_msg(jsonMsg):
+                    self._producer.send([msgString])
+                    logger.debug(
+                        "_transmit_batch, Successfully Sent: %s", msgString)
+                elif msgString is not None:
+                    alerts.append(msgString)
+            except Exception as ex:
+                logger.error(
+                    f'EgressProcessor, _transmit_batch, problem while publishing the message:{ex}, dropping message: {jsonMsg}')
+
+            # If event is added by sensors, set it once the batch is handled
+            if event:
+                events.append(event)
+
+        if alerts:
+            self._publish_alerts(alerts)
+
+        for event in events:
+            event.set()
+
+    def _publish_alerts(self, alerts):
+        """Publish alerts in one send, spilling to the store queue on failure"""
+        try:
+            if not self.store_queue.is_empty():
+                logger.info("'Accumulated msg queue' is not Empty." +
+                            " Adding %d msgs to the end of the queue" % len(alerts))
+                self._store_alerts(alerts)
+                return
+        except Exception as err:
+            logger.error(
+                f'EgressProcessor, _publish_alerts, error {err} reading persistent store')
 
+        start = time.time()
         try:
-            # Check for shut down message from sspl_ll_d and set a flag to shutdown
-            #  once our message queue is empty
-            if self._jsonMsg.get("message").get(
-                    "actuator_response_type") is not None and \
-                    self._jsonMsg.get("message").get(
-                        "actuator_response_type").get(
-                        "thread_controller") is not None and \
-                    self._jsonMsg.get("message").get(
-                        "actuator_response_type").get("thread_controller").get(
-                        "thread_response") == \
-                    "SSPL-LL is shutting down":
-                logger.info(
-                    "EgressProcessor, _transmit_msg_on_exchange, received"
-                    "global shutdown message from sspl_ll_d")
-                self._request_shutdown = True
-
-            # Publish json message to the correct channel
-            # NOTE: We need to route ThreadController messages to ACK channel.
-            # We can't modify schema as it will affect other modules too. As a
-            # temporary solution we have added a extra check to see if actuator_response_type
-            # is "thread_controller".
-            # TODO: Find a proper way to solve this issue. Avoid changing
-            # core egress processor code
-            if self._jsonMsg.get("message").get(
-                    "actuator_response_type") is not None and \
-                    (self._jsonMsg.get("message").get(
-                        "actuator_response_type").get("ack") is not None or
-                     self._jsonMsg.get("message").get(
-                         "actuator_response_type").get(
-                         "thread_controller") is not None):
-                self._add_signature()
-                self._producer.send([json.dumps(self._jsonMsg)])
-                logger.debug(
-                    "_transmit_msg_on_exchange, Successfully Sent: %s" % self._jsonMsg)
-            else:
-                self._add_signature()
-                jsonMsg = json.dumps(self._jsonMsg)
+            self._producer.send(alerts)
+            self._account_throughput(len(alerts), time.time() - start)
+            for jsonMsg in alerts:
+                logger.info(f"Published Alert: {jsonMsg}")
+            return
+        except MessageBusError as e:
+            logger.error(
+                f"EgressProcessor, _publish_alerts, error {e} in producing "
+                f"batch of {len(alerts)} messages, retrying one by one")
+        except Exception as err:
+            logger.error(
+                f'EgressProcessor, _publish_alerts, Unknown error {err} while '
+                f'publishing batch of {len(alerts)} messages, retrying one by one')
+
+        # Fall back to per message publishing so that only the failing
+        #  messages, and everything after them, go to the persistent store
+        for index, jsonMsg in enumerate(alerts):
+            try:
+                self._producer.send([jsonMsg])
+                self._account_throughput(1, 0)
+                logger.info(f"Published Alert: {jsonMsg}")
+            except Exception as err:
+                logger.error(
+                    f"EgressProcessor, _publish_alerts, error {err} in producing message,\
+                                    adding message to consul {jsonMsg}")
+                self._store_alerts(alerts[index:])
+                break
+
+    def _store_alerts(self, alerts):
+        """Add messages to the persistent store queue one by one"""
+        with self._store_lock:
+            for jsonMsg in alerts:
                 try:
-                    if self.store_queue.is_empty():
-                        self._producer.send([jsonMsg])
-                        logger.info(f"Published Alert: {jsonMsg}")
-                    else:
-                        logger.info("'Accumulated msg queue' is not Empty." +
-                                    " Adding the msg to the end of the queue")
-                        self.store_queue.put(jsonMsg)
-                except MessageBusError as e:
-                    logger.error(
-                        f"EgressProcessor, _transmit_msg_on_exchange, error {e} in producing message,\
-                                    adding message to consul {self._jsonMsg}")
                     self.store_queue.put(jsonMsg)
                 except Exception as err:
                     logger.error(
-                        f'EgressProcessor, _transmit_msg_on_exchange, Unknown error {err} while publishing the message, adding to persistent store {self._jsonMsg}')
-                    self.store_queue.put(jsonMsg)
-
-            # If event is added by sensors, set it
-            if self._event:
-                self._event.set()
-
-        except Exception as ex:
-            logger.error(
-                f'EgressProcessor, _transmit_msg_on_exchange, problem while publishing the message:{ex}, adding message to consul: {self._jsonMsg}')
+                        f'EgressProcessor, _store_alerts, error {err} while adding '
+                        f'message to persistent store, dropping {jsonMsg}')
+
+    def spill_msg(self, jsonMsg):
+        """Add a message our full module queue could not take to the
+        persistent store, EgressAccumulatedMsgsProcessor sends it later.
+        Runs on the thread of the module writing to the queue."""
+        if isinstance(jsonMsg, (str, bytes)):
+            jsonMsg = json.loads(jsonMsg)
+        msgString = self._serialize(jsonMsg)
+        if msgString is None:
+            raise ValueError("message could not be serialized")
+        self._store_alerts([msgString])
+
+    def _reset_throughput(self):
+        """Reset the publishing counters"""
+        self._throughput = {
+            "batch_size": self._batch_size,
+            "batch_linger_ms": int(self._batch_linger * 1000),
+            "messages": 0,
+            "batches": 0,
+            "send_time": 0.0,
+            "since": time.time()
+        }
+
+    def _account_throughput(self, messages, send_time):
+        """Record a successful publish of messages"""
+        self._throughput["messages"] += messages
+        self._throughput["batches"] += 1
+        self._throughput["send_time"] += send_time
+
+    def get_throughput(self):
+        """Returns publishing statistics since the last report, along with
+        the signing statistics since startup"""
+        stats = dict(self._throughput)
+        stats.update(self._signer.get_stats())
+        elapsed = time.time() - stats["since"]
+        stats["msgs_per_sec"] = stats["messages"] / elapsed if elapsed > 0 else 0
+        stats["avg_batch"] = stats["messages"] / stats["batches"] \
+            if stats["batches"] else 0
+        return stats
+
+    def _log_throughput(self):
+        """Log and reset the publishing statistics every interval"""
+        if self._throughput_log_interval <= 0 or \
+                time.time() - self._throughput["since"] < self._throughput_log_interval:
+            return
+        stats = self.get_throughput()
+        if stats["messages"]:
+            logger.info("EgressProcessor, published %d msgs in %d batches, "
+                        "%.1f msgs/sec, avg batch %.1f, send time %.3fs, "
+                        "signing %.1f us/msg" %
+                        (stats["messages"], stats["batches"],
+                         stats["msgs_per_sec"], stats["avg_batch"],
+                         stats["send_time"], stats["sign_us_per_msg"]))
+        self._reset_throughput()
 
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
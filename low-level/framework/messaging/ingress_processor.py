@@ -19,7 +19,6 @@
  ****************************************************************************
 """
 
-import ctypes
 import json
 import os
 import time
@@ -35,16 +34,9 @@ from framework.messaging.egress_processor import \
 from framework.utils.conf_utils import CLUSTER, SRVNODE, SSPL_CONF, Conf
 from framework.utils.service_logging import logger
 from json_msgs.messages.actuators.ack_response import AckResponseMsg
+from .message_signing import SignatureVerifier
 from . import producer_initialized
 
-try:
-    use_security_lib = True
-    SSPL_SEC = ctypes.cdll.LoadLibrary('libsspl_sec.so.0')
-except Exception as ae:
-    logger.info(
-        "libsspl_sec not found, disabling authentication on ingress msgs")
-    use_security_lib = False
-
 
 class IngressProcessor(ScheduledModuleThread, InternalMsgQ):
     """Handles incoming messages via message bus."""
@@ -52,12 +44,17 @@ class IngressProcessor(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "IngressProcessor"
     PRIORITY = 1
 
+    # Seconds receive() blocks waiting for a message
+    RECEIVE_TIMEOUT = 1
+
     # Section and keys in configuration file
     PROCESSOR = MODULE_NAME.upper()
     CONSUMER_ID = "consumer_id"
     CONSUMER_GROUP = "consumer_group"
     MESSAGE_TYPE = "message_type"
     OFFSET = "offset"
+    VERIFY_CACHE_SIZE = "verify_cache_size"
+    VERIFY_CACHE_TTL = "verify_cache_ttl"
     SYSTEM_INFORMATION_KEY = 'SYSTEM_INFORMATION'
     CLUSTER_ID_KEY = 'cluster_id'
     NODE_ID_KEY = 'node_id'
@@ -107,6 +104,8 @@ class IngressProcessor(ScheduledModuleThread, InternalMsgQ):
         super(IngressProcessor, self).initialize_msgQ(msgQlist)
 
         self._read_config()
+        self._verifier = SignatureVerifier(self._verify_cache_size,
+                                           self._verify_cache_ttl)
         producer_initialized.wait()
         self._consumer = MessageConsumer(consumer_id=self._consumer_id,
                                          consumer_group=self._consumer_group,
@@ -123,14 +122,19 @@ class IngressProcessor(ScheduledModuleThread, InternalMsgQ):
 
         try:
             while True:
-                message = self._consumer.receive()
+                start = time.time()
+                message = self._consumer.receive(timeout=self.RECEIVE_TIMEOUT)
                 if message:
                     logger.info(
                         f"IngressProcessor, Message Recieved: {message}")
                     self._process_msg(message)
                     self._consumer.ack()
                 else:
-                    time.sleep(1)
+                    # receive() waits for a message itself, only sleep if
+                    #  it returned early, to not spin on a failing bus
+                    idle = self.RECEIVE_TIMEOUT - (time.time() - start)
+                    if idle > 0:
+                        time.sleep(idle)
         except Exception as e:
             if self.is_running() is True:
                 logger.info(
@@ -164,9 +168,8 @@ class IngressProcessor(ScheduledModuleThread, InternalMsgQ):
             if uuid is None:
                 uuid = "N/A"
 
-            if use_security_lib and \
-                    SSPL_SEC.sspl_verify_message(msg_len, str(message),
-                                                 username, signature) != 0:
+            if not self._verifier.verify(msg_len, str(message),
+                                         username, signature):
                 logger.warn(
                     "IngressProcessor, Authentication failed on message: %s" % ingressMsg)
                 return
@@ -252,6 +255,12 @@ class IngressProcessor(ScheduledModuleThread, InternalMsgQ):
         self._offset = Conf.get(SSPL_CONF,
                                 f"{self.PROCESSOR}>{self.OFFSET}",
                                 'earliest')
+        self._verify_cache_size = int(Conf.get(SSPL_CONF,
+                                f"{self.PROCESSOR}>{self.VERIFY_CACHE_SIZE}",
+                                1024))
+        self._verify_cache_ttl = int(Conf.get(SSPL_CONF,
+                                f"{self.PROCESSOR}>{self.VERIFY_CACHE_TTL}",
+                                60))
 
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
@@ -57,6 +57,9 @@ class LoggingProcessor(ScheduledModuleThread, InternalMsgQ):
     MODULE_NAME = "LoggingProcessor"
     PRIORITY = 2
 
+    # Seconds receive() blocks waiting for a message
+    RECEIVE_TIMEOUT = 1
+
     # Section and keys in configuration file
     PROCESSOR = MODULE_NAME.upper()
     EXCHANGE_NAME = 'exchange_name'
@@ -104,13 +107,18 @@ class LoggingProcessor(ScheduledModuleThread, InternalMsgQ):
         self._log_debug("Start accepting requests")
         try:
             while True:
-                message = self._consumer.receive()
+                start = time.time()
+                message = self._consumer.receive(timeout=self.RECEIVE_TIMEOUT)
                 if message:
                     logger.info(f"LoggingProcessor, Message Recieved: {message}")
                     self._process_msg(message)
                     self._consumer.ack()
                 else:
-                    time.sleep(1)
+                    # receive() waits for a message itself, only sleep if
+                    #  it returned early, to not spin on a failing bus
+                    idle = self.RECEIVE_TIMEOUT - (time.time() - start)
+                    if idle > 0:
+                        time.sleep(idle)
         except Exception as ae:
             if self.is_running() is True:
                 logger.info(
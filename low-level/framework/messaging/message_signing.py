@@ -0,0 +1,166 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Signing of egress messages and verification of ingress
+                    messages with libsspl_sec
+ ****************************************************************************
+"""
+
+import ctypes
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from framework.utils.service_logging import logger
+
+try:
+    use_security_lib = True
+    SSPL_SEC = ctypes.cdll.LoadLibrary('libsspl_sec.so.0')
+except Exception:
+    logger.info(
+        "MessageSigner, libsspl_sec not found, disabling authentication of msgs")
+    use_security_lib = False
+
+
+class MessageSigner(object):
+    """Signs messages on behalf of one user.
+
+    The session token only depends on the user, the authentication token
+    and the session length. It is generated once and renewed shortly
+    before the session runs out instead of for every message. The token
+    and signature buffers are allocated once and reused.
+    """
+
+    SECURITY_LIB_NOT_INSTALLED = "SecurityLibNotInstalled"
+
+    # Seconds before the session expires the token is renewed, at most
+    #  half of the session length
+    RENEW_MARGIN = 60
+
+    def __init__(self, username, authn_token, session_length):
+        self._username = str(username).encode("utf-8")
+        self._authn_token = str(authn_token).encode("utf-8")
+        self._session_length = int(session_length)
+        self._renew_at = 0
+        self._lock = threading.Lock()
+        if use_security_lib:
+            self._token = ctypes.create_string_buffer(
+                SSPL_SEC.sspl_get_token_length())
+            self._sig = ctypes.create_string_buffer(
+                SSPL_SEC.sspl_get_sig_length())
+        self._stats = {"signed": 0, "sign_time": 0.0, "token_renewals": 0}
+
+    def _session_token(self):
+        """Returns the session token, generating it when due"""
+        now = time.time()
+        if now >= self._renew_at:
+            SSPL_SEC.sspl_generate_session_token(
+                self._username, len(self._authn_token) + 1,
+                self._authn_token, self._session_length, self._token)
+            self._renew_at = now + self._session_length - \
+                min(self.RENEW_MARGIN, self._session_length / 2)
+            self._stats["token_renewals"] += 1
+        return self._token
+
+    def sign(self, msg):
+        """Returns the signature of the msg string"""
+        return self.sign_many([msg])[0]
+
+    def sign_many(self, msgs):
+        """Returns the signatures of a list of msg strings"""
+        start = time.perf_counter()
+        with self._lock:
+            if not use_security_lib:
+                signatures = [self.SECURITY_LIB_NOT_INSTALLED] * len(msgs)
+            else:
+                token = self._session_token()
+                signatures = []
+                for msg in msgs:
+                    msg = msg.encode("utf-8")
+                    SSPL_SEC.sspl_sign_message(len(msg) + 1, msg,
+                                               self._username, token,
+                                               self._sig)
+                    signatures.append(str(self._sig.raw, encoding='utf-8'))
+            self._stats["signed"] += len(msgs)
+            self._stats["sign_time"] += time.perf_counter() - start
+        return signatures
+
+    def get_stats(self):
+        """Returns the signed message count, the signing time and cost per
+        message in microseconds and the number of token renewals"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["sign_us_per_msg"] = stats["sign_time"] * 1e6 / stats["signed"] \
+            if stats["signed"] else 0
+        return stats
+
+
+class SignatureVerifier(object):
+    """Verifies message signatures, caching the outcome per
+    (username, signature).
+
+    A cached outcome is only used for the very message it was computed
+    for, a signature replayed with a different message is verified again.
+    Outcomes expire after ttl seconds so expired sessions are noticed.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self._max_entries = max(int(max_entries), 1)
+        self._ttl = ttl
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"verified": 0, "cache_hits": 0, "verify_time": 0.0}
+
+    def verify(self, msg_len, msg, username, signature):
+        """Returns True if signature is valid for msg and username.
+
+        msg_len and msg are passed to sspl_verify_message as they are."""
+        if not use_security_lib:
+            return True
+
+        key = (username, signature)
+        digest = hashlib.sha256(str(msg).encode("utf-8")).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now and entry[1] == digest:
+                self._cache.move_to_end(key)
+                self._stats["cache_hits"] += 1
+                return entry[2]
+
+        start = time.perf_counter()
+        valid = SSPL_SEC.sspl_verify_message(msg_len, msg, username,
+                                             signature) == 0
+        with self._lock:
+            self._stats["verified"] += 1
+            self._stats["verify_time"] += time.perf_counter() - start
+            self._cache[key] = (now + self._ttl, digest, valid)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        return valid
+
+    def get_stats(self):
+        """Returns the verification count, cache hits and the cost per
+        verification in microseconds"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["verify_us_per_msg"] = \
+            stats["verify_time"] * 1e6 / stats["verified"] \
+            if stats["verified"] else 0
+        return stats
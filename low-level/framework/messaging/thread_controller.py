@@ -36,7 +36,7 @@ from framework.messaging.egress_processor import \
     EgressProcessor
 from framework.messaging.ingress_processor import \
     IngressProcessor
-from framework.utils.conf_utils import SSPL_CONF, Conf
+from framework.utils.conf_utils import MESSAGE_QUEUES, SSPL_CONF, Conf
 from framework.utils.service_logging import logger
 from json_msgs.messages.actuators.thread_controller import ThreadControllerMsg
 from message_handlers.disk_msg_handler import DiskMsgHandler
@@ -55,31 +55,40 @@ def _run_thread_capture_errors(curr_module, sspl_modules, msgQlist,
                                conf_reader, product):
     """Run the given thread and log any errors that happen on it.
     Will stop all sspl_modules if one of them fails."""
+    # Events failing on the shared scheduler are handled as if they had
+    # been raised out of start_thread() on the module's own thread
+    curr_module.set_error_handler(
+        lambda ex: _module_failed(curr_module, sspl_modules, msgQlist,
+                                  product, ex))
     try:
         # Each module is passed a reference list to message queues so it can transmit
         #  internal messages to other modules as desired
         curr_module.start_thread(conf_reader, msgQlist, product)
 
     except BaseException as ex:
-        logger.critical(
-            "SSPL-LL encountered a fatal error, terminating service Error: %s" % ex)
-        logger.exception(ex)
+        _module_failed(curr_module, sspl_modules, msgQlist, product, ex)
 
-        # Populate an actuator response message and transmit back to HAlon
-        error_msg = "SSPL-LL encountered an error, terminating service Error: " + \
-                    ", Exception: " + logger.exception(ex)
-        json_msg = ThreadControllerMsg(curr_module.name(), error_msg).getJson()
 
-        if product.lower() in [x.lower() for x in enabled_products]:
-            self._write_internal_msgQ(EgressProcessor.name(), json_msg)
-        elif product.lower() in [x.lower() for x in cs_legacy_products]:
-            self._write_internal_msgQ(
-                PlaneCntrlRMQegressProcessor.name(), json_msg)
+def _module_failed(curr_module, sspl_modules, msgQlist, product, ex):
+    """Report a failed module and stop all the other sspl_modules"""
+    logger.critical(
+        "SSPL-LL encountered a fatal error, terminating service Error: %s" % ex)
+    logger.exception(ex)
+
+    # Populate an actuator response message and transmit back to HAlon
+    error_msg = "SSPL-LL encountered an error, terminating service Error: " + \
+                ", Exception: " + str(ex)
+    json_msg = ThreadControllerMsg(curr_module.name(), error_msg).getJson()
+
+    if product.lower() in [x.lower() for x in enabled_products]:
+        msgQlist[EgressProcessor.name()].put((json_msg, None))
+    elif product.lower() in [x.lower() for x in cs_legacy_products]:
+        msgQlist[PlaneCntrlRMQegressProcessor.name()].put((json_msg, None))
 
-        # Shut it down, error is non-recoverable
-        for name, other_module in list(sspl_modules.items()):
-            if other_module is not curr_module:
-                other_module.shutdown()
+    # Shut it down, error is non-recoverable
+    for name, other_module in list(sspl_modules.items()):
+        if other_module is not curr_module:
+            other_module.shutdown()
 
 
 class ThreadController(ScheduledModuleThread, InternalMsgQ):
@@ -97,6 +106,7 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
     # Constats for keys to read from conf file
     SSPL_SETTING = 'SSPL_LL_SETTING'
     DEGRADED_STATE_MODULES = 'degraded_state_modules'
+    STATS_LOG_INTERVAL = 'stats_log_interval'
 
     @staticmethod
     def name():
@@ -132,6 +142,11 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
         super(ThreadController, self).initialize_msgQ(msgQlist)
         self._modules_to_resume = self._get_degraded_state_modules_list()
 
+        # Seconds between logging the depth of the module queues, 0 disables
+        self._queue_stats_interval = int(Conf.get(SSPL_CONF,
+            f"{MESSAGE_QUEUES}>{self.STATS_LOG_INTERVAL}", 0))
+        self._queue_stats_due = time.time() + self._queue_stats_interval
+
     def initialize_thread_list(self, sspl_modules, operating_system, product,
                                systemd_support):
         """initialize list of references to all modules"""
@@ -212,8 +227,15 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
             #self._set_debug_persist(True)
             self._log_debug("Start accepting requests")
         try:
-            # Block on message queue until it contains an entry
-            jsonMsg, _ = self._read_my_msgQ()
+            if self._queue_stats_interval > 0:
+                # Block until a message is queued or the queue stats are due
+                jsonMsg, _, due = self.wait_msg_or_deadlines(
+                    {"queue_stats": self._queue_stats_due})
+                if due:
+                    self._log_queue_stats()
+            else:
+                # Block on message queue until it contains an entry
+                jsonMsg, _ = self._read_my_msgQ()
             if jsonMsg is not None:
                 self._process_msg(jsonMsg)
 
@@ -230,6 +252,19 @@ class ThreadController(ScheduledModuleThread, InternalMsgQ):
         self._scheduler.enter(1, self._priority, self.run, ())
         self._log_debug("Finished processing successfully")
 
+    def _log_queue_stats(self):
+        """Logs the depth and overflow counters of the busy module queues"""
+        self._queue_stats_due = time.time() + self._queue_stats_interval
+        for module_name, stats in sorted(self._get_msgQ_stats().items()):
+            if not stats["depth"] and not stats["enqueue_rate"]:
+                continue
+            logger.info("ThreadController, queue %s: depth %d/%d %s, "
+                        "oldest %.1fs, %.1f msgs/s, dropped %d, spilled %d" %
+                        (module_name, stats["depth"], stats["capacity"],
+                         stats["lanes"], stats["oldest_age"],
+                         stats["enqueue_rate"], stats["dropped"],
+                         stats["spilled"]))
+
     def _process_msg(self, jsonMsg):
         """Parses the incoming message and calls the appropriate method"""
         self._log_debug("_process_msg, jsonMsg: %s" % jsonMsg)
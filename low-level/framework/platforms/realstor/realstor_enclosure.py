@@ -25,6 +25,8 @@ import json
 import time
 
 from framework.base.sspl_constants import ServiceTypes
+from framework.platforms.realstor.realstor_poll_coordinator import \
+    RealStorPollCoordinator
 from framework.target.enclosure import StorageEnclosure
 from framework.utils import encryptor
 from framework.utils.conf_utils import (GLOBAL_CONF, MGMT_INTERFACE,
@@ -59,6 +61,13 @@ class RealStorEnclosure(StorageEnclosure):
     CONF_REALSTORSENSORS = "REALSTORSENSORS"
     DEFAULT_POLL = 30
 
+    # Pooled keep-alive connections kept per management controller
+    WS_POOL_SIZE = "ws_pool_size"
+    WS_KEEP_ALIVE = "ws_keep_alive"
+    # Seconds a GET response is shared between sensors and the actuator
+    CACHE_FRESHNESS_WINDOW = "cache_freshness_window"
+    DEFAULT_FRESHNESS_WINDOW = 10
+
     DEFAULT_USER = "manage"
     DEFAULT_PASSWD = "!manage"
 
@@ -116,7 +125,13 @@ class RealStorEnclosure(StorageEnclosure):
         super(RealStorEnclosure, self).__init__()
 
         # WS Request common headers
-        self.ws = WebServices()
+        ws_pool_size = int(Conf.get(SSPL_CONF,
+                           f"{STORAGE_ENCLOSURE}>{self.WS_POOL_SIZE}",
+                           WebServices.DEFAULT_POOL_SIZE))
+        ws_keep_alive = str(Conf.get(SSPL_CONF,
+                            f"{STORAGE_ENCLOSURE}>{self.WS_KEEP_ALIVE}",
+                            "true")).lower() == "true"
+        self.ws = WebServices(ws_pool_size, ws_keep_alive)
         self.common_reqheaders = {}
 
         self.encl_conf = self.CONF_SECTION_MC
@@ -141,6 +156,13 @@ class RealStorEnclosure(StorageEnclosure):
         self.pollfreq = int(Conf.get(SSPL_CONF, f"{self.CONF_REALSTORSENSORS}>{POLLING_FREQUENCY}",
                         self.DEFAULT_POLL))
 
+        freshness_window = int(Conf.get(SSPL_CONF,
+            f"{self.CONF_REALSTORSENSORS}>{self.CACHE_FRESHNESS_WINDOW}",
+            self.DEFAULT_FRESHNESS_WINDOW))
+        self.poller = RealStorPollCoordinator(self._poll_uri, freshness_window,
+                                              self._is_cacheable)
+        self._system_response = None
+
         # Decrypt MC secret
         decryption_key = encryptor.gen_key(ENCLOSURE,
             ServiceTypes.STORAGE_ENCLOSURE.value)
@@ -196,6 +218,25 @@ class RealStorEnclosure(StorageEnclosure):
 
     def ws_request(self, url, method, retry_count=MAX_RETRIES,
             post_data=""):
+        """Make webservice requests using common utils, show GET requests
+        are served through the shared poll coordinator. Control commands
+        such as /restart and /shutdown are GETs as well and always go to
+        the controller."""
+        if method == self.ws.HTTP_GET and retry_count == self.MAX_RETRIES \
+                and '/api/show/' in url:
+            return self.poller.get(url[url.index('/api/show/') + len('/api'):])
+        return self._ws_request(url, method, retry_count, post_data)
+
+    def _poll_uri(self, uri):
+        return self._ws_request(self.build_url(uri), self.ws.HTTP_GET)
+
+    @staticmethod
+    def _is_cacheable(response):
+        return response.status_code == WebServices.HTTP_OK and \
+            not getattr(response, "cliapi_failure", False)
+
+    def _ws_request(self, url, method, retry_count=MAX_RETRIES,
+            post_data=""):
         """Make webservice requests using common utils"""
         response = None
         retried_login = False
@@ -230,6 +271,8 @@ class RealStorEnclosure(StorageEnclosure):
                     if jresponse:
 
                         if jresponse['status'][0]['return-code'] == self.CLIAPI_RESP_FAILURE:
+                            # Never share a failed api response
+                            response.cliapi_failure = True
                             response_status = jresponse['status'][0]['response']
 
                             # if call fails with invalid session key request
@@ -274,7 +317,7 @@ class RealStorEnclosure(StorageEnclosure):
         headers = {'datatype':'json'}
 
         response = self.ws.ws_get(url + auth_hash, headers, \
-                       self.WEBSERVICE_TIMEOUT)
+                       self.WEBSERVICE_TIMEOUT, self.URI_CLIAPI_LOGIN)
 
         if not response:
             logger.warn("Login webservice request failed {0}".format(url))
@@ -358,24 +401,13 @@ class RealStorEnclosure(StorageEnclosure):
     def get_system_status(self):
         """Retreive realstor system state info using cli api /show/system"""
 
-        # poll system would get invoked through multiple realstor sensors
-        # with less frequency compared to configured polling frequency
-        # adding check to comply with polling frequency
-        elapsed = time.time() - self.poll_system_ts
-
-        if elapsed < self.pollfreq:
-            logger.warn("/show/system request came in {0} seconds,"
-                "while configured polling frequency is {1} seconds,"
-                "ignoring".format(elapsed, self.pollfreq))
-            return
-
         system = None
 
-        # make ws request
+        # poll system gets invoked through multiple realstor sensors, they
+        # share one /show/system request per polling interval
         url = self.build_url(self.URI_CLIAPI_SHOWSYSTEM)
-        #logger.info("show system url: %s" % url)
-
-        response = self.ws_request(url, self.ws.HTTP_GET)
+        response = self.poller.get(self.URI_CLIAPI_SHOWSYSTEM,
+                                   max_age=self.pollfreq)
 
         if not response:
             logger.warn("System status unavailable as ws request failed")
@@ -387,6 +419,10 @@ class RealStorEnclosure(StorageEnclosure):
                 response.status_code))
             return
 
+        if response is self._system_response:
+            # Already processed within this polling interval
+            return
+        self._system_response = response
         self.poll_system_ts = time.time()
 
         try:
@@ -0,0 +1,124 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Shared poll coordinator for RealStor CLI API requests
+ ****************************************************************************
+"""
+
+import threading
+import time
+
+from framework.utils.service_logging import logger
+
+
+class RealStorPollCoordinator(object):
+    """Caches CLI API responses per URI so every RealStor sensor and the
+    actuator share one controller request per freshness window.
+
+    Concurrent requests for a URI that is being fetched wait for that
+    fetch instead of sending their own. Only responses accepted by
+    cacheable, HTTP 200 ones by default, are cached.
+    Subscribers of a URI are called with (uri, old_response, new_response)
+    whenever a fetch returns content different from the previous one.
+    """
+
+    HTTP_OK = 200
+
+    def __init__(self, fetch, freshness_window, cacheable=None):
+        # fetch(uri) makes the actual request and returns the response
+        self._fetch = fetch
+        self._cacheable = cacheable or \
+            (lambda response: response.status_code == self.HTTP_OK)
+        self._freshness_window = freshness_window
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._in_flight = {}
+        self._subscribers = {}
+        self._stats = {"hits": 0, "fetches": 0, "coalesced": 0}
+
+    def get(self, uri, max_age=None):
+        """Returns the response for uri, fetching it if the cached one is
+        older than max_age seconds, the freshness window by default."""
+        if max_age is None:
+            max_age = self._freshness_window
+
+        with self._lock:
+            cached = self._responses.get(uri)
+            if cached is not None and time.time() - cached[0] < max_age:
+                self._stats["hits"] += 1
+                return cached[1]
+            in_flight = self._in_flight.get(uri)
+            if in_flight is None:
+                in_flight = {"done": threading.Event(), "response": None}
+                self._in_flight[uri] = in_flight
+                owner = True
+                self._stats["fetches"] += 1
+            else:
+                owner = False
+                self._stats["coalesced"] += 1
+
+        if not owner:
+            in_flight["done"].wait()
+            return in_flight["response"]
+
+        response = None
+        try:
+            response = self._fetch(uri)
+        finally:
+            with self._lock:
+                previous = self._responses.get(uri)
+                cacheable = response is not None and self._cacheable(response)
+                if cacheable:
+                    self._responses[uri] = (time.time(), response)
+                del self._in_flight[uri]
+                subscribers = list(self._subscribers.get(uri, []))
+            in_flight["response"] = response
+            in_flight["done"].set()
+
+        if subscribers and cacheable and \
+                (previous is None or previous[1].content != response.content):
+            old = previous[1] if previous else None
+            for callback in subscribers:
+                try:
+                    callback(uri, old, response)
+                except Exception as err:
+                    logger.error(f"RealStorPollCoordinator, subscriber of "
+                                 f"{uri} failed: {err}")
+        return response
+
+    def subscribe(self, uri, callback):
+        """Call callback(uri, old_response, new_response) when the content
+        returned for uri changes"""
+        with self._lock:
+            self._subscribers.setdefault(uri, []).append(callback)
+
+    def unsubscribe(self, uri, callback):
+        with self._lock:
+            if callback in self._subscribers.get(uri, []):
+                self._subscribers[uri].remove(callback)
+
+    def invalidate(self, uri=None):
+        """Forget the cached response of uri, or of every uri"""
+        with self._lock:
+            if uri is None:
+                self._responses.clear()
+            else:
+                self._responses.pop(uri, None)
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,279 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Write-through in-memory cache in front of a store
+ ****************************************************************************
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from framework.base.sspl_constants import WAIT_BEFORE_RETRY
+from framework.utils.consulstore import ConsulStore
+from framework.utils.service_logging import logger
+from framework.utils.store import Store
+
+
+class CachedStore(Store):
+    """Write-through LRU cache wrapped around a Consul or File store.
+
+    Values are kept pickled so callers never share objects with the cache
+    and get() returns exactly what the wrapped store would have returned.
+    Absent keys are cached as well, which serves the common exists() then
+    get() pattern from one lookup. Entries expire after the TTL of the
+    longest matching prefix in prefix_ttl, or default_ttl; a TTL of 0
+    disables caching under that prefix.
+
+    put() and delete() go to the wrapped store first and then update the
+    cache. When the wrapped store is a ConsulStore, watch_prefixes are
+    followed with Consul blocking queries so keys written by other nodes
+    are invalidated as soon as they change.
+    """
+
+    _ABSENT = object()
+
+    def __init__(self, store, max_entries=4096, default_ttl=30,
+                 prefix_ttl=None, watch_prefixes=None):
+        super(CachedStore, self).__init__()
+        self._store = store
+        self._max_entries = max(int(max_entries), 1)
+        self._default_ttl = default_ttl
+        self._prefix_ttl = sorted(
+            ((self._normalize(prefix), ttl)
+             for prefix, ttl in (prefix_ttl or {}).items()),
+            key=lambda item: len(item[0]), reverse=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every write, a fill started before a write is dropped
+        self._writes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0,
+                       "invalidations": 0}
+        self._watchers = []
+        self._stop_event = threading.Event()
+        if watch_prefixes and isinstance(store, ConsulStore):
+            for prefix in watch_prefixes:
+                self._start_watcher(prefix)
+
+    @property
+    def wrapped(self):
+        """The Consul or File store behind the cache"""
+        return self._store
+
+    def __getattr__(self, name):
+        # FileStore.read, FileStore.items and friends
+        return getattr(self._store, name)
+
+    @staticmethod
+    def _normalize(key):
+        return key.lstrip("/")
+
+    def _ttl(self, key):
+        for prefix, ttl in self._prefix_ttl:
+            if key.startswith(prefix):
+                return ttl
+        return self._default_ttl
+
+    def _lookup(self, key):
+        """Returns the cached blob for key or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, blob = entry
+                if expires > time.time():
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return blob
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+
+    def _fill(self, key, blob, writes=None):
+        ttl = self._ttl(key)
+        if not ttl:
+            return
+        with self._lock:
+            if writes is not None and writes != self._writes:
+                # A put or delete raced with the read, the value may be stale
+                return
+            self._entries[key] = (time.time() + ttl, blob)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _invalidate(self, key):
+        with self._lock:
+            self._writes += 1
+            if self._entries.pop(key, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def _pack(self, value):
+        if value is None:
+            return self._ABSENT
+        try:
+            return pickle.dumps(value)
+        except Exception:
+            return None
+
+    def _unpack(self, blob):
+        if blob is self._ABSENT:
+            return None
+        return pickle.loads(blob)
+
+    def _load(self, key):
+        """Read key from the wrapped store, returns (value, status)"""
+        if isinstance(self._store, ConsulStore):
+            return self._store._consul_get(key)
+        return self._store.get(key), "Success"
+
+    def put(self, value, key, pickled=True):
+        self._store.put(value, key, pickled=pickled)
+        self._invalidate(self._normalize(key))
+        if pickled:
+            # Unpickled values come back as bytes, let those be read again
+            blob = self._pack(value)
+            if blob is not None:
+                self._fill(self._normalize(key), blob)
+
+    def get(self, key, *args, **kwargs):
+        if args or kwargs:
+            # Recursive consul reads and config lookups are not cached
+            return self._store.get(key, *args, **kwargs)
+        cache_key = self._normalize(key)
+        blob = self._lookup(cache_key)
+        if blob is not None:
+            return self._unpack(blob)
+        writes = self._writes
+        value, status = self._load(key)
+        if status == "Success":
+            blob = self._pack(value)
+            if blob is not None:
+                self._fill(cache_key, blob, writes)
+        return value
+
+    def exists(self, key):
+        cache_key = self._normalize(key)
+        blob = self._lookup(cache_key)
+        if blob is not None:
+            return blob is not self._ABSENT, "Success"
+        if not isinstance(self._store, ConsulStore):
+            # A file store check is a stat, reading the file is not cheaper
+            return self._store.exists(key)
+        writes = self._writes
+        value, status = self._load(key)
+        if status == "Success":
+            blob = self._pack(value)
+            if blob is not None:
+                self._fill(cache_key, blob, writes)
+        return value is not None, status
+
+    def delete(self, key):
+        self._store.delete(key)
+        self._invalidate(self._normalize(key))
+
+    def put_many(self, kvs, pickled=True):
+        self._store.put_many(kvs, pickled=pickled)
+        for key, value in kvs.items():
+            self._invalidate(self._normalize(key))
+            if pickled:
+                blob = self._pack(value)
+                if blob is not None:
+                    self._fill(self._normalize(key), blob)
+
+    def get_many(self, keys):
+        data = {}
+        missing = []
+        for key in keys:
+            blob = self._lookup(self._normalize(key))
+            if blob is not None:
+                data[key] = self._unpack(blob)
+            else:
+                missing.append(key)
+        if missing:
+            writes = self._writes
+            loaded = self._store.get_many(missing)
+            for key, value in loaded.items():
+                blob = self._pack(value)
+                if blob is not None:
+                    self._fill(self._normalize(key), blob, writes)
+            data.update(loaded)
+        return data
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        self._store.delete_many(keys)
+        for key in keys:
+            self._invalidate(self._normalize(key))
+
+    def get_keys_with_prefix(self, prefix):
+        return self._store.get_keys_with_prefix(prefix)
+
+    def invalidate_prefix(self, prefix):
+        """Drop every cached key under prefix"""
+        prefix = self._normalize(prefix)
+        with self._lock:
+            self._writes += 1
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._writes += 1
+            self._entries.clear()
+
+    def get_stats(self):
+        """Returns hit, miss, eviction and invalidation counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+    def _start_watcher(self, prefix):
+        watcher = threading.Thread(target=self._watch, args=(prefix,),
+                                   name=f"CachedStore-watch-{prefix}",
+                                   daemon=True)
+        self._watchers.append(watcher)
+        watcher.start()
+
+    def _watch(self, prefix):
+        """Follow prefix with Consul blocking queries, invalidating keys
+        whose ModifyIndex changed."""
+        prefix = self._normalize(prefix)
+        index = None
+        modify_indexes = {}
+        while not self._stop_event.is_set():
+            try:
+                index, data = self._store.consul_conn.kv.get(
+                    prefix, index=index, recurse=True, wait="60s")
+            except Exception as err:
+                logger.warn(f"CachedStore, _watch, {prefix}: {err}")
+                index = None
+                self.invalidate_prefix(prefix)
+                self._stop_event.wait(WAIT_BEFORE_RETRY)
+                continue
+            current = {item["Key"]: item["ModifyIndex"]
+                       for item in (data or [])}
+            for key in set(modify_indexes) | set(current):
+                if modify_indexes.get(key) != current.get(key):
+                    self._invalidate(key)
+            modify_indexes = current
+
+    def shutdown(self):
+        self._stop_event.set()
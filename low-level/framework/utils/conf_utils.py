@@ -32,6 +32,7 @@ IEMSENSOR="IEMSENSOR"
 IPMI="IPMI"
 LOGGINGMSGHANDLER="LOGGINGMSGHANDLER"
 LOGGINGPROCESSOR="LOGGINGPROCESSOR"
+MESSAGE_QUEUES="MESSAGE_QUEUES"
 MEMFAULTSENSOR="MEMFAULTSENSOR"
 NODEDATAMSGHANDLER="NODEDATAMSGHANDLER"
 NODEHWACTUATOR="NODEHWACTUATOR"
@@ -49,6 +50,7 @@ REALSTORPSUSENSOR="REALSTORPSUSENSOR"
 REALSTORSENSORS="REALSTORSENSORS"
 REALSTORSIDEPLANEEXPANDERSENSOR="REALSTORSIDEPLANEEXPANDERSENSOR"
 SASPORTSENSOR="SASPORTSENSOR"
+SCHEDULER="SCHEDULER"
 SSPL_LL_SETTING="SSPL_LL_SETTING"
 STORAGE_ENCLOSURE="STORAGE_ENCLOSURE"
 DISKMONITOR="DISKMONITOR"
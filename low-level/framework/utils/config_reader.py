@@ -148,6 +148,10 @@ class ConfigReader(object):
         from framework.utils.store_factory import store
         self.store = store
 
+    def _backing_store(self):
+        """Returns the store to dispatch on, unwrapping a CachedStore"""
+        return getattr(self.store, "wrapped", self.store)
+
     def _get_value(self, section, key):
         """Get a single value by section and key
 
@@ -161,9 +165,10 @@ class ConfigReader(object):
         """
         value = None
         try:
-            if self.store is not None and isinstance(self.store, FileStore):
+            backing_store = self._backing_store()
+            if backing_store is not None and isinstance(backing_store, FileStore):
                 value = self.store.get(section, key)
-            elif self.store is not None and isinstance(self.store, ConsulStore):
+            elif backing_store is not None and isinstance(backing_store, ConsulStore):
                 if section not in COMMON_CONFIGS:
                     value = self.store.get(component + '/' + section + '/' + key)
                 elif key in SSPL_CONFIGS or section.lower() in SSPL_CONFIGS:
@@ -222,9 +227,10 @@ class ConfigReader(object):
         """Get all values for all the keys in the section"""
         value_list = list()
         try:
-            if self.store is not None and isinstance(self.store, FileStore):
+            backing_store = self._backing_store()
+            if backing_store is not None and isinstance(backing_store, FileStore):
                 pairs = self.store.items(section)
-            elif self.store is not None and isinstance(self.store, ConsulStore):
+            elif backing_store is not None and isinstance(backing_store, ConsulStore):
                 if section not in COMMON_CONFIGS:
                     pairs = self.store.get(component + '/' + section + '/' , recurse=True)
                 else:
@@ -20,6 +20,7 @@
  ****************************************************************************
 """
 import os
+import base64
 import consul
 from framework.utils.store import Store
 from framework.utils.service_logging import logger
@@ -30,6 +31,9 @@ import requests
 
 class ConsulStore(Store):
 
+    # Consul rejects transactions with more than 64 operations
+    TXN_MAX_OPS = 64
+
     def __init__(self, host, port):
         super(Store, self).__init__()
         for retry_index in range(0, MAX_CONSUL_RETRY):
@@ -191,3 +195,92 @@ class ConsulStore(Store):
                     logger.warn("Error[{0}] while getting the keys from consul" \
                         .format(gerr))
                     break
+
+    def _txn(self, operations):
+        """Apply operations in /v1/txn requests of up to TXN_MAX_OPS each.
+        Returns the results of every operation, or None if a request failed.
+        """
+        results = []
+        for start in range(0, len(operations), self.TXN_MAX_OPS):
+            chunk = operations[start:start + self.TXN_MAX_OPS]
+            response = None
+            for retry_index in range(0, MAX_CONSUL_RETRY):
+                try:
+                    response = self.consul_conn.txn.put(chunk)
+                    break
+
+                except requests.exceptions.ConnectionError as connerr:
+                    logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                        .format(connerr, retry_index))
+                    time.sleep(WAIT_BEFORE_RETRY)
+
+                except Exception as gerr:
+                    consulerr = str(gerr)
+                    if CONSUL_ERR_STRING == consulerr:
+                        logger.warn("Error[{0}] consul connection refused Retry Index {1}" \
+                            .format(gerr, retry_index))
+                        time.sleep(WAIT_BEFORE_RETRY)
+                    else:
+                        logger.warn("Error[{0}] consul transaction failed".format(gerr))
+                        break
+
+            if not response or response.get("Errors"):
+                if response:
+                    logger.debug("ConsulStore, _txn, rolled back: {0}" \
+                        .format(response["Errors"]))
+                return None
+            results.extend(response.get("Results") or [])
+        return results
+
+    def put_many(self, kvs, pickled=True):
+        """ write several keys, each chunk of TXN_MAX_OPS keys atomically"""
+        operations = []
+        for key, value in kvs.items():
+            if pickled:
+                value = pickle.dumps(value)
+            elif isinstance(value, str):
+                value = value.encode('utf-8')
+            operations.append({"KV": {
+                "Verb": "set",
+                "Key": self._get_key(key),
+                "Value": base64.b64encode(value).decode()}})
+        if operations and self._txn(operations) is None:
+            logger.warn("ConsulStore, put_many, transaction failed, "
+                        "writing keys one by one")
+            super(ConsulStore, self).put_many(kvs, pickled=pickled)
+
+    def get_many(self, keys):
+        """ Load data for several keys"""
+        keys = list(keys)
+        data = {}
+        for start in range(0, len(keys), self.TXN_MAX_OPS):
+            chunk = keys[start:start + self.TXN_MAX_OPS]
+            results = self._txn([{"KV": {"Verb": "get", "Key": self._get_key(key)}}
+                                 for key in chunk])
+            if results is None:
+                # A get of a missing key rolls back the whole transaction
+                for key in chunk:
+                    value, status = self._consul_get(key)
+                    if status == "Success":
+                        data[key] = value
+                continue
+            for key, result in zip(chunk, results):
+                value = result["KV"]["Value"]
+                if value is not None:
+                    value = base64.b64decode(value)
+                    try:
+                        value = pickle.loads(value)
+                    except:
+                        pass
+                data[key] = value
+        return data
+
+    def delete_many(self, keys):
+        """ delete several keys"""
+        keys = list(keys)
+        operations = [{"KV": {"Verb": "delete", "Key": self._get_key(key)}}
+                      for key in keys]
+        if operations and self._txn(operations) is None:
+            logger.warn("ConsulStore, delete_many, transaction failed, "
+                        "deleting keys one by one")
+            super(ConsulStore, self).delete_many(keys)
@@ -0,0 +1,207 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Samples CPU usage from /proc/stat on a background
+                    thread into ring buffers
+ ****************************************************************************
+"""
+
+import threading
+import time
+from array import array
+
+from framework.utils.service_logging import logger
+
+# /proc/stat cpu line fields, guest time is already part of user time
+CPU_TIMES = ("user", "nice", "system", "idle", "iowait", "irq", "softirq",
+             "steal")
+IDLE_TIMES = (3, 4)
+
+
+class RingBuffer(object):
+    """Fixed number of float samples, the oldest is overwritten"""
+
+    def __init__(self, size):
+        self._samples = array('d', bytes(8 * size))
+        self._size = size
+        self._next = 0
+        self._count = 0
+
+    def append(self, value):
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def last(self, count):
+        """Returns up to count of the newest samples, oldest first"""
+        count = min(count, self._count)
+        start = (self._next - count) % self._size
+        if start + count <= self._size:
+            return self._samples[start:start + count]
+        return self._samples[start:] + self._samples[:self._next]
+
+    def __len__(self):
+        return self._count
+
+
+class CpuSampler(object):
+    """Reads /proc/stat every interval seconds and keeps the usage in
+    percent of every CPU and of all CPUs together for retention seconds.
+
+    Readers get averages, percentiles and the latest usage without
+    waiting, the sampler thread does all the waiting. There is one
+    sampler per process, the first caller's settings apply.
+    """
+
+    PROC_STAT = "/proc/stat"
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, interval=1, retention=900, proc_stat=PROC_STAT):
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super(CpuSampler, cls).__new__(cls)
+                instance._setup(interval, retention, proc_stat)
+                cls._instance = instance
+            return cls._instance
+
+    def _setup(self, interval, retention, proc_stat):
+        self._interval = max(float(interval), 0.1)
+        self._size = max(int(retention / self._interval), 1)
+        self._proc_stat = proc_stat
+        self._lock = threading.Lock()
+        # Usage of all CPUs together at index 0, then one buffer per CPU
+        self._usage = []
+        self._times_percent = dict.fromkeys(CPU_TIMES, 0.0)
+        self._prev = None
+        self._since_boot = -1
+        self._thread = None
+
+    def start(self):
+        """Takes the first reading and starts the sampler thread"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._prev = self._read()
+            self._since_boot = self._busy(self._prev[0])
+            if self._since_boot >= 0:
+                self._times_percent = self._split(self._prev[0])
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name="CpuSampler")
+        self._thread.start()
+
+    def _read(self):
+        """Returns the cpu time fields of the cpu lines of /proc/stat"""
+        times = []
+        with open(self._proc_stat) as proc_stat:
+            for line in proc_stat:
+                if not line.startswith("cpu"):
+                    break
+                fields = line.split()
+                times.append([int(field) for field in
+                              fields[1:len(CPU_TIMES) + 1]])
+        return times
+
+    def _run(self):
+        next_sample = time.time()
+        while True:
+            next_sample += self._interval
+            time.sleep(max(next_sample - time.time(), 0))
+            try:
+                self.sample()
+            except Exception as err:
+                logger.error(f"CpuSampler, reading {self._proc_stat} "
+                             f"failed: {err}")
+
+    def sample(self):
+        """Adds the usage since the previous reading to the buffers"""
+        current = self._read()
+        prev, self._prev = self._prev, current
+        if prev is None:
+            return
+        with self._lock:
+            while len(self._usage) < len(current):
+                self._usage.append(RingBuffer(self._size))
+            for index, (before, after) in enumerate(zip(prev, current)):
+                deltas = [max(b - a, 0) for a, b in zip(before, after)]
+                busy = self._busy(deltas)
+                if busy < 0:
+                    continue
+                self._usage[index].append(busy)
+                if index == 0:
+                    self._times_percent = self._split(deltas)
+
+    @staticmethod
+    def _busy(times):
+        """Returns the busy percent of cpu times, -1 if no time passed"""
+        total = sum(times)
+        if not total:
+            return -1
+        idle = sum(times[field] for field in IDLE_TIMES if field < len(times))
+        return 100.0 * (total - idle) / total
+
+    @staticmethod
+    def _split(times):
+        total = sum(times)
+        return {name: 100.0 * time / total
+                for name, time in zip(CPU_TIMES, times)}
+
+    def _samples(self, cpu, seconds):
+        """Returns the samples of the last seconds, cpu None is all CPUs"""
+        index = 0 if cpu is None else cpu + 1
+        count = max(int(round(seconds / self._interval)), 1)
+        with self._lock:
+            if index >= len(self._usage):
+                return []
+            return self._usage[index].last(count)
+
+    def current(self, cpu=None):
+        """Returns the latest usage in percent. Before the first sample the
+        usage of all CPUs is the one since boot, -1 for a single CPU."""
+        samples = self._samples(cpu, self._interval)
+        if samples:
+            return samples[-1]
+        return self._since_boot if cpu is None else -1
+
+    def average(self, seconds, cpu=None):
+        """Returns the average usage over the last seconds, over the samples
+        taken so far until that long has passed, -1 before the first"""
+        samples = self._samples(cpu, seconds)
+        return sum(samples) / len(samples) if samples else -1
+
+    def averages(self, seconds):
+        """Returns the average of each CPU over the last seconds"""
+        with self._lock:
+            cpus = max(len(self._usage) - 1, 0)
+        return [self.average(seconds, cpu) for cpu in range(cpus)]
+
+    def percentile(self, percent, seconds, cpu=None):
+        """Returns the usage percent of the samples of the last seconds
+        stayed at or below, -1 before the first sample"""
+        samples = sorted(self._samples(cpu, seconds))
+        if not samples:
+            return -1
+        rank = min(int(round(percent / 100.0 * (len(samples) - 1))),
+                   len(samples) - 1)
+        return samples[rank]
+
+    def times_percent(self):
+        """Returns the split of the latest sample of all CPUs in percent,
+        like psutil.cpu_times_percent(), the one since boot before it"""
+        with self._lock:
+            return dict(self._times_percent)
@@ -23,6 +23,7 @@ import os
 import errno
 import json
 import pickle
+import tempfile
 from configparser import ConfigParser
 from framework.utils.store import Store
 from framework.utils.service_logging import logger
@@ -61,23 +62,54 @@ class FileStore(Store):
                     logger.warn(f"{directory_path} creation failed with error {err}, alerts \
                     may get missed on sspl restart or failover!!")
 
+        # Written aside and renamed over the file, so that a reader or a
+        # crash never sees it half written. Each writer gets a file of its
+        # own, concurrent puts of a key must not share one.
+        tmpfilepath = None
         try:
-            fh = open(absfilepath,"wb")
-            if pickled:
-                pickle.dump(value, fh)
-            else:
-                if isinstance(value, str):
-                    value = value.encode('utf-8')
-                fh.write(value)
+            fd, tmpfilepath = self._mkstemp(absfilepath)
+            with os.fdopen(fd, "wb") as fh:
+                if pickled:
+                    pickle.dump(value, fh)
+                else:
+                    if isinstance(value, str):
+                        value = value.encode('utf-8')
+                    fh.write(value)
+                # Data must be on disk before the rename makes it visible
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmpfilepath, absfilepath)
 
         except IOError as err:
             logger.warn("I/O error[{0}] while dumping data to file {1}): {2}"\
                 .format(err.errno,absfilepath,err))
+            self._remove_tmp(tmpfilepath)
         except Exception as gerr:
             logger.warn("Error[{0}] while dumping data to file {1}"\
                 .format(gerr, absfilepath))
-        else:
-            fh.close()
+            self._remove_tmp(tmpfilepath)
+
+    @staticmethod
+    def _mkstemp(absfilepath):
+        fd, tmpfilepath = tempfile.mkstemp(
+            dir=os.path.dirname(absfilepath),
+            prefix=f".{os.path.basename(absfilepath)}.", suffix=".tmp")
+        # mkstemp creates the file readable by its owner only
+        os.fchmod(fd, 0o644)
+        return fd, tmpfilepath
+
+    @staticmethod
+    def _is_tmp(filename):
+        return filename.startswith(".") and filename.endswith(".tmp")
+
+    @staticmethod
+    def _remove_tmp(tmpfilepath):
+        if tmpfilepath is None:
+            return
+        try:
+            os.remove(tmpfilepath)
+        except OSError:
+            pass
 
     def get(self, key, option=None):
         """
@@ -155,7 +187,42 @@ class FileStore(Store):
         if not os.path.exists(prefix):
             return []
         else:
-            return os.listdir(prefix)
+            return [filename for filename in os.listdir(prefix)
+                    if not self._is_tmp(filename)]
+
+    def _sync_dirs(self, keys):
+        """fsync each directory holding one of keys once"""
+        for directory_path in {os.path.dirname(key) for key in keys}:
+            try:
+                fd = os.open(directory_path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            except OSError as err:
+                logger.warn("Error[{0}] while syncing directory {1}"\
+                    .format(err, directory_path))
+            finally:
+                os.close(fd)
+
+    def put_many(self, kvs, pickled=True):
+        """ Dump several values, each file is synced by put, their
+        directories once"""
+        for key, value in kvs.items():
+            self.put(value, key, pickled=pickled)
+        self._sync_dirs(kvs.keys())
+
+    def get_many(self, keys):
+        """ Load several files, missing files map to None"""
+        return {key: self.get(key) if os.path.exists(key) else None
+                for key in keys}
+
+    def delete_many(self, keys):
+        """ delete several files, syncing their directories once"""
+        keys = list(keys)
+        for key in keys:
+            self.delete(key)
+        self._sync_dirs(keys)
 
 if __name__ == '__main__':
     store = FileStore()
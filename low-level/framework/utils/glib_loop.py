@@ -0,0 +1,91 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Single owner of the process default GLib main context
+ ****************************************************************************
+"""
+
+import threading
+
+from gi.repository import GLib
+
+from framework.utils.service_logging import logger
+
+
+class GLibLoopHandle(object):
+    """A module's hold on the shared loop, see GLibLoop.acquire.
+
+    run() blocks the module thread until quit() is called, the events of
+    the module are dispatched on the loop thread meanwhile. quit() drops
+    the hold, the loop stops once nobody holds it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def run(self):
+        self._done.wait()
+
+    def quit(self):
+        with self._lock:
+            if self._done.is_set():
+                return
+            self._done.set()
+        GLibLoop._release()
+
+
+class GLibLoop(object):
+    """Runs a GLib.MainLoop on the default main context from one thread.
+
+    dbus-python dispatches the signals of every bus connection on the
+    default context, so two modules iterating it themselves take its
+    callbacks away from each other. Modules which listen to D-Bus signals
+    take a handle with acquire() instead; GLib timers, idle callbacks and
+    D-Bus signal handlers then all run on the loop thread. A module whose
+    state must stay on its own thread hands the work over from there.
+    """
+
+    _lock = threading.Lock()
+    _loop = None
+    _holders = 0
+
+    @classmethod
+    def acquire(cls):
+        """Starts the loop thread unless it runs already, returns a handle"""
+        with cls._lock:
+            cls._holders += 1
+            if cls._loop is None:
+                cls._loop = GLib.MainLoop()
+                threading.Thread(target=cls._run, args=(cls._loop,),
+                                 name="GLibLoop", daemon=True).start()
+        return GLibLoopHandle()
+
+    @staticmethod
+    def _run(loop):
+        try:
+            loop.run()
+        except Exception as err:
+            logger.exception(f"GLibLoop, main loop failed: {err}")
+
+    @classmethod
+    def _release(cls):
+        with cls._lock:
+            cls._holders -= 1
+            if cls._holders == 0 and cls._loop is not None:
+                cls._loop.quit()
+                cls._loop = None
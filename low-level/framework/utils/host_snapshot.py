@@ -0,0 +1,164 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Host memory, process and root file system figures read
+                    from /proc and statvfs in one pass
+ ****************************************************************************
+"""
+
+import os
+import threading
+import time
+
+
+class HostSnapshot(object):
+    """Figures of the host at one point in time.
+
+    /proc/meminfo and /proc/stat are read once each and the root file
+    system is queried once, processes are counted from the /proc entries
+    and their state read from /proc/<pid>/stat. memory holds the keys of
+    psutil.virtual_memory(), in bytes, and disk those of
+    psutil.disk_usage().
+    """
+
+    PROC = "/proc"
+    # Process states not counted as running, as the psutil status filter
+    # host_update used: sleeping, idle, stopped, zombie and dead
+    IDLE_STATES = ("S", "I", "T", "Z", "X", "x")
+
+    def __init__(self, proc=PROC, mount="/"):
+        start, cpu_start = time.time(), time.process_time()
+        self.time = start
+        self._read_meminfo(os.path.join(proc, "meminfo"))
+        self._read_stat(os.path.join(proc, "stat"))
+        self._read_processes(proc)
+        self._read_statvfs(mount)
+        # Cost of taking the snapshot in seconds
+        self.cost = time.time() - start
+        self.cpu_cost = time.process_time() - cpu_start
+
+    def _read_meminfo(self, path):
+        meminfo = {}
+        with open(path) as proc_meminfo:
+            for line in proc_meminfo:
+                fields = line.split()
+                if len(fields) >= 2:
+                    meminfo[fields[0].rstrip(":")] = int(fields[1]) * 1024
+
+        # Same figures as psutil.virtual_memory() of the python36-psutil
+        # release the nodes run
+        total = meminfo.get("MemTotal", 0)
+        free = meminfo.get("MemFree", 0)
+        buffers = meminfo.get("Buffers", 0)
+        cached = meminfo.get("Cached", 0) + meminfo.get("SReclaimable", 0)
+        used = total - free - cached - buffers
+        if used < 0:
+            used = total - free
+        available = meminfo.get("MemAvailable", free + cached)
+        self.memory = {
+            "total": total,
+            "available": available,
+            "percent": round((total - available) / total * 100, 1)
+                       if total else 0.0,
+            "used": used,
+            "free": free,
+            "active": meminfo.get("Active", 0),
+            "inactive": meminfo.get("Inactive", 0),
+            "buffers": buffers,
+            "cached": cached,
+            "shared": meminfo.get("Shmem", 0),
+            "slab": meminfo.get("Slab", 0)
+        }
+        self.swap_total = meminfo.get("SwapTotal", 0)
+        self.swap_free = meminfo.get("SwapFree", 0)
+
+    def _read_stat(self, path):
+        self.boot_time = 0
+        with open(path) as proc_stat:
+            for line in proc_stat:
+                if line.startswith("btime "):
+                    self.boot_time = int(line.split()[1])
+                    break
+
+    def _read_processes(self, proc):
+        self.process_count = 0
+        # Processes, not threads, on a CPU or in uninterruptible sleep
+        self.running_count = 0
+        for entry in os.scandir(proc):
+            if not entry.name.isdigit():
+                continue
+            self.process_count += 1
+            try:
+                with open(os.path.join(entry.path, "stat"), "rb") as stat:
+                    # The command name in brackets may hold any character
+                    state = stat.read().rpartition(b")")[2].split()[0]
+            except (OSError, IndexError):
+                # The process exited meanwhile
+                continue
+            if state.decode() not in self.IDLE_STATES:
+                self.running_count += 1
+
+    def _read_statvfs(self, mount):
+        stat = os.statvfs(mount)
+        total = stat.f_blocks * stat.f_frsize
+        free = stat.f_bavail * stat.f_frsize
+        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        # Same figures as psutil.disk_usage()
+        self.disk = {
+            "total": total,
+            "used": used,
+            "free": free,
+            "percent": round(used / (used + free) * 100, 1)
+                       if used + free else 0.0
+        }
+        self.files = stat.f_files
+        self.files_free = stat.f_ffree
+
+
+class HostCollector(object):
+    """Hands out one HostSnapshot to all readers until it is max_age
+    seconds old, so that the messages of one transmit cycle share it"""
+
+    def __init__(self, max_age, proc=HostSnapshot.PROC, mount="/"):
+        self._max_age = max_age
+        self._proc = proc
+        self._mount = mount
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stats = {"collections": 0, "reuses": 0, "cost": 0.0,
+                       "cpu_cost": 0.0}
+
+    def get(self):
+        """Returns the current snapshot and whether it was taken now"""
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and \
+                    time.time() - snapshot.time < self._max_age:
+                self._stats["reuses"] += 1
+                return snapshot, False
+            snapshot = HostSnapshot(self._proc, self._mount)
+            self._snapshot = snapshot
+            self._stats["collections"] += 1
+            self._stats["cost"] += snapshot.cost
+            self._stats["cpu_cost"] += snapshot.cpu_cost
+            return snapshot, True
+
+    def get_stats(self):
+        """Returns the number of snapshots taken and reused and their total
+        cost in seconds"""
+        with self._lock:
+            return dict(self._stats)
@@ -54,3 +54,10 @@ class IPMI(object):
            sensor id using IPMI
         """
         raise NotImplementedError("sub class should implement this")
+
+    @abc.abstractmethod
+    def get_sensor_props_many(self, sensor_ids):
+        """Returns the properties of several sensors, by sensor id, with
+           as few IPMI requests as possible
+        """
+        raise NotImplementedError("sub class should implement this")
@@ -16,8 +16,11 @@
 import re
 import os
 import shlex
+import threading
+import time
 
 from framework.utils.ipmi import IPMI
+from framework.utils.ipmi_shell import IpmiShellPool
 from framework.utils.service_logging import logger
 from cortx.utils.process import SimpleProcess
 from framework.utils.conf_utils import (Conf, SSPL_CONF, GLOBAL_CONF,
@@ -62,12 +65,113 @@ class IPMITool(IPMI):
                  "authentication type unavailable for attempted privilege level")
     KCS_ERRS = ("could not find inband device", "driver timeout")
 
+    # Keys in the BMC_INTERFACE section
+    SHELL_POOL_SIZE = "shell_pool_size"
+    SHELL_TIMEOUT = "shell_timeout"
+    TARGET_REFRESH_INTERVAL = "target_refresh_interval"
+    SDR_INDEX_TTL = "sdr_index_ttl"
+
+    # Sensor ids passed to one multi-sensor command
+    SENSORS_PER_COMMAND = 32
+
     def __new__(cls):
         """new method"""
         if cls._instance is None:
             cls._instance = super(IPMITool, cls).__new__(cls)
+            cls._instance._init_target()
         return cls._instance
 
+    def _init_target(self):
+        """Sets up the cached tool and interface options and the pool of
+        ipmitool shells running with them"""
+        self._target_lock = threading.Lock()
+        self._target = None
+        self._target_expires = 0
+        self._refresh_interval = self._conf_int(
+            self.TARGET_REFRESH_INTERVAL, 60)
+        self._shell_pool = IpmiShellPool(
+            self._conf_int(self.SHELL_POOL_SIZE, 1),
+            self._conf_int(self.SHELL_TIMEOUT, 30), self.IPMI_ENCODING)
+        # Sensors of each type from 'sdr type', the SDR repository
+        # rarely changes, and the rows of all sensors from 'sdr elist'
+        self._sdr_lock = threading.Lock()
+        self._sdr_ttl = self._conf_int(self.SDR_INDEX_TTL, 10)
+        self._sdr_types = {}
+        self._sdr_rows = None
+        self._sdr_rows_expires = 0
+
+    @staticmethod
+    def _conf_int(key, default):
+        try:
+            return int(Conf.get(SSPL_CONF, f"{BMC_INTERFACE}>{key}", default))
+        except (TypeError, ValueError):
+            return default
+
+    def invalidate_target(self):
+        """Makes the next command look up the tool, interface and
+        credentials again, e.g. after the active interface changed"""
+        with self._target_lock:
+            self._target_expires = 0
+
+    def _get_target(self):
+        """Returns the ipmitool command with the interface options.
+
+        Checking for the simulator, reading the interface and decrypting the
+        BMC password is only done every target_refresh_interval seconds, or
+        when the simulator is switched on or off."""
+        simulator = os.path.exists(f"{DATA_PATH}/server/activate_ipmisimtool")
+        with self._target_lock:
+            if self._target is not None and \
+                    time.time() < self._target_expires and \
+                    simulator == self._target[2]:
+                return self._target[0], self._target[1]
+
+            tool = self.IPMITOOL
+            host_conf = []
+            # Set ipmitool to ipmisimtool if activated.
+            if simulator:
+                cmd = self.IPMISIMTOOL + " sel info"
+                _, _, retcode = SimpleProcess(cmd).run()
+                if retcode in [0, 2]:
+                    tool = self.IPMISIMTOOL
+                    logger.info("IPMI simulator is activated.")
+
+            # Fetch channel info from config file and cache.
+            _channel_interface = Conf.get(SSPL_CONF, "%s>%s" %
+                                    (BMC_INTERFACE, BMC_CHANNEL_IF))
+
+            _active_interface = store.get(self.ACTIVE_INTERFACE, None)
+            if isinstance(_active_interface, bytes):
+                _active_interface = _active_interface.decode()
+
+            # Set host_conf based on channel info.
+            if _channel_interface == self.LAN_IF and \
+               _active_interface == self.LAN_IF and \
+               tool != self.IPMISIMTOOL:
+                host_conf = ["-I", "lanplus"] + self._lan_credentials()
+
+            command = shlex.split(tool) + host_conf
+            if self._target is None or self._target[1] != command:
+                # Shells of the previous target use the old credentials
+                self._shell_pool.reset(
+                    command if tool == self.IPMITOOL else None)
+                self.invalidate_sdr_index()
+            self._target = (tool, command, simulator)
+            self._target_expires = time.time() + self._refresh_interval
+            return tool, command
+
+    def _lan_credentials(self):
+        """Returns the -H, -U and -P options for the BMC LAN interface"""
+        bmc_ip = Conf.get(GLOBAL_CONF, BMC_IP_KEY, '')
+        bmc_user = Conf.get(GLOBAL_CONF, BMC_USER_KEY, 'ADMIN')
+        bmc_secret = Conf.get(GLOBAL_CONF, BMC_SECRET_KEY, 'ADMIN')
+
+        decryption_key = encryptor.gen_key(MACHINE_ID,
+                                           ServiceTypes.SERVER_NODE.value)
+        bmc_pass = encryptor.decrypt(decryption_key,
+                                     bmc_secret, self.NAME)
+        return ["-H", str(bmc_ip), "-U", str(bmc_user), "-P", str(bmc_pass)]
+
     def get_manufacturer_name(self):
         """Returns node server manufacturer name.
             Example: Supermicro, Intel Corporation, DELL Inc
@@ -103,16 +207,31 @@ class IPMITool(IPMI):
             Output Format : List of Tuple
             Output Example : [(HDD 1 Status, F1, ok, 4.2, Drive Present),]
         """
+        fru_type = fru_type.title()
+        with self._sdr_lock:
+            members = self._sdr_types.get(fru_type)
+        if members is not None:
+            rows = self._get_sdr_rows()
+            if rows is not None and all(m in rows for m in members):
+                return [rows[m] for m in members]
+
         sensor_list_out, error, retcode = \
-            self._run_ipmitool_subcommand(f"sdr type '{fru_type.title()}'")
+            self._run_ipmitool_subcommand(f"sdr type '{fru_type}'")
         if retcode != 0:
             msg = "ipmitool sdr type command failed: {0}".format(error)
             logger.warning(msg)
             return
-        sensor_list = sensor_list_out.split("\n")
+        out = self._parse_sdr_rows(sensor_list_out)
+        with self._sdr_lock:
+            self._sdr_types[fru_type] = [row[:2] for row in out]
+        return out
 
+    @staticmethod
+    def _parse_sdr_rows(sensor_list_out):
+        """Returns the rows of 'sdr type' or 'sdr elist' output as
+        (sensor_id, sensor_num, status, entity_id, reading) tuples"""
         out = []
-        for sensor in sensor_list:
+        for sensor in sensor_list_out.split("\n"):
             if sensor == "":
                 break
             # Example of output form 'sdr type' command:
@@ -120,12 +239,37 @@ class IPMITool(IPMI):
             # PS1 1a Fan Fail  | A0h | ok  | 29.13 |
             # HDD 1 Status     | F1h | ok  |  4.2 | Drive Present
             fields_list = [ f.strip() for f in sensor.split("|")]
+            if len(fields_list) != 5:
+                continue
             sensor_id, sensor_num, status, entity_id, reading  = fields_list
             sensor_num = sensor_num.strip("h").lower()
 
             out.append((sensor_id, sensor_num, status, entity_id, reading))
         return out
 
+    def _get_sdr_rows(self):
+        """Returns the 'sdr elist' rows by (sensor_id, sensor_num), read
+        at most once every sdr_index_ttl seconds, None if not available"""
+        with self._sdr_lock:
+            if self._sdr_rows is not None and \
+                    time.time() < self._sdr_rows_expires:
+                return self._sdr_rows
+        sensor_list_out, _, retcode = self._run_ipmitool_subcommand("sdr elist")
+        rows = None
+        if retcode == 0:
+            rows = {row[:2]: row
+                    for row in self._parse_sdr_rows(sensor_list_out)}
+        with self._sdr_lock:
+            self._sdr_rows = rows
+            self._sdr_rows_expires = time.time() + self._sdr_ttl
+        return rows
+
+    def invalidate_sdr_index(self):
+        """Drops the cached sensor lists, e.g. after the SDR changed"""
+        with self._sdr_lock:
+            self._sdr_types = {}
+            self._sdr_rows = None
+
     def get_sensor_sdr_props(self, sensor_id):
         """Returns sensor software data record based on sensor id of a FRU
            using ipmitool utility
@@ -152,7 +296,66 @@ class IPMITool(IPMI):
             return (False, err_response)
         props_list = props_list_out.split("\n")
         props_list = props_list[1:] # The first line is 'Locating sensor record...'
-
+        return self._parse_sensor_props(props_list)
+
+    def get_sensor_props_many(self, sensor_ids):
+        """Returns the properties of several sensors like get_sensor_props,
+           with one 'ipmitool sensor get' for up to SENSORS_PER_COMMAND
+           sensors
+           Params : self, sensor_ids
+           Output Format : dictionary of get_sensor_props tuples by sensor id
+           Output Example : {"Sys Fan 1A": ({common}, {specific}),}
+        """
+        result = {}
+        for chunk, records, error in \
+                self.get_records_many("sensor get", sensor_ids):
+            for sensor_id in chunk:
+                if sensor_id in records:
+                    result[sensor_id] = \
+                        self._parse_sensor_props(records[sensor_id])
+                else:
+                    msg = f"ipmitool sensor get command failed: {error}"
+                    result[sensor_id] = (False, {sensor_id: {"ERROR": msg}})
+        return result
+
+    def get_records_many(self, subcommand, sensor_ids, run=None):
+        """Runs subcommand, 'sensor get' or 'sdr get', for
+        SENSORS_PER_COMMAND sensors at a time with run, by default
+        _run_ipmitool_subcommand, and yields the (sensor ids, output lines
+        by sensor id, error) of each run"""
+        run = run or self._run_ipmitool_subcommand
+        sensor_ids = list(sensor_ids)
+        for start in range(0, len(sensor_ids), self.SENSORS_PER_COMMAND):
+            chunk = sensor_ids[start:start + self.SENSORS_PER_COMMAND]
+            names = " ".join(f"'{sensor_id}'" for sensor_id in chunk)
+            out, error, retcode = run(f"{subcommand} {names}")
+            records = self.split_sensor_records(out, chunk)
+            if retcode != 0 and not records:
+                logger.warning(
+                    f"ipmitool {subcommand} command failed: {error}")
+            yield chunk, records, error
+
+    @staticmethod
+    def split_sensor_records(output, sensor_ids):
+        """Splits multi-sensor 'sensor get' or 'sdr get' output into the
+        lines of each sensor, by sensor id. A record starts with its
+        'Sensor ID : <id> (0x<num>)' line."""
+        wanted = set(sensor_ids)
+        records = {}
+        lines = None
+        for line in output.split("\n"):
+            if ':' in line and line.split(":", 1)[0].strip() == "Sensor ID":
+                name = line.split(":", 1)[1].strip()
+                name = re.sub(r"\s*\(0x[0-9a-fA-F]+\)$", "", name)
+                lines = records.setdefault(name, []) \
+                    if name in wanted else None
+            if lines is not None:
+                lines.append(line)
+        return records
+
+    def _parse_sensor_props(self, props_list):
+        """Returns the (common, specific) properties in the lines of a
+        'sensor get' record"""
         specific = {}
         curr_key = None
         for prop in props_list:
@@ -190,44 +393,23 @@ class IPMITool(IPMI):
         return sensor_id_map
 
     def _run_ipmitool_subcommand(self, subcommand, grep_args=None):
-        """Executes ipmitool sub-commands, and optionally greps the output."""
-        self.ACTIVE_IPMI_TOOL = self.IPMITOOL
-        host_conf_cmd = ""
-
-        # Set ipmitool to ipmisimtool if activated.
-        if os.path.exists(f"{DATA_PATH}/server/activate_ipmisimtool"):
-            cmd = self.IPMISIMTOOL + " sel info"
-            _, _, retcode = SimpleProcess(cmd).run()
-            if retcode in [0, 2]:
-                self.ACTIVE_IPMI_TOOL = self.IPMISIMTOOL
-                logger.info("IPMI simulator is activated.")
-
-        # Fetch channel info from config file and cache.
-        _channel_interface = Conf.get(SSPL_CONF, "%s>%s" %
-                                (BMC_INTERFACE, BMC_CHANNEL_IF))
-
-        _active_interface = store.get(self.ACTIVE_INTERFACE, None)
-
-        # Set host_conf_cmd based on channel info.
-        if _channel_interface == self.LAN_IF and \
-           _active_interface == self.LAN_IF and \
-           self.ACTIVE_IPMI_TOOL != self.IPMISIMTOOL:
-            bmc_ip = Conf.get(GLOBAL_CONF, BMC_IP_KEY, '')
-            bmc_user = Conf.get(GLOBAL_CONF, BMC_USER_KEY, 'ADMIN')
-            bmc_secret = Conf.get(GLOBAL_CONF, BMC_SECRET_KEY, 'ADMIN')
-
-            decryption_key = encryptor.gen_key(MACHINE_ID,
-                                               ServiceTypes.SERVER_NODE.value)
-            bmc_pass = encryptor.decrypt(decryption_key,
-                                         bmc_secret, self.NAME)
-
-            host_conf_cmd = f"-I lanplus -H {bmc_ip} -U {bmc_user} -P {bmc_pass}"
-
-        # generate the final cmd and execute on shell.
-        command = " ".join([self.ACTIVE_IPMI_TOOL, host_conf_cmd, subcommand])
-        command = shlex.split(command)
-
-        out, error, retcode = SimpleProcess(command).run()
+        """Executes ipmitool sub-commands, and optionally greps the output.
+
+        Read-only sub-commands go to a long-lived ipmitool shell, which
+        keeps its BMC session open between commands. Everything else, and
+        every command the shell could not answer cleanly, runs as a
+        process of its own."""
+        tool, command = self._get_target()
+        self.ACTIVE_IPMI_TOOL = tool
+
+        result = None
+        if tool == self.IPMITOOL:
+            result = self._shell_pool.run(subcommand)
+        if result is not None:
+            out, error, retcode = result
+        else:
+            out, error, retcode = SimpleProcess(
+                command + shlex.split(subcommand)).run()
 
         # Decode bytes encoded strings.
         if not isinstance(out, str):
@@ -250,6 +432,22 @@ class IPMITool(IPMI):
         if error:
             error = error.replace('\n', '')
 
+        # The interface may be about to change, look it up again
+        if retcode and error in self.RMCP_ERRS + self.KCS_ERRS:
+            self.invalidate_target()
+
+        return out, error, retcode
+
+    def _run_lan_subcommand(self, subcommand):
+        """Executes an ipmitool sub-command over the BMC LAN interface
+        whatever interface is active, to see whether LAN works again"""
+        command = shlex.split(self.IPMITOOL) + ["-I", "lan"] + \
+            self._lan_credentials() + shlex.split(subcommand)
+        out, error, retcode = SimpleProcess(command).run()
+        if not isinstance(out, str):
+            out = out.decode(self.IPMI_ENCODING)
+        if not isinstance(error, str):
+            error = error.decode(self.IPMI_ENCODING)
         return out, error, retcode
 
 
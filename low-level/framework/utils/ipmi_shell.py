@@ -0,0 +1,258 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Long-lived 'ipmitool shell' sessions shared by the IPMI
+                    users of a process
+ ****************************************************************************
+"""
+
+import fcntl
+import os
+import queue
+import re
+import selectors
+import shlex
+import subprocess
+import threading
+import time
+
+from framework.utils.service_logging import logger
+
+
+class IpmiShellError(Exception):
+    """The shell session is unusable and has to be replaced"""
+
+
+class IpmiShell(object):
+    """One 'ipmitool <interface options> shell' process fed over stdin.
+
+    ipmitool does not report a status per shell command. Every command is
+    followed by 'echo <sync>' and the command is done once the sync line
+    shows up on stdout. stdout is block buffered on a pipe, so only a
+    sentinel written to stdout itself is known to come after all of the
+    command's output. Prompts and echoed input are removed from the output.
+    """
+
+    PROMPT = "ipmitool> "
+    SYNC = "__sspl_sync_"
+
+    def __init__(self, command, encoding, timeout):
+        self._encoding = encoding
+        self._timeout = timeout
+        self._seq = 0
+        self._proc = subprocess.Popen(
+            command + ["shell"], stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            env=dict(os.environ, TERM="dumb"))
+        for stream in (self._proc.stdout, self._proc.stderr):
+            flags = fcntl.fcntl(stream, fcntl.F_GETFL)
+            fcntl.fcntl(stream, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._proc.stdout, selectors.EVENT_READ)
+        self._selector.register(self._proc.stderr, selectors.EVENT_READ)
+        # Drop the start up output, fails if the shell is not supported
+        self.run(None)
+
+    def is_alive(self):
+        return self._proc.poll() is None
+
+    def run(self, subcommand):
+        """Returns the (output, error) text of one shell command line"""
+        self._seq += 1
+        sync = f"{self.SYNC}{self._seq}"
+        lines = f"echo {sync}\n" if subcommand is None else \
+            f"{subcommand}\necho {sync}\n"
+        try:
+            self._proc.stdin.write(lines.encode(self._encoding))
+            self._proc.stdin.flush()
+        except OSError as err:
+            raise IpmiShellError(f"writing to ipmitool shell failed: {err}")
+
+        # The sync line, after the prompt ipmitool printed before reading
+        # the echo command, echo adds a blank after its argument
+        marker = re.compile(b"(?:^|\n)(?:" +
+                            re.escape(self.PROMPT.encode(self._encoding)) +
+                            b")*" + re.escape(sync.encode(self._encoding)) +
+                            b" ?\r?\n")
+        out, err = bytearray(), bytearray()
+        end = time.time() + self._timeout
+        match = None
+        while match is None:
+            remaining = end - time.time()
+            if remaining <= 0:
+                raise IpmiShellError(
+                    f"no response from ipmitool shell in {self._timeout}s")
+            if not self.is_alive():
+                raise IpmiShellError("ipmitool shell exited")
+            for key, _ in self._selector.select(remaining):
+                self._read(key.fileobj, out if key.fileobj is
+                           self._proc.stdout else err)
+            match = marker.search(out)
+        # stderr is unbuffered, whatever the command wrote there is in the
+        # pipe before the sync line was flushed to stdout
+        self._read(self._proc.stderr, err)
+
+        out = out[:match.start()].decode(self._encoding, "replace")
+        err = err.decode(self._encoding, "replace")
+        return self._strip(out, subcommand, sync), err.strip()
+
+    @staticmethod
+    def _read(stream, buf):
+        while True:
+            try:
+                data = os.read(stream.fileno(), 65536)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            buf += data
+
+    def _strip(self, out, subcommand, sync):
+        """Removes prompts and echoed command lines from the output"""
+        lines = out.replace(self.PROMPT, "").split("\n")
+        if lines and subcommand is not None and \
+                lines[0].strip() == subcommand.strip():
+            lines = lines[1:]
+        return "\n".join(line for line in lines
+                         if line.strip() not in (sync, f"echo {sync}"))
+
+    def close(self):
+        self._selector.close()
+        try:
+            self._proc.stdin.write(b"exit\n")
+            self._proc.stdin.close()
+            self._proc.wait(timeout=1)
+        except Exception:
+            self._proc.kill()
+            self._proc.wait()
+
+
+class IpmiShellPool(object):
+    """Up to size shells for one ipmitool command line, shared by threads.
+
+    run() returns None whenever the shell cannot give a trustworthy
+    answer, the shell is gone or the command wrote to stderr, and the
+    caller runs the command as a process of its own instead which also
+    gives it the real exit status. After a shell failed the pool is
+    bypassed until it is reset, so hosts without a working shell do not
+    pay for starting one per command.
+    """
+
+    # Sub-commands without side effects which may run in a shell
+    SHELL_COMMANDS = ("sdr", "sensor", "sel info", "sel list", "sel elist",
+                      "sel get", "fru", "bmc info", "mc info",
+                      "channel info", "lan print", "chassis status")
+
+    def __init__(self, size, timeout, encoding):
+        self._size = size
+        self._timeout = timeout
+        self._encoding = encoding
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._command = None
+        self._generation = 0
+        self._started = 0
+        self._disabled = False
+
+    def reset(self, command=None):
+        """Closes the idle shells, the busy ones are closed when they are
+        released. Shells are started with command from now on."""
+        with self._lock:
+            self._command = command
+            self._generation += 1
+            self._started = 0
+            self._disabled = False
+        while True:
+            try:
+                _, shell = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            shell.close()
+
+    def _line(self, subcommand):
+        """Returns the shell command line for subcommand, None if it has to
+        run as a process"""
+        if not subcommand.strip().startswith(self.SHELL_COMMANDS):
+            return None
+        try:
+            args = shlex.split(subcommand)
+        except ValueError:
+            return None
+        if any('"' in arg or "\n" in arg for arg in args):
+            return None
+        return " ".join(f'"{arg}"' if not arg or " " in arg or "'" in arg
+                        else arg for arg in args)
+
+    def _acquire(self):
+        with self._lock:
+            if self._disabled or self._command is None or self._size <= 0:
+                return None, None
+            generation, command = self._generation, self._command
+            start = self._started < self._size
+            if start:
+                self._started += 1
+        if not start:
+            try:
+                idle_generation, shell = self._idle.get(timeout=self._timeout)
+            except queue.Empty:
+                return None, None
+            if idle_generation != generation:
+                shell.close()
+                return None, None
+            return idle_generation, shell
+        try:
+            return generation, IpmiShell(command, self._encoding,
+                                         self._timeout)
+        except (OSError, IpmiShellError) as err:
+            logger.info(f"IpmiShellPool, ipmitool shell not available, "
+                        f"running commands one by one: {err}")
+            self._release(generation, None)
+            return None, None
+
+    def _release(self, generation, shell):
+        with self._lock:
+            current = generation == self._generation
+            if current and shell is None:
+                self._started -= 1
+                self._disabled = True
+        if shell is None:
+            return
+        if current:
+            self._idle.put((generation, shell))
+        else:
+            shell.close()
+
+    def run(self, subcommand):
+        """Returns (output, error, 0) of subcommand, None if the caller
+        has to run it itself"""
+        line = self._line(subcommand)
+        if line is None:
+            return None
+        generation, shell = self._acquire()
+        if shell is None:
+            return None
+        try:
+            out, err = shell.run(line)
+        except IpmiShellError as ex:
+            logger.warning(f"IpmiShellPool, {ex}, restarting ipmitool shell")
+            shell.close()
+            self._release(generation, None)
+            return None
+        self._release(generation, shell)
+        if err:
+            return None
+        return out, "", 0
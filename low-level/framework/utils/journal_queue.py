@@ -0,0 +1,382 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       File backed queue implemented as a segmented append
+                    only journal
+ ****************************************************************************
+"""
+
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+from framework.utils.service_logging import logger
+
+
+class JournalQueue:
+    """Append only, segmented journal used to hold unsent messages.
+
+    Records are appended to segment files named segment-<number>.log as
+    <length><crc32><payload>. A segment is rotated once it grows past
+    segment_size and deleted as soon as the head moves past its end.
+
+    The head position (segment, offset) lives in a small mmap'ed index
+    file; the tail is the end of the last segment. Both are tracked in
+    memory so is_empty, put and get are O(1). Appends and head updates are
+    made durable in batches: every fsync_batch operations or once
+    fsync_interval seconds have passed, whichever comes first. A timer
+    syncs what is left pending when no further operation follows.
+
+    On start up only the last segment is scanned; a torn record left by a
+    crash is truncated. Messages read but not yet synced to the index are
+    delivered again after a crash, nothing is lost.
+    """
+
+    SEGMENT_PREFIX = "segment-"
+    SEGMENT_SUFFIX = ".log"
+    SEGMENT_RE = re.compile(r"^segment-(\d+)\.log$")
+    INDEX_FILE = "head.idx"
+
+    RECORD_HEADER = struct.Struct("<II")
+    INDEX = struct.Struct("<QQ")
+
+    def __init__(self, path, max_size, segment_size=8 * 1024 * 1024,
+                 fsync_batch=64, fsync_interval=0.2):
+        self._path = path
+        self._max_size = max_size
+        self._segment_size = segment_size
+        self._fsync_batch = max(fsync_batch, 1)
+        self._fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+
+        self._writer = None
+        self._reader = None
+        self._reader_segment = None
+        self._unsynced_writes = 0
+        self._unsynced_reads = 0
+        self._last_sync = time.time()
+        self._sync_timer = None
+        self._closed = False
+
+        os.makedirs(self._path, exist_ok=True)
+        self._open_index()
+        self._recover()
+
+    def _segment_path(self, segment):
+        return os.path.join(self._path, "%s%020d%s" % (
+            self.SEGMENT_PREFIX, segment, self.SEGMENT_SUFFIX))
+
+    def _list_segments(self):
+        segments = []
+        for name in os.listdir(self._path):
+            match = self.SEGMENT_RE.match(name)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def _open_index(self):
+        """Map the head index file, creating it if needed"""
+        index_path = os.path.join(self._path, self.INDEX_FILE)
+        fd = os.open(index_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < self.INDEX.size:
+                os.ftruncate(fd, self.INDEX.size)
+            self._index = mmap.mmap(fd, self.INDEX.size)
+        finally:
+            os.close(fd)
+
+    def _recover(self):
+        """Rebuild head, tail and size from the files on disk"""
+        segments = self._list_segments()
+        head_segment, head_offset = self.INDEX.unpack_from(self._index, 0)
+
+        if not segments:
+            segments = [head_segment]
+            open(self._segment_path(head_segment), "ab").close()
+
+        # Segments before the head were consumed but not yet removed
+        for segment in segments:
+            if segment < head_segment:
+                os.remove(self._segment_path(segment))
+        segments = [s for s in segments if s >= head_segment]
+        if not segments or segments[0] != head_segment:
+            # The head segment is gone, start from the oldest one left
+            if not segments:
+                segments = [head_segment]
+                open(self._segment_path(head_segment), "ab").close()
+            head_segment, head_offset = segments[0], 0
+
+        self._tail_segment = segments[-1]
+        start = head_offset if head_segment == self._tail_segment else 0
+        self._tail_offset = self._truncate_torn_record(self._tail_segment,
+                                                       start)
+        self._head_segment = head_segment
+        self._head_offset = min(head_offset, self._segment_len(head_segment))
+
+        self._size = sum(self._segment_len(s) for s in segments) - \
+            self._head_offset
+        self._write_index()
+        self._sync_index()
+        self._writer = open(self._segment_path(self._tail_segment), "ab",
+                            buffering=0)
+        logger.info("JournalQueue, recovered %s: %d segments, %d bytes queued"
+                    % (self._path, len(segments), self._size))
+
+    def _segment_len(self, segment):
+        try:
+            return os.path.getsize(self._segment_path(segment))
+        except OSError:
+            return 0
+
+    def _truncate_torn_record(self, segment, start):
+        """Scan segment from start and cut off an incomplete last record"""
+        path = self._segment_path(segment)
+        offset = start
+        with open(path, "r+b") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(self.RECORD_HEADER.size)
+                if len(header) < self.RECORD_HEADER.size:
+                    break
+                length, crc = self.RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                offset += self.RECORD_HEADER.size + length
+            if offset != os.fstat(f.fileno()).st_size:
+                logger.warning("JournalQueue, truncating torn record in %s "
+                               "at offset %d" % (path, offset))
+                f.truncate(offset)
+                os.fsync(f.fileno())
+        return offset
+
+    def _write_index(self):
+        self.INDEX.pack_into(self._index, 0, self._head_segment,
+                             self._head_offset)
+
+    def _sync_index(self):
+        self._index.flush()
+
+    def _maybe_sync(self, force=False):
+        """Batch fsync of appended records and head index updates"""
+        now = time.time()
+        pending = self._unsynced_writes + self._unsynced_reads
+        if not pending:
+            return
+        if force or pending >= self._fsync_batch or \
+                now - self._last_sync >= self._fsync_interval:
+            if self._unsynced_writes and self._writer is not None:
+                os.fsync(self._writer.fileno())
+            if self._unsynced_reads:
+                self._sync_index()
+            self._unsynced_writes = 0
+            self._unsynced_reads = 0
+            self._last_sync = now
+        elif self._sync_timer is None:
+            self._sync_timer = threading.Timer(
+                max(self._last_sync + self._fsync_interval - now, 0),
+                self._timed_sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _timed_sync(self):
+        """Syncs the operations left pending by the last put or commit"""
+        with self._lock:
+            self._sync_timer = None
+            if not self._closed:
+                self._maybe_sync(force=True)
+
+    def _rotate(self):
+        """Start a new tail segment"""
+        os.fsync(self._writer.fileno())
+        self._writer.close()
+        self._tail_segment += 1
+        self._tail_offset = 0
+        self._writer = open(self._segment_path(self._tail_segment), "ab",
+                            buffering=0)
+        self._unsynced_writes = 0
+
+    def _open_reader(self):
+        if self._reader_segment != self._head_segment:
+            if self._reader is not None:
+                self._reader.close()
+            self._reader = open(self._segment_path(self._head_segment), "rb")
+            self._reader_segment = self._head_segment
+        self._reader.seek(self._head_offset)
+        return self._reader
+
+    def _advance_segment(self):
+        """Drop the fully consumed head segment"""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+            self._reader_segment = None
+        os.remove(self._segment_path(self._head_segment))
+        self._head_segment += 1
+        self._head_offset = 0
+
+    def _read_record(self, segment, offset):
+        """Returns (payload, next (segment, offset)) or (None, position)
+        when the queue is empty at that position."""
+        while (segment, offset) != (self._tail_segment, self._tail_offset):
+            shared = segment == self._head_segment
+            if shared:
+                f = self._open_reader()
+            else:
+                f = open(self._segment_path(segment), "rb")
+            try:
+                f.seek(offset)
+                header = f.read(self.RECORD_HEADER.size)
+                if len(header) == self.RECORD_HEADER.size:
+                    length, _ = self.RECORD_HEADER.unpack(header)
+                    payload = f.read(length)
+            finally:
+                if not shared:
+                    f.close()
+            if len(header) < self.RECORD_HEADER.size:
+                # End of a rotated segment
+                segment, offset = segment + 1, 0
+                continue
+            return payload, (segment, offset + self.RECORD_HEADER.size + length)
+        return None, (segment, offset)
+
+    def _move_head(self, segment, offset, consumed):
+        """Move the head forward, removing segments left behind"""
+        while self._head_segment < segment:
+            self._advance_segment()
+        self._head_offset = offset
+        self._size -= consumed
+        if self._head_segment != self._tail_segment and \
+                self._head_offset >= self._segment_len(self._head_segment):
+            self._advance_segment()
+        self._write_index()
+        self._unsynced_reads += 1
+
+    def is_empty(self):
+        with self._lock:
+            return (self._head_segment, self._head_offset) == \
+                (self._tail_segment, self._tail_offset)
+
+    @property
+    def current_size(self):
+        return self._size
+
+    def is_full(self, size_of_item):
+        return (self._size + size_of_item) >= self._max_size
+
+    def _create_space(self, size_of_item):
+        """Drop the oldest records until size_of_item fits"""
+        dropped = 0
+        while self._size and (self._size + size_of_item) >= self._max_size:
+            payload, (segment, offset) = self._read_record(
+                self._head_segment, self._head_offset)
+            if payload is None:
+                break
+            self._move_head(segment, offset,
+                            self.RECORD_HEADER.size + len(payload))
+            dropped += 1
+        if dropped:
+            logger.debug("JournalQueue, memory usage exceeded limit, "
+                         "removed %d old messages" % dropped)
+
+    def put(self, item):
+        if isinstance(item, str):
+            item = item.encode('utf-8')
+        record = self.RECORD_HEADER.pack(len(item), zlib.crc32(item)) + item
+        with self._lock:
+            if self.is_full(len(record)):
+                self._create_space(len(record))
+            if self._tail_offset and \
+                    self._tail_offset + len(record) > self._segment_size:
+                self._rotate()
+            self._writer.write(record)
+            self._tail_offset += len(record)
+            self._size += len(record)
+            self._unsynced_writes += 1
+            self._maybe_sync()
+
+    def get(self):
+        with self._lock:
+            payload, (segment, offset) = self._read_record(
+                self._head_segment, self._head_offset)
+            if payload is None:
+                return None
+            self._move_head(segment, offset,
+                            self.RECORD_HEADER.size + len(payload))
+            self._maybe_sync()
+            return payload
+
+    def _distance(self, position):
+        """Bytes between the head and position"""
+        segment, offset = position
+        if segment == self._head_segment:
+            return offset - self._head_offset
+        distance = self._segment_len(self._head_segment) - self._head_offset
+        for middle in range(self._head_segment + 1, segment):
+            distance += self._segment_len(middle)
+        return distance + offset
+
+    def get_batch(self, max_items):
+        """Returns up to max_items (position, item) pairs from the head of
+        the journal without consuming them. Call commit with the last
+        position once the items have been handled."""
+        batch = []
+        with self._lock:
+            position = (self._head_segment, self._head_offset)
+            while len(batch) < max_items:
+                payload, position = self._read_record(*position)
+                if payload is None:
+                    break
+                batch.append((position, payload))
+        return batch
+
+    def commit(self, position):
+        """Consumes every record up to position returned by get_batch"""
+        with self._lock:
+            if position <= (self._head_segment, self._head_offset):
+                # Already evicted to make space for newer messages
+                return
+            self._move_head(position[0], position[1],
+                            self._distance(position))
+            self._maybe_sync()
+
+    def flush(self):
+        """Force pending appends and head updates to disk"""
+        with self._lock:
+            self._maybe_sync(force=True)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._maybe_sync(force=True)
+            self._closed = True
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+                self._reader_segment = None
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._index.close()
@@ -0,0 +1,298 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Keeps the state and addresses of the network interfaces
+                    up to date from RTNETLINK notifications
+ ****************************************************************************
+"""
+
+import errno
+import socket
+import struct
+import threading
+
+from framework.utils.service_logging import logger
+
+NETLINK_ROUTE = 0
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IFLA_CARRIER = 33
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFF_UP = 0x1
+
+NLMSGHDR = struct.Struct("=LHHLL")
+IFINFOMSG = struct.Struct("=BxHiII")
+IFADDRMSG = struct.Struct("=BBBBI")
+RTATTR = struct.Struct("=HH")
+
+# RFC 2863 operational states, named as 'ip link' shows them
+OPERSTATES = ("UNKNOWN", "NOTPRESENT", "DOWN", "LOWERLAYERDOWN", "TESTING",
+              "DORMANT", "UP")
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def _attributes(data, offset):
+    """Returns the rtattr type and payload pairs from offset on"""
+    attrs = {}
+    while offset + RTATTR.size <= len(data):
+        length, attr_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attrs.setdefault(attr_type, data[offset + RTATTR.size:offset + length])
+        offset += _align(length)
+    return attrs
+
+
+class LinkMonitor(object):
+    """Interface table fed by a NETLINK_ROUTE socket.
+
+    The table is loaded with a link and an address dump and kept current
+    by the link and address notifications of the kernel, read on a daemon
+    thread. When notifications were lost the table is built again from a
+    new dump and replaces the old one. Listeners are called with the
+    interface name whenever the operational state or the carrier of an
+    interface changes. There is one monitor per process.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super(LinkMonitor, cls).__new__(cls)
+                instance._setup()
+                cls._instance = instance
+            return cls._instance
+
+    def _setup(self):
+        self._lock = threading.Lock()
+        self._sock = None
+        self._thread = None
+        self._seq = 0
+        self._dumps = []
+        # Interface index to [name, operstate, carrier]
+        self._links = {}
+        # Interface index to [(family, address)]
+        self._addrs = {}
+        # (links, addrs) being loaded by the dumps in progress
+        self._reload = None
+        self._listeners = []
+
+    def start(self):
+        """Loads the interface table and starts following the kernel
+        notifications, raises OSError if netlink is not available"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW,
+                                 NETLINK_ROUTE)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+                sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR |
+                           RTMGRP_IPV6_IFADDR))
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        self._dump()
+        while self._dumps:
+            self._receive(notify=False)
+        with self._lock:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name="LinkMonitor")
+        self._thread.start()
+
+    def add_listener(self, callback):
+        """Calls callback(ifname) on every link state change"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_links(self):
+        """Returns {ifname: (operstate, address, carrier)} of all interfaces.
+        The address is the first IPv4 one, else the first IPv6 one, as
+        'ip --brief address' lists them. The carrier is 'UP' or 'DOWN',
+        'UNKNOWN' while the interface is administratively down."""
+        with self._lock:
+            links = {}
+            for index, (name, operstate, carrier) in self._links.items():
+                addrs = sorted(self._addrs.get(index, []),
+                               key=lambda addr: addr[0] != socket.AF_INET)
+                links[name] = (operstate, addrs[0][1] if addrs else "",
+                               carrier)
+            return links
+
+    def _dump(self):
+        """Requests a dump of all links and then of all addresses into a
+        new table"""
+        # A dump in progress may have lost replies too, let it finish and
+        # start over
+        self._dumps = self._dumps[:1] + [RTM_GETLINK, RTM_GETADDR]
+        if len(self._dumps) == 2:
+            self._request_dump()
+
+    def _dump_done(self):
+        """Replaces the table with the one just dumped, returns the names
+        of the interfaces whose state or carrier changed meanwhile"""
+        links, addrs = self._reload
+        self._reload = None
+        with self._lock:
+            previous = self._links
+            self._links, self._addrs = links, addrs
+        return [link[0] for index, link in links.items()
+                if index in previous and previous[index][1:] != link[1:]]
+
+    def _request_dump(self):
+        # One dump at a time, the kernel rejects a second one as busy
+        if not self._dumps:
+            return
+        if self._dumps[0] == RTM_GETLINK:
+            self._reload = ({}, {})
+        self._seq += 1
+        family = IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        self._sock.send(NLMSGHDR.pack(NLMSGHDR.size + len(family),
+                                      self._dumps[0],
+                                      NLM_F_REQUEST | NLM_F_DUMP,
+                                      self._seq, 0) + family)
+
+    def _run(self):
+        while True:
+            try:
+                self._receive(notify=True)
+            except OSError as err:
+                if err.errno != errno.ENOBUFS:
+                    logger.error(f"LinkMonitor, reading netlink failed, "
+                                 f"link events stopped: {err}")
+                    return
+                # Notifications were lost, load the table again
+                logger.warning("LinkMonitor, netlink notifications lost, "
+                               "reloading interfaces")
+                self._dump()
+
+    def _receive(self, notify):
+        data = self._sock.recv(1 << 16)
+        changed = []
+        offset = 0
+        while offset + NLMSGHDR.size <= len(data):
+            length, msg_type, _, seq, _ = NLMSGHDR.unpack_from(data, offset)
+            if length < NLMSGHDR.size:
+                break
+            body = data[offset + NLMSGHDR.size:offset + length]
+            # Dump replies only go to the table being loaded, notifications
+            # to the current one and to the one being loaded
+            tables = [] if seq else [(self._links, self._addrs)]
+            if self._reload is not None:
+                tables.append(self._reload)
+            if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                if self._dumps:
+                    self._dumps.pop(0)
+                    self._request_dump()
+                    if not self._dumps and self._reload is not None:
+                        changed.extend(self._dump_done())
+            elif msg_type in (RTM_NEWLINK, RTM_DELLINK):
+                for links, addrs in tables:
+                    name = self._update_link(msg_type, body, links, addrs)
+                    if name is not None and links is self._links:
+                        changed.append(name)
+            elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+                for _, addrs in tables:
+                    self._update_addr(msg_type, body, addrs)
+            offset += _align(length)
+
+        if notify and changed:
+            with self._lock:
+                listeners = list(self._listeners)
+            for name in changed:
+                for callback in listeners:
+                    try:
+                        callback(name)
+                    except Exception as err:
+                        logger.error(f"LinkMonitor, link event listener "
+                                     f"failed for {name}: {err}")
+
+    def _update_link(self, msg_type, body, links, addrs):
+        """Applies a link message to links and addrs, returns the interface
+        name if its state or carrier changed"""
+        if len(body) < IFINFOMSG.size:
+            return None
+        _, _, index, flags, _ = IFINFOMSG.unpack_from(body)
+        attrs = _attributes(body, IFINFOMSG.size)
+        with self._lock:
+            previous = links.get(index)
+            if msg_type == RTM_DELLINK:
+                links.pop(index, None)
+                addrs.pop(index, None)
+                return None
+            name = attrs.get(IFLA_IFNAME, b"").split(b"\0")[0].decode()
+            if not name and previous:
+                name = previous[0]
+            operstate = attrs.get(IFLA_OPERSTATE)
+            operstate = OPERSTATES[operstate[0]] \
+                if operstate and operstate[0] < len(OPERSTATES) else "UNKNOWN"
+            carrier = attrs.get(IFLA_CARRIER)
+            if not flags & IFF_UP or not carrier:
+                carrier = "UNKNOWN"
+            else:
+                carrier = "UP" if carrier[0] else "DOWN"
+            links[index] = [name, operstate, carrier]
+        if previous and previous[1:] != [operstate, carrier]:
+            return name
+        return None
+
+    def _update_addr(self, msg_type, body, addrs):
+        """Applies an address message to addrs"""
+        if len(body) < IFADDRMSG.size:
+            return
+        family, _, _, _, index = IFADDRMSG.unpack_from(body)
+        if family not in (socket.AF_INET, socket.AF_INET6):
+            return
+        attrs = _attributes(body, IFADDRMSG.size)
+        addr = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+        if not addr:
+            return
+        addr = (family, socket.inet_ntop(family, addr))
+        with self._lock:
+            known = addrs.setdefault(index, [])
+            if msg_type == RTM_DELADDR:
+                if addr in known:
+                    known.remove(addr)
+            elif addr not in known:
+                known.append(addr)
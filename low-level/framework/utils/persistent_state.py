@@ -0,0 +1,188 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Sensor state kept in memory and written to the store
+                    only when its content changed
+ ****************************************************************************
+"""
+
+import atexit
+import hashlib
+import pickle
+import threading
+import time
+
+from framework.utils.conf_utils import DATASTORE, SSPL_CONF, Conf
+from framework.utils.service_logging import logger
+
+
+class PersistentState(object):
+    """A value persisted under one store key.
+
+    save() compares a hash of the pickled value with the last one written
+    and does nothing if the content is unchanged. Changes are written at
+    most once per flush_interval seconds, the latest one wins and is
+    written by a background flusher once the interval is over, or at
+    exit. A flush_interval of 0 writes every change at once.
+    DATASTORE>state_flush_interval is the default interval.
+    """
+
+    FLUSH_INTERVAL = 'state_flush_interval'
+    RETRY_INTERVAL = 10
+
+    _pending = set()
+    _pending_lock = threading.Condition()
+    _flusher = None
+    # Flushes taken off _pending by the flusher and not done yet
+    _in_flight = 0
+
+    def __init__(self, key, store, default=None, flush_interval=None,
+                 load=True):
+        self._key = key
+        self._store = store
+        if flush_interval is None:
+            try:
+                flush_interval = float(Conf.get(SSPL_CONF,
+                    f"{DATASTORE}>{self.FLUSH_INTERVAL}", 2))
+            except (TypeError, ValueError):
+                flush_interval = 2
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._blob = None
+        self._next_flush = 0
+        self._stats = {"saves": 0, "writes": 0, "unchanged": 0}
+        self._digest = None
+        self.value = default
+        if load:
+            self.load()
+
+    def load(self, value=None):
+        """Reads the value from the store, or takes the value given as
+        already read from it. Keeps the current one if the key is not
+        there."""
+        if value is None:
+            value = self._store.get(self._key)
+        if value is not None:
+            with self._lock:
+                self._digest = self._hash(value)
+            self.value = value
+        return self.value
+
+    @staticmethod
+    def _hash(value):
+        try:
+            return hashlib.sha1(pickle.dumps(value)).digest()
+        except Exception:
+            return None
+
+    def save(self, value=None):
+        """Persists value, the current value if None. Returns False if the
+        content is the one already written or waiting to be."""
+        if value is not None:
+            self.value = value
+        blob = pickle.dumps(self.value)
+        digest = hashlib.sha1(blob).digest()
+        with self._lock:
+            self._stats["saves"] += 1
+            if digest == self._digest:
+                self._stats["unchanged"] += 1
+                return False
+            self._digest = digest
+            self._blob = blob
+            due = time.time() >= self._next_flush
+        if due:
+            self.flush()
+        else:
+            PersistentState._schedule(self)
+        return True
+
+    def flush(self):
+        """Writes the pending change now"""
+        with self._lock:
+            blob, self._blob = self._blob, None
+            if blob is None:
+                return
+            self._next_flush = time.time() + self._flush_interval
+        try:
+            self._store.put(pickle.loads(blob), self._key)
+        except Exception as err:
+            logger.error(f"PersistentState, writing {self._key} failed, "
+                         f"retrying: {err}")
+            with self._lock:
+                if self._blob is None:
+                    self._blob = blob
+                self._next_flush = time.time() + max(self._flush_interval,
+                                                     self.RETRY_INTERVAL)
+            PersistentState._schedule(self)
+            return
+        with self._lock:
+            self._stats["writes"] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    @classmethod
+    def _schedule(cls, state):
+        with cls._pending_lock:
+            cls._pending.add(state)
+            if cls._flusher is None:
+                cls._flusher = threading.Thread(target=cls._flush_due,
+                                                daemon=True,
+                                                name="PersistentState")
+                cls._flusher.start()
+            cls._pending_lock.notify()
+
+    @classmethod
+    def _flush_due(cls):
+        while True:
+            with cls._pending_lock:
+                while not cls._pending:
+                    cls._pending_lock.wait()
+                now = time.time()
+                due = [state for state in cls._pending
+                       if state._next_flush <= now]
+                cls._pending.difference_update(due)
+                cls._in_flight += len(due)
+                wait = min((state._next_flush for state in cls._pending),
+                           default=now + 1) - now
+            for state in due:
+                try:
+                    state.flush()
+                finally:
+                    with cls._pending_lock:
+                        cls._in_flight -= 1
+                        cls._pending_lock.notify_all()
+            if not due:
+                with cls._pending_lock:
+                    cls._pending_lock.wait(max(wait, 0.1))
+
+    @classmethod
+    def flush_all(cls):
+        """Writes every pending change and waits for the ones the flusher
+        is writing, at shutdown"""
+        with cls._pending_lock:
+            pending = list(cls._pending)
+            cls._pending.clear()
+        for state in pending:
+            state.flush()
+        with cls._pending_lock:
+            cls._pending_lock.wait_for(lambda: cls._in_flight == 0,
+                                       timeout=10)
+
+
+atexit.register(PersistentState.flush_all)
@@ -0,0 +1,195 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Polls the SMART health of drives in the background with
+                    a bounded number of smartctl processes per HBA
+ ****************************************************************************
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# status is one of SmartPoller.PASSED, FAILED, REMOVED or ERROR
+SmartResult = namedtuple("SmartResult", "path status error checked")
+
+PCI_ADDRESS = re.compile(r"^[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-9a-f]$")
+
+
+def drive_hba(device, sys_block="/sys/block"):
+    """Returns the PCI address of the controller of a /dev device, the
+    device name itself if it is not found"""
+    name = os.path.basename(device)
+    path = os.path.realpath(os.path.join(sys_block, name))
+    controllers = [part for part in path.split("/") if PCI_ADDRESS.match(part)]
+    return controllers[-1] if controllers else name
+
+
+class SmartPoller(object):
+    """Background 'smartctl -H --json' health checks with a result cache.
+
+    poll() starts a check of every drive whose cached result is older than
+    interval seconds, or which was marked by recheck(), and returns at
+    once. At most workers_per_hba checks run per controller and at most
+    max_workers overall. results() returns the checks completed since the
+    previous call, the caller applies them on its own thread.
+    """
+
+    PASSED = "passed"
+    FAILED = "failed"
+    REMOVED = "removed"
+    ERROR = "error"
+
+    def __init__(self, interval, workers_per_hba=2, max_workers=8,
+                 timeout=60):
+        self._interval = interval
+        self._workers_per_hba = max(workers_per_hba, 1)
+        self._timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+        self._lock = threading.Lock()
+        # Drive path to the time its cached result was taken
+        self._checked = {}
+        self._recheck = set()
+        self._running = {}
+        self._hbas = {}
+        self._done = deque()
+        # Start times of the smartctl processes of the last minute
+        self._forks = deque()
+        # Detection of failing drives
+        self._last_passed = {}
+        self._failed = set()
+        self._stats = {"checks": 0, "detections": 0,
+                       "last_detect_latency": None,
+                       "max_detect_latency": None}
+
+    def recheck(self, path=None):
+        """Checks path, all drives if None, at the next poll"""
+        with self._lock:
+            if path is None:
+                self._checked.clear()
+            else:
+                self._checked.pop(path, None)
+                self._recheck.add(path)
+
+    def forget(self, path):
+        """Drops the cached result of a removed drive"""
+        with self._lock:
+            self._checked.pop(path, None)
+            self._recheck.discard(path)
+            self._last_passed.pop(path, None)
+            self._failed.discard(path)
+
+    def poll(self, drives):
+        """Starts the due checks, drives is {path: (device, scsi)}"""
+        now = time.time()
+        with self._lock:
+            for path, (device, scsi) in drives.items():
+                if path in self._running:
+                    continue
+                checked = self._checked.get(path)
+                if checked is not None and now - checked < self._interval \
+                        and path not in self._recheck:
+                    continue
+                hba = self._hbas.get(device)
+                if hba is None:
+                    hba = self._hbas[device] = drive_hba(device)
+                if sum(1 for running in self._running.values()
+                       if running == hba) >= self._workers_per_hba:
+                    continue
+                self._running[path] = hba
+                self._recheck.discard(path)
+                self._executor.submit(self._check, path, device, scsi)
+
+    def results(self):
+        """Returns the SmartResults completed since the previous call"""
+        results = []
+        with self._lock:
+            while self._done:
+                results.append(self._done.popleft())
+        return results
+
+    def _check(self, path, device, scsi):
+        command = ["sudo", "smartctl", "-H", device, "--json"]
+        if scsi:
+            command[2:2] = ["-d", "scsi"]
+        try:
+            result = self._run(path, command)
+        except Exception as err:
+            result = SmartResult(path, self.ERROR, str(err), time.time())
+        with self._lock:
+            self._running.pop(path, None)
+            self._checked[path] = result.checked
+            self._stats["checks"] += 1
+            self._track(result)
+            self._done.append(result)
+
+    def _run(self, path, command):
+        with self._lock:
+            self._forks.append(time.time())
+        process = subprocess.run(command, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE, encoding="utf-8",
+                                 timeout=self._timeout)
+        checked = time.time()
+        if process.returncode != 0 and process.stderr.strip():
+            return SmartResult(path, self.ERROR, process.stderr.strip(),
+                               checked)
+        response = json.loads(process.stdout)
+        smartctl = response.get("smartctl", {})
+        messages = smartctl.get("messages", smartctl.get("message", []))
+        if any("No such device" in message.get("string", "")
+               for message in messages):
+            return SmartResult(path, self.REMOVED, None, checked)
+        # Without a SMART status the drive counts as faulty
+        passed = response.get("smart_status", {}).get("passed", False)
+        return SmartResult(path, self.PASSED if passed else self.FAILED,
+                           None, checked)
+
+    def _track(self, result):
+        """Records how long a drive may have been failing before the check
+        found it, the time since its last passing check"""
+        if result.status == self.PASSED:
+            self._last_passed[result.path] = result.checked
+            self._failed.discard(result.path)
+        elif result.status == self.FAILED and result.path not in self._failed:
+            self._failed.add(result.path)
+            last_passed = self._last_passed.get(result.path)
+            if last_passed is not None:
+                latency = result.checked - last_passed
+                self._stats["detections"] += 1
+                self._stats["last_detect_latency"] = latency
+                self._stats["max_detect_latency"] = max(
+                    latency, self._stats["max_detect_latency"] or 0)
+
+    def get_stats(self):
+        """Returns the smartctl processes started in the last minute, the
+        checks done and the detection latencies of failing drives"""
+        with self._lock:
+            minute_ago = time.time() - 60
+            while self._forks and self._forks[0] < minute_ago:
+                self._forks.popleft()
+            stats = dict(self._stats)
+            stats["forks_per_minute"] = len(self._forks)
+            stats["running"] = len(self._running)
+        return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
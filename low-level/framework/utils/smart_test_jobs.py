@@ -0,0 +1,228 @@
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Runs SMART self-tests of drives in the background and
+                    polls them until they complete
+ ****************************************************************************
+"""
+
+import json
+import subprocess
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from framework.utils.smart_poller import drive_hba
+
+# status is one of SmartTestJobs.PASSED, FAILED or ERROR
+SmartTestResult = namedtuple("SmartTestResult",
+                             "path serial_number status reason duration")
+
+# Result of a SCSI self-test log entry still running
+SCSI_TEST_IN_PROGRESS = 15
+# Results of a SCSI self-test log entry which found an error
+SCSI_TEST_FAILED = range(3, 8)
+
+
+class SmartTestJobs(object):
+    """Table of the SMART self-tests started with 'smartctl -t'.
+
+    submit() queues a test and returns at once. tick(), called from the
+    sensor loop, starts the queued tests, at most tests_per_enclosure at
+    a time behind one controller, and checks the running ones every
+    poll_interval seconds with 'smartctl -H -l selftest'. A test still
+    running after timeout seconds is reported as an error. smartctl runs
+    on worker threads, results() returns the tests completed since the
+    previous call.
+    """
+
+    PASSED = "passed"
+    FAILED = "failed"
+    ERROR = "error"
+
+    SMARTCTL = "/usr/sbin/smartctl"
+
+    QUEUED = "queued"
+    RUNNING = "running"
+
+    def __init__(self, tests_per_enclosure=2, poll_interval=15, timeout=900,
+                 max_workers=4):
+        self._tests_per_enclosure = max(tests_per_enclosure, 1)
+        self._poll_interval = poll_interval
+        self._timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+        self._lock = threading.Lock()
+        # Drive path to its job, in submission order
+        self._jobs = {}
+        self._done = deque()
+        self._stats = {"started": 0, "passed": 0, "failed": 0, "errors": 0}
+
+    def submit(self, path, device, serial_number, test_type="short",
+               scsi=True):
+        """Queues a test of the drive, returns False if one is already
+        queued or running"""
+        with self._lock:
+            if path in self._jobs:
+                return False
+            self._jobs[path] = {
+                "device": device,
+                "serial_number": serial_number,
+                "test_type": test_type,
+                "scsi": scsi,
+                "hba": drive_hba(device),
+                "state": self.QUEUED,
+                "busy": False,
+                "started": None,
+                "next_poll": 0
+            }
+            return True
+
+    def cancel(self, path, reason="drive removed"):
+        """Drops the test of a drive, it completes with an error"""
+        with self._lock:
+            job = self._jobs.pop(path, None)
+            if job is not None:
+                self._complete(path, job, self.ERROR, reason)
+
+    def tick(self):
+        """Starts the queued tests there is room for and polls the running
+        ones which are due, without waiting for smartctl"""
+        now = time.time()
+        with self._lock:
+            running = {}
+            for job in self._jobs.values():
+                if job["state"] == self.RUNNING:
+                    running[job["hba"]] = running.get(job["hba"], 0) + 1
+            for path, job in self._jobs.items():
+                if job["busy"]:
+                    continue
+                if job["state"] == self.QUEUED:
+                    if running.get(job["hba"], 0) >= self._tests_per_enclosure:
+                        continue
+                    running[job["hba"]] = running.get(job["hba"], 0) + 1
+                    job["state"] = self.RUNNING
+                    job["started"] = now
+                    job["busy"] = True
+                    self._stats["started"] += 1
+                    self._executor.submit(self._start, path, job)
+                elif now >= job["next_poll"]:
+                    job["busy"] = True
+                    self._executor.submit(self._poll, path, job)
+
+    def results(self):
+        """Returns the SmartTestResults completed since the previous call"""
+        results = []
+        with self._lock:
+            while self._done:
+                results.append(self._done.popleft())
+        return results
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["running"] = sum(1 for job in self._jobs.values()
+                                   if job["state"] == self.RUNNING)
+            stats["queued"] = len(self._jobs) - stats["running"]
+        return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def _command(self, job, *options):
+        command = [self.SMARTCTL]
+        command.extend(options)
+        if job["scsi"]:
+            command.extend(["-d", "scsi"])
+        command.append(job["device"])
+        return command
+
+    def _run(self, command):
+        process = subprocess.run(command, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE, encoding="utf-8",
+                                 timeout=60)
+        return process.stdout, process.stderr.strip(), process.returncode
+
+    def _start(self, path, job):
+        try:
+            response, error, returncode = self._run(
+                self._command(job, "-t", job["test_type"]))
+            # Bits 0-2 of the smartctl exit status are command, open and
+            # device errors
+            if error or returncode & 0x7:
+                lines = response.strip().splitlines()
+                self._finish(path, job, self.ERROR, error or (lines[-1]
+                             if lines else f"smartctl exit status {returncode}"))
+                return
+        except Exception as err:
+            self._finish(path, job, self.ERROR, str(err))
+            return
+        self._wait(path, job)
+
+    def _poll(self, path, job):
+        try:
+            response, _, _ = self._run(
+                self._command(job, "-H", "-l", "selftest", "--json"))
+            status = self._test_status(json.loads(response))
+        except Exception as err:
+            self._finish(path, job, self.ERROR, str(err))
+            return
+        if status is not None:
+            self._finish(path, job, *status)
+        elif time.time() - job["started"] > self._timeout:
+            self._finish(path, job, self.ERROR,
+                         f"test still running after {self._timeout}s")
+        else:
+            self._wait(path, job)
+
+    @classmethod
+    def _test_status(cls, response):
+        """Returns (status, reason) of a completed test, None if it is
+        still running"""
+        latest = response.get("scsi_self_test_0", {}).get("result", {})
+        ata_status = response.get("ata_smart_data", {}) \
+                             .get("self_test", {}).get("status", {})
+        if latest.get("value") == SCSI_TEST_IN_PROGRESS or \
+                "remaining_percent" in ata_status:
+            return None
+        if not response.get("smart_status", {}).get("passed", False):
+            return cls.FAILED, "SMART health check failed"
+        if latest.get("value") in SCSI_TEST_FAILED or \
+                ata_status.get("passed") is False:
+            return cls.FAILED, latest.get("string") or \
+                               ata_status.get("string", "self-test failed")
+        return cls.PASSED, None
+
+    def _wait(self, path, job):
+        with self._lock:
+            job["next_poll"] = time.time() + self._poll_interval
+            job["busy"] = False
+
+    def _finish(self, path, job, status, reason):
+        with self._lock:
+            # A cancelled job was completed already
+            if self._jobs.get(path) is not job:
+                return
+            del self._jobs[path]
+            self._complete(path, job, status, reason)
+
+    def _complete(self, path, job, status, reason):
+        duration = time.time() - job["started"] if job["started"] else 0
+        self._stats[{self.PASSED: "passed", self.FAILED: "failed"}.get(
+            status, "errors")] += 1
+        self._done.append(SmartTestResult(path, job["serial_number"], status,
+                                          reason, duration))
@@ -60,3 +60,21 @@ class Store(object):
         """ get keys with given prefix
         """
         raise NotImplementedError("sub class should implement this")
+
+    def put_many(self, kvs, pickled=True):
+        """Write every key, value pair of the kvs dict to store
+        """
+        for key, value in kvs.items():
+            self.put(value, key, pickled=pickled)
+
+    def get_many(self, keys):
+        """get data for several keys, returns a dict of key to value.
+        Missing keys map to None, keys that could not be read are left out
+        """
+        return {key: self.get(key) for key in keys}
+
+    def delete_many(self, keys):
+        """ delete data for given keys
+        """
+        for key in keys:
+            self.delete(key)
@@ -19,11 +19,19 @@ from configparser import ConfigParser
 
 from framework.utils.filestore import FileStore
 from framework.utils.consulstore import ConsulStore
+from framework.utils.cached_store import CachedStore
+from framework.utils.conf_utils import DATASTORE, SSPL_CONF, Conf
 from framework.base.sspl_constants import StoreTypes, SSPL_STORE_TYPE, CONSUL_HOST, CONSUL_PORT, file_store_config_path
 
 
 class StorFactory:
 
+    CACHE_ENABLED = 'cache_enabled'
+    CACHE_MAX_ENTRIES = 'cache_max_entries'
+    CACHE_DEFAULT_TTL = 'cache_default_ttl'
+    CACHE_PREFIX_TTL = 'cache_prefix_ttl'
+    CACHE_WATCH_PREFIXES = 'cache_watch_prefixes'
+
     __store = None
 
     @staticmethod
@@ -40,6 +48,7 @@ class StorFactory:
                 else:
                     raise Exception("{} type store is not supported".format(store_type))
 
+                StorFactory.__store = StorFactory._wrap_cache(StorFactory.__store)
                 return StorFactory.__store
             except Exception as serror:
                 print("Error in connecting either with file or consul store: {}".format(serror))
@@ -47,6 +56,26 @@ class StorFactory:
                 sys.exit(os.EX_USAGE)
         return StorFactory.__store
 
+    @staticmethod
+    def _wrap_cache(store):
+        """Put a write-through cache in front of store when enabled"""
+        enabled = str(Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StorFactory.CACHE_ENABLED}", "true")).lower()
+        if enabled != "true":
+            return store
+        max_entries = int(Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StorFactory.CACHE_MAX_ENTRIES}", 4096))
+        default_ttl = int(Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StorFactory.CACHE_DEFAULT_TTL}", 30))
+        prefix_ttl = Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StorFactory.CACHE_PREFIX_TTL}", {}) or {}
+        watch_prefixes = Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StorFactory.CACHE_WATCH_PREFIXES}", []) or []
+        return CachedStore(store, max_entries=max_entries,
+                           default_ttl=default_ttl,
+                           prefix_ttl={k: int(v) for k, v in prefix_ttl.items()},
+                           watch_prefixes=watch_prefixes)
+
 file_store=FileStore()
 #store based on configuration
 store=StorFactory.get_store()
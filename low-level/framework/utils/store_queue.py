@@ -21,10 +21,12 @@
 
 import os
 import sys
+import threading
 
 from framework.base.sspl_constants import DATA_PATH
-from framework.utils.conf_utils import SSPL_CONF, Conf
+from framework.utils.conf_utils import DATASTORE, SSPL_CONF, Conf
 from framework.utils.config_reader import ConfigReader
+from framework.utils.journal_queue import JournalQueue
 from framework.utils.service_logging import logger
 from framework.utils.store_factory import store
 
@@ -37,22 +39,18 @@ class StoreQueue:
 
     def __init__(self):
         self._max_size = int(Conf.get(SSPL_CONF, f"{self.PROCESSOR}>{self.LIMIT_CONSUL_MEMORY}", 50000000))
+        self._batch_sizes = {}
 
         self.cache_dir_path = os.path.join(DATA_PATH, self.CACHE_DIR_NAME)
         self.SSPL_MEMORY_USAGE = os.path.join(self.cache_dir_path, 'SSPL_MEMORY_USAGE')
-        self._current_size = store.get(self.SSPL_MEMORY_USAGE)
-        if self._current_size is None:
-            store.put(0, self.SSPL_MEMORY_USAGE)
-
         self.SSPL_MESSAGE_HEAD_INDEX = os.path.join(self.cache_dir_path, 'SSPL_MESSAGE_HEAD_INDEX')
-        self._head = store.get(self.SSPL_MESSAGE_HEAD_INDEX)
-        if self._head is None:
-            store.put(0, self.SSPL_MESSAGE_HEAD_INDEX)
-
         self.SSPL_MESSAGE_TAIL_INDEX = os.path.join(self.cache_dir_path, 'SSPL_MESSAGE_TAIL_INDEX')
-        self._tail = store.get(self.SSPL_MESSAGE_TAIL_INDEX)
-        if self._tail is None:
-            store.put(0, self.SSPL_MESSAGE_TAIL_INDEX)
+        counters = store.get_many([self.SSPL_MEMORY_USAGE,
+                                   self.SSPL_MESSAGE_HEAD_INDEX,
+                                   self.SSPL_MESSAGE_TAIL_INDEX])
+        missing = {key: 0 for key, value in counters.items() if value is None}
+        if missing:
+            store.put_many(missing)
         self.SSPL_UNSENT_MESSAGES = os.path.join(self.cache_dir_path, 'MESSAGES')
 
     @property
@@ -79,11 +77,16 @@ class StoreQueue:
     def tail(self, index):
         store.put(index, self.SSPL_MESSAGE_TAIL_INDEX)
 
+    def _update_indexes(self, **indexes):
+        """Write head, tail and size in one store operation"""
+        keys = {"head": self.SSPL_MESSAGE_HEAD_INDEX,
+                "tail": self.SSPL_MESSAGE_TAIL_INDEX,
+                "size": self.SSPL_MEMORY_USAGE}
+        store.put_many({keys[name]: value for name, value in indexes.items()})
+
     def is_empty(self):
         if self.tail == self.head:
-            self.head = 0
-            self.tail = 0
-            self.current_size = 0
+            self._update_indexes(head=0, tail=0, size=0)
             return True
         else:
             return False
@@ -91,29 +94,124 @@ class StoreQueue:
     def is_full(self, size_of_item):
         return (self.current_size + size_of_item) >= self._max_size
 
-    def _create_space(self, size_of_item, reclaimed_space=0):
-        if (self.current_size - reclaimed_space + size_of_item) >= self._max_size:
-            reclaimed_space += sys.getsizeof(self.get())
-            self._create_space(size_of_item, reclaimed_space)
-        else:
-            return
+    def _create_space(self, size_of_item):
+        reclaimed_space = 0
+        current_size = self.current_size
+        while (current_size - reclaimed_space + size_of_item) >= self._max_size:
+            item = self.get()
+            if item is None:
+                break
+            reclaimed_space += sys.getsizeof(item)
 
     def get(self):
         if self.is_empty():
             return
-        item = store.get(f"{self.SSPL_UNSENT_MESSAGES}/{self.head}")
-        store.delete(f"{self.SSPL_UNSENT_MESSAGES}/{self.head}")
-        self.head += 1
-        self.current_size -= sys.getsizeof(item)
+        head = self.head
+        item = store.get(f"{self.SSPL_UNSENT_MESSAGES}/{head}")
+        store.delete(f"{self.SSPL_UNSENT_MESSAGES}/{head}")
+        self._update_indexes(head=head + 1,
+                             size=self.current_size - sys.getsizeof(item))
         return item
 
+    def get_batch(self, max_items):
+        """Returns up to max_items (index, item) pairs from the head of the
+        queue without removing them. Call commit with the last index once
+        the items have been handled.
+
+        Missing keys, left behind by a failed put, come back as (index, None)
+        so the hole can still be committed past."""
+        head = self.head
+        tail = self.tail
+        batch = []
+        self._batch_sizes = {}
+        indexes = range(head, min(tail, head + max_items))
+        items = store.get_many(
+            [f"{self.SSPL_UNSENT_MESSAGES}/{index}" for index in indexes])
+        for index in indexes:
+            item = items.get(f"{self.SSPL_UNSENT_MESSAGES}/{index}")
+            self._batch_sizes[index] = sys.getsizeof(item)
+            batch.append((index, item))
+        return batch
+
+    def commit(self, index):
+        """Removes every item up to and including index from the queue"""
+        head = self.head
+        if index < head:
+            # Already evicted to make space for newer messages
+            return
+        reclaimed_space = 0
+        for i in range(head, index + 1):
+            reclaimed_space += self._batch_sizes.pop(i, 0)
+        store.delete_many([f"{self.SSPL_UNSENT_MESSAGES}/{i}"
+                           for i in range(head, index + 1)])
+        self._update_indexes(
+            head=index + 1,
+            size=max(self.current_size - reclaimed_space, 0))
+
     def put(self, item):
         size_of_item = sys.getsizeof(item)
         if self.is_full(size_of_item):
             logger.debug("StoreQueue, put, consul memory usage exceded limit, \
                 removing old message")
             self._create_space(size_of_item)
-        store.put(item, f"{self.SSPL_UNSENT_MESSAGES}/{self.tail}", pickled=False)
-        self.tail += 1
-        self.current_size += size_of_item
-        logger.debug("StoreQueue, put, current memory usage %s" % self.current_size)
+        tail = self.tail
+        current_size = self.current_size + size_of_item
+        store.put(item, f"{self.SSPL_UNSENT_MESSAGES}/{tail}", pickled=False)
+        self._update_indexes(tail=tail + 1, size=current_size)
+        logger.debug("StoreQueue, put, current memory usage %s" % current_size)
+
+
+class StoreQueueFactory:
+    """Returns the queue used to hold unsent messages.
+
+    DATASTORE>queue_backend selects between 'store', a queue kept as one
+    key per message in the configured Consul or File store, and 'journal',
+    a segmented append only log on the local file system.
+    """
+
+    QUEUE_BACKEND = 'queue_backend'
+    JOURNAL_SEGMENT_SIZE = 'journal_segment_size'
+    JOURNAL_FSYNC_BATCH = 'journal_fsync_batch'
+    JOURNAL_FSYNC_INTERVAL_MS = 'journal_fsync_interval_ms'
+    JOURNAL_DIR_NAME = "SSPL_UNSENT_MESSAGES_JOURNAL"
+
+    STORE = 'store'
+    JOURNAL = 'journal'
+
+    __journal = None
+    __lock = threading.Lock()
+
+    @staticmethod
+    def get_queue():
+        backend = Conf.get(SSPL_CONF,
+                           f"{DATASTORE}>{StoreQueueFactory.QUEUE_BACKEND}",
+                           StoreQueueFactory.STORE)
+        if backend == StoreQueueFactory.JOURNAL:
+            # Every module shares one journal, it keeps head and tail in memory
+            with StoreQueueFactory.__lock:
+                if StoreQueueFactory.__journal is None:
+                    StoreQueueFactory.__journal = \
+                        StoreQueueFactory._create_journal()
+            return StoreQueueFactory.__journal
+        elif backend != StoreQueueFactory.STORE:
+            logger.warning("StoreQueueFactory, unknown queue backend %s, "
+                           "using store" % backend)
+        return StoreQueue()
+
+    @staticmethod
+    def _create_journal():
+        max_size = int(Conf.get(SSPL_CONF,
+            f"{StoreQueue.PROCESSOR}>{StoreQueue.LIMIT_CONSUL_MEMORY}",
+            50000000))
+        segment_size = int(Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StoreQueueFactory.JOURNAL_SEGMENT_SIZE}",
+            8388608))
+        fsync_batch = int(Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StoreQueueFactory.JOURNAL_FSYNC_BATCH}", 64))
+        fsync_interval = int(Conf.get(SSPL_CONF,
+            f"{DATASTORE}>{StoreQueueFactory.JOURNAL_FSYNC_INTERVAL_MS}",
+            200)) / 1000
+        path = os.path.join(DATA_PATH, StoreQueueFactory.JOURNAL_DIR_NAME)
+        return JournalQueue(path, max_size, segment_size=segment_size,
+                            fsync_batch=fsync_batch,
+                            fsync_interval=fsync_interval)
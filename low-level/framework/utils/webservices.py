@@ -21,7 +21,14 @@
 """
 
 
+import bisect
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout, ConnectionError, HTTPError
 from framework.utils.service_logging import logger
 
@@ -44,20 +51,88 @@ class WebServices(object):
 
     LOOPBACK = "127.0.0.1"
 
-    def __init__(self):
+    DEFAULT_POOL_SIZE = 8
+    # Upper bounds in milliseconds of the request timing histogram buckets
+    TIMING_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, keep_alive=True):
         super(WebServices, self).__init__()
 
         self.http_methods = [self.HTTP_GET, self.HTTP_POST]
 
-    def ws_request(self, method, url, hdrs, postdata, tout):
-        """Make webservice request"""
+        # One pooled session per scheme://host:port, so each management
+        # controller keeps its own set of keep-alive connections
+        self._pool_size = max(int(pool_size), 1)
+        self._keep_alive = keep_alive
+        self._sessions = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self, endpoint):
+        """Returns the pooled session of endpoint, creating it if needed"""
+        with self._lock:
+            session = self._sessions.get(endpoint)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self._pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                # Authentication is carried in request headers, never keep
+                # cookies between unrelated requests
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                self._sessions[endpoint] = session
+            return session
+
+    def reset_session(self, endpoint=None):
+        """Drop pooled connections of endpoint, or of every endpoint"""
+        with self._lock:
+            if endpoint is None:
+                sessions = list(self._sessions.values())
+                self._sessions = {}
+            else:
+                session = self._sessions.pop(endpoint, None)
+                sessions = [session] if session else []
+        for session in sessions:
+            session.close()
+
+    def _record_timing(self, name, elapsed):
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                          "buckets": [0] * (len(self.TIMING_BUCKETS_MS) + 1)}
+                self._timings[name] = timing
+            timing["count"] += 1
+            timing["total_ms"] += elapsed_ms
+            timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+            timing["buckets"][bisect.bisect_left(self.TIMING_BUCKETS_MS,
+                                                 elapsed_ms)] += 1
+
+    def get_timing_stats(self):
+        """Returns per request histograms of response times. buckets[i]
+        counts requests that took up to TIMING_BUCKETS_MS[i] milliseconds,
+        the last bucket counts the slower ones."""
+        with self._lock:
+            return {name: dict(timing, buckets=list(timing["buckets"]))
+                    for name, timing in self._timings.items()}
+
+    def ws_request(self, method, url, hdrs, postdata, tout, stat_name=None):
+        """Make webservice request. stat_name is the name response times
+        are recorded under, defaults to the path of url."""
         wsresponse = None
+        parts = urlsplit(url)
+        endpoint = f"{parts.scheme}://{parts.netloc}"
+        requester = self._get_session(endpoint) if self._keep_alive \
+                        else requests
+        start = time.monotonic()
 
         try:
             if method == self.HTTP_GET:
-                wsresponse = requests.get(url, headers=hdrs, timeout=tout)
+                wsresponse = requester.get(url, headers=hdrs, timeout=tout)
             elif method == self.HTTP_POST:
-                wsresponse = requests.post(url, headers=hdrs, data=postdata,
+                wsresponse = requester.post(url, headers=hdrs, data=postdata,
                                timeout=tout)
 
             wsresponse.raise_for_status()
@@ -66,6 +141,11 @@ class WebServices(object):
 
             errstr = str(err)
 
+            if isinstance(err, (ConnectionError, Timeout)) and self._keep_alive:
+                # Pooled connections to an unreachable controller are of no
+                # use, start afresh on the next request
+                self.reset_session(endpoint)
+
             if not wsresponse:
                 wsresponse = requests.Response()
 
@@ -106,12 +186,18 @@ class WebServices(object):
                         ", defaulting to err {2}"\
                         .format(url,err,wsresponse.status_code))
 
+        finally:
+            self._record_timing(f"{method} {endpoint}{stat_name or parts.path}",
+                                time.monotonic() - start)
+
         return wsresponse
 
-    def ws_get(self, url, headers, timeout):
+    def ws_get(self, url, headers, timeout, stat_name=None):
         """Webservice GET request"""
-        return  self.ws_request(self.HTTP_GET, url, headers, None, timeout)
+        return  self.ws_request(self.HTTP_GET, url, headers, None, timeout,
+                                stat_name)
 
-    def ws_post(self, url, headers, postdata, timeout):
+    def ws_post(self, url, headers, postdata, timeout, stat_name=None):
         """Webservice POST request"""
-        return self.ws_request(self.HTTP_POST, url, headers, postdata, timeout)
+        return self.ws_request(self.HTTP_POST, url, headers, postdata, timeout,
+                               stat_name)
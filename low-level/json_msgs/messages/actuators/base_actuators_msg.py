@@ -21,12 +21,9 @@
 """
 
 import os
-import json
-from jsonschema import Draft3Validator
-from jsonschema import validate
 
 from json_msgs.messages.base_msg import BaseMsg
-from json_msgs.schemas import actuators
+from json_msgs.messages.schema_validator import SchemaValidator
 from framework.base.sspl_constants import RESOURCE_PATH
 
 class BaseActuatorMsg(BaseMsg):
@@ -40,17 +37,13 @@ class BaseActuatorMsg(BaseMsg):
 
 
     def __init__(self):
-        """Reads in the json schema for all actuator response messages"""
+        """Looks up the compiled json schema for all actuator response messages"""
         super(BaseActuatorMsg, self).__init__()
 
-        # Read in the schema for validating messages
-        fileName = os.path.join(RESOURCE_PATH + '/actuators',
-                                self.JSON_ACTUATOR_SCHEMA)
-        with open(fileName, 'r') as f:
-            self._schema = json.load(f)
-
-        # Validate the schema
-        Draft3Validator.check_schema(self._schema)
+        # The schema is read and compiled once per process
+        self._schema_file = os.path.join(RESOURCE_PATH + '/actuators',
+                                         self.JSON_ACTUATOR_SCHEMA)
+        SchemaValidator.get_validator(self._schema_file)
 
     def validateMsg(self, _jsonMsg):
         """Validate the json message against the schema"""
@@ -59,5 +52,5 @@ class BaseActuatorMsg(BaseMsg):
         self.prepare_message(_jsonMsg, "actuator_response_type")
 
         _jsonMsg = self.normalize_kv(_jsonMsg)
-        validate(_jsonMsg, self._schema)
+        SchemaValidator.validate(_jsonMsg, self._schema_file)
         return _jsonMsg
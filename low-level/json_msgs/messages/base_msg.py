@@ -21,6 +21,7 @@
 """
 
 import abc
+from framework.base.internal_msg import InternalMsg
 from framework.utils.service_logging import logger
 from framework.utils.conf_utils import (GLOBAL_CONF, SITE_ID_KEY,
         RACK_ID_KEY, NODE_ID_KEY, CLUSTER_ID_KEY, Conf)
@@ -45,6 +46,13 @@ class BaseMsg(metaclass=abc.ABCMeta):
     def getJson(self):
         raise NotImplementedError("Subclasses should implement this!")
 
+    def getMsg(self):
+        """Return the validated message as an InternalMsg for the internal
+        message queues, it is serialized once when transmitted"""
+        # validateMsg returns a new dict, later changes to this message
+        #  object do not leak into messages already queued
+        return InternalMsg(self.validateMsg(self._json))
+
     def prepare_message(self, jsonMsg, message_type):
         """Adds all common key fields to the JsonMsg"""
         try:
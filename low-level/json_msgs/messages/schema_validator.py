@@ -0,0 +1,139 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Process wide registry of compiled JSON schema validators
+                    shared by all transmitted JSON messages
+ ****************************************************************************
+"""
+
+import itertools
+import json
+import logging
+import threading
+
+from jsonschema import Draft3Validator
+from jsonschema.validators import validator_for
+
+from framework.utils.conf_utils import SSPL_CONF, Conf
+from framework.utils.service_logging import logger
+
+
+class SchemaValidator(object):
+    """Loads each schema file once and hands out its compiled validator.
+
+    Validation can be sampled through the MESSAGE_VALIDATION section of the
+    configuration file:
+        mode: all    - validate every message (default)
+        mode: sample - validate one message out of every 'sample_rate'
+        mode: debug  - validate only while debug logging is enabled
+    """
+
+    # Section and keys in configuration file
+    MESSAGE_VALIDATION = "MESSAGE_VALIDATION"
+    MODE = "mode"
+    SAMPLE_RATE = "sample_rate"
+
+    MODE_ALL = "all"
+    MODE_SAMPLE = "sample"
+    MODE_DEBUG = "debug"
+
+    _validators = {}
+    _counters = {}
+    _lock = threading.Lock()
+
+    _mode = None
+    _sample_rate = 1
+
+    @classmethod
+    def get_validator(cls, schema_file):
+        """Returns the compiled validator for schema_file, loading it once"""
+        validator = cls._validators.get(schema_file)
+        if validator is not None:
+            return validator
+
+        with cls._lock:
+            validator = cls._validators.get(schema_file)
+            if validator is None:
+                with open(schema_file, 'r') as f:
+                    _schema = f.read()
+
+                # Remove tabs and newlines
+                schema = json.loads(' '.join(_schema.split()))
+
+                # Validate the schema
+                Draft3Validator.check_schema(schema)
+
+                validator = validator_for(schema)(schema)
+                cls._counters[schema_file] = itertools.count()
+                cls._validators[schema_file] = validator
+                logger.debug("SchemaValidator, loaded schema: %s" % schema_file)
+        return validator
+
+    @classmethod
+    def get_schema(cls, schema_file):
+        """Returns the parsed schema for schema_file"""
+        return cls.get_validator(schema_file).schema
+
+    @classmethod
+    def validate(cls, jsonMsg, schema_file):
+        """Validate jsonMsg against schema_file according to the sampling
+        mode. Raises jsonschema.ValidationError on an invalid message."""
+        validator = cls.get_validator(schema_file)
+        if cls._should_validate(schema_file):
+            validator.validate(jsonMsg)
+
+    @classmethod
+    def _should_validate(cls, schema_file):
+        """Returns True if the current message is to be validated"""
+        if cls._mode is None:
+            cls._read_config()
+
+        if cls._mode == cls.MODE_SAMPLE:
+            return next(cls._counters[schema_file]) % cls._sample_rate == 0
+        elif cls._mode == cls.MODE_DEBUG:
+            return logger.isEnabledFor(logging.DEBUG)
+        return True
+
+    @classmethod
+    def _read_config(cls):
+        """Read the validation mode and sampling rate"""
+        mode = cls.MODE_ALL
+        sample_rate = 1
+        try:
+            mode = str(Conf.get(SSPL_CONF,
+                                f"{cls.MESSAGE_VALIDATION}>{cls.MODE}",
+                                cls.MODE_ALL)).lower()
+            sample_rate = int(Conf.get(SSPL_CONF,
+                                       f"{cls.MESSAGE_VALIDATION}>{cls.SAMPLE_RATE}",
+                                       1))
+        except Exception as ex:
+            logger.error("SchemaValidator, _read_config: %r" % ex)
+
+        if mode not in (cls.MODE_ALL, cls.MODE_SAMPLE, cls.MODE_DEBUG):
+            logger.warning("SchemaValidator, invalid validation mode '%s', "
+                           "validating all messages" % mode)
+            mode = cls.MODE_ALL
+        cls._sample_rate = max(sample_rate, 1)
+        cls._mode = mode
+
+    @classmethod
+    def clear(cls):
+        """Drop all compiled validators and re-read the configuration"""
+        with cls._lock:
+            cls._validators.clear()
+            cls._counters.clear()
+            cls._mode = None
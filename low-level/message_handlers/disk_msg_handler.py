@@ -257,7 +257,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         drive = self._drvmngr_drives[serial_number]
 
                         # Obtain json message containing all relevant data
-                        internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getJson()
+                        internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getMsg()
 
                         # Send the json message to the message processor to transmit out
                         self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -275,7 +275,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 elif self._drvmngr_drives.get(serial_number) is not None:
                     drive = self._drvmngr_drives[serial_number]
                     # Obtain json message containing all relevant data
-                    internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getJson()
+                    internal_json_msg = drive.toDriveMngrJsonMsg(uuid=uuid).getMsg()
 
                     # Send the json message to the message processor to transmit out
                     self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -299,7 +299,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                         drive = self._hpi_drives[serial_number]
 
                         # Obtain json message containing all relevant data
-                        internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getJson()
+                        internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getMsg()
 
                         # Send the json message to the message processor to transmit out
                         self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -317,7 +317,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 elif self._hpi_drives.get(serial_number) is not None:
                     drive = self._hpi_drives[serial_number]
                     # Obtain json message containing all relevant data
-                    internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getJson()
+                    internal_json_msg = drive.toHPIjsonMsg(uuid=uuid).getMsg()
 
                     # Send the json message to the message processor to transmit out
                     self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -365,7 +365,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Handle simulating an expander reset"""
         # Send the expander reset message
         expanderResetMsg = ExpanderResetMsg()
-        internal_json_msg = expanderResetMsg.getJson()
+        internal_json_msg = expanderResetMsg.getMsg()
 
         # Send the json message to the message processor to transmit out
         self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -377,7 +377,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("EMPTY_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getMsg()
 
             # Send the json message to the message processor to transmit out
             self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -389,7 +389,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("OK_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getMsg()
 
             # Send the json message to the message processor to transmit out
             self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -402,7 +402,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("EMPTY_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getMsg()
 
             # Send the json message to the message processor to transmit out
             self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -415,7 +415,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             json_msg = drive.toHPIjsonMsg()
             json_msg.setDiskPowered(False)
             json_msg.setDiskInstalled(False)
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getMsg()
 
             # Send the json message to the message processor to transmit out
             self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -429,7 +429,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Obtain json message containing all relevant data
             json_msg = drive.toDriveMngrJsonMsg()
             json_msg.setStatus("OK_None")
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getMsg()
 
             # Send the json message to the message processor to transmit out
             self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -442,7 +442,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             json_msg = drive.toHPIjsonMsg()
             json_msg.setDiskPowered(True)
             json_msg.setDiskInstalled(True)
-            internal_json_msg = json_msg.getJson()
+            internal_json_msg = json_msg.getMsg()
 
             # Send the json message to the message processor to transmit out
             self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -474,7 +474,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Transmit all drivemanager data for every drive"""
         for drive in self._drvmngr_drives:
             # Obtain json message containing all relevant data
-            internal_json_msg = drive.toDriveMngrJsonMsg().getJson()
+            internal_json_msg = drive.toDriveMngrJsonMsg().getMsg()
 
             # Send the json message to the message processor to transmit out
             self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -483,7 +483,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Transmit all HPI data for every drive"""
         for drive in self._hpi_drives:
             # Obtain json message containing all relevant data
-            internal_json_msg = drive.toHPIjsonMsg().getJson()
+            internal_json_msg = drive.toHPIjsonMsg().getMsg()
 
             # Send the json message to the message processor to transmit out
             self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -551,7 +551,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             self._drvmngr_drives[serial_number] = drive
 
         # Obtain json message containing all relevant data
-        internal_json_msg = drive.toDriveMngrJsonMsg().getJson()
+        internal_json_msg = drive.toDriveMngrJsonMsg().getMsg()
 
         # Send the json message to the message processor to transmit out
         self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -592,7 +592,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         self._hpi_drives[serial_number] = drive
 
         # Obtain json message containing all relevant data
-        internal_json_msg = drive.toHPIjsonMsg().getJson()
+        internal_json_msg = drive.toHPIjsonMsg().getMsg()
 
         # Send the json message to the message processor to transmit out
         self._log_debug(f"_process_msg, internal_json_msg: {internal_json_msg}")
@@ -609,7 +609,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 drivemngr_drive.set_drive_num(drive.get_drive_num())
 
                 # Obtain json message containing all relevant data
-                internal_json_msg = drivemngr_drive.toDriveMngrJsonMsg().getJson()
+                internal_json_msg = drivemngr_drive.toDriveMngrJsonMsg().getMsg()
 
                 # Send the json message to the message processor to transmit out
                 self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -725,7 +725,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 self._hpi_drives[serial_number] = drive
 
                 # Obtain json message containing all relevant data
-                internal_json_msg = drive.toHPIjsonMsg().getJson()
+                internal_json_msg = drive.toHPIjsonMsg().getMsg()
 
                 # Send the json message to the message processor to transmit out
                 self._log_debug(f"_process_hpi_response_ZBX_NOTPRESENT, internal_json_msg: {internal_json_msg}")
@@ -779,8 +779,8 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
             json_dict = {}
             for serial_number, drive in list(self._hpi_drives.items()):
                 # Obtain json message containing all relevant HPI data
-                hpi_msg = drive.toHPIjsonMsg().getJson()
-                hpi_json_msg = json.loads(hpi_msg).get("message").get("sensor_response_type").get("disk_status_hpi")
+                hpi_msg = drive.toHPIjsonMsg().getMsg()
+                hpi_json_msg = dict(hpi_msg.get("message").get("sensor_response_type").get("disk_status_hpi"))
 
                 status = "N/A"
                 reason = "N/A"
@@ -882,7 +882,7 @@ class DiskMsgHandler(ScheduledModuleThread, InternalMsgQ):
         """Create and transmit an expander reset JSON msg"""
         # Build JSON message, currently no data but following same pattern
         expanderResetMsg = ExpanderResetMsg()
-        internal_json_msg = expanderResetMsg.getJson()
+        internal_json_msg = expanderResetMsg.getMsg()
 
         # Send the json message to the message processor to transmit out
         self._write_internal_msgQ(EgressProcessor.name(), internal_json_msg)
@@ -20,6 +20,7 @@
 """
 
 import json
+import threading
 import time
 import os
 
@@ -161,6 +162,9 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
         self.raid_sensor_data = None
         self.sensor_type = None
         self._epoch_time = str(int(time.time()))
+        # Event queued with the pending link event, set once the module
+        # thread has handled it or the module queue has dropped it
+        self._link_done = None
         self._raid_drives = []
         self._raid_device = "N/A"
         self.os_sensor_type = {
@@ -271,19 +275,21 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 from sensors.INode_data import INodeData
                 self._node_sensor = self._queryUtility(INodeData)()
                 self._log_debug("_node_sensor name: %s" % self._node_sensor.name())
+                # Send the interface alerts as soon as a link changes,
+                # the transmit interval then only updates the counters
+                self._node_sensor.watch_links(self._link_changed)
 
             # Delay for the desired interval if it's greater than zero
             if self._transmit_interval > 0:
                 logger.debug("self._transmit_interval:{}".format(self._transmit_interval))
-                timer = self._transmit_interval
-                while timer > 0:
-                    # See if the message queue contains an entry and process
-                    jsonMsg, _ = self._read_my_msgQ_noWait()
+                deadline = {"transmit": time.time() + self._transmit_interval}
+                while True:
+                    # Serve requests as they arrive until the interval is over
+                    jsonMsg, _, due = self.wait_msg_or_deadlines(deadline)
                     if jsonMsg is not None:
                         self._process_msg(jsonMsg)
-
-                    time.sleep(1)
-                    timer -= 1
+                    if due:
+                        break
 
                 # Generate the JSON messages with data from the node and transmit on regular interval
                 self._generate_host_update()
@@ -325,6 +331,11 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             self._uuid = jsonMsg.get("sspl_ll_msg_header").get("uuid")
             self._log_debug("_processMsg, uuid: %s" % self._uuid)
 
+        if jsonMsg.get("nw_link_event") is not None:
+            self._link_done.set()
+            self._generate_if_data()
+            return
+
         if jsonMsg.get("sensor_request_type") is not None and \
            jsonMsg.get("sensor_request_type").get("node_data") is not None and \
            jsonMsg.get("sensor_request_type").get("node_data").get("sensor_type") is not None:
@@ -404,6 +415,17 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         # ... handle other node sensor message types
 
+    def _link_changed(self, interface):
+        """Queues a link event for the module thread, called on the link
+        monitor thread. Events arriving before the queued one is handled
+        are covered by it, unless the queue dropped it."""
+        if self._link_done is not None and not self._link_done.is_set():
+            return
+        self._link_done = threading.Event()
+        logger.debug(f"NodeDataMsgHandler, link state of {interface} changed")
+        self._write_internal_msgQ(self.name(), {"nw_link_event": interface},
+                                  self._link_done)
+
     def _update_devicename_sn_dict(self, jsonMsg):
         """Update the dict of device names to serial numbers"""
         drive_byid = jsonMsg.get("drive_byid")
@@ -478,7 +500,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     hostUpdateMsg.set_uuid(self._uuid)
-                jsonMsg = hostUpdateMsg.getJson()
+                jsonMsg = hostUpdateMsg.getMsg()
                 # Transmit it to message processor
                 self.host_sensor_data = jsonMsg
                 self.os_sensor_type["memory_usage"] = self.host_sensor_data
@@ -513,7 +535,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     hostUpdateMsg.set_uuid(self._uuid)
-                jsonMsg = hostUpdateMsg.getJson()
+                jsonMsg = hostUpdateMsg.getMsg()
                 # Transmit it to message processor
                 self.host_sensor_data = jsonMsg
                 self.os_sensor_type["memory_usage"] = self.host_sensor_data
@@ -544,7 +566,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
         # Add in uuid if it was present in the json request
         if self._uuid is not None:
             localMountDataMsg.set_uuid(self._uuid)
-        jsonMsg = localMountDataMsg.getJson()
+        jsonMsg = localMountDataMsg.getMsg()
 
         # Transmit it to message processor
         self._write_internal_msgQ(EgressProcessor.name(), jsonMsg)
@@ -615,7 +637,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     cpuDataMsg.set_uuid(self._uuid)
-                jsonMsg = cpuDataMsg.getJson()
+                jsonMsg = cpuDataMsg.getMsg()
                 self.cpu_sensor_data = jsonMsg
                 self.os_sensor_type["cpu_usage"] = self.cpu_sensor_data
 
@@ -654,7 +676,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
                 # Add in uuid if it was present in the json request
                 if self._uuid is not None:
                     cpuDataMsg.set_uuid(self._uuid)
-                jsonMsg = cpuDataMsg.getJson()
+                jsonMsg = cpuDataMsg.getMsg()
                 self.cpu_sensor_data = jsonMsg
                 self.os_sensor_type["cpu_usage"] = self.cpu_sensor_data
 
@@ -676,7 +698,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
         # Add in uuid if it was present in the json request
         if self._uuid is not None:
             ifDataMsg.set_uuid(self._uuid)
-        jsonMsg = ifDataMsg.getJson()
+        jsonMsg = ifDataMsg.getMsg()
         self.if_sensor_data = jsonMsg
         self.os_sensor_type[sensor_type] = self.if_sensor_data
 
@@ -868,7 +890,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 diskSpaceAlertMsg.set_uuid(self._uuid)
-            jsonMsg = diskSpaceAlertMsg.getJson()
+            jsonMsg = diskSpaceAlertMsg.getMsg()
             self.disk_sensor_data = jsonMsg
             self.os_sensor_type["disk_space"] = self.disk_sensor_data
 
@@ -897,7 +919,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 diskSpaceAlertMsg.set_uuid(self._uuid)
-            jsonMsg = diskSpaceAlertMsg.getJson()
+            jsonMsg = diskSpaceAlertMsg.getMsg()
             self.disk_sensor_data = jsonMsg
             self.os_sensor_type["disk_space"] = self.disk_sensor_data
 
@@ -930,7 +952,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 raidDataMsg.set_uuid(self._uuid)
-            jsonMsg = raidDataMsg.getJson()
+            jsonMsg = raidDataMsg.getMsg()
             self.raid_sensor_data = jsonMsg
             self.os_sensor_type["raid_data"] = self.raid_sensor_data
 
@@ -975,7 +997,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
             # Add in uuid if it was present in the json request
             if self._uuid is not None:
                 RAIDintegrityMsg.set_uuid(self._uuid)
-            jsonMsg = RAIDintegrityMsg.getJson()
+            jsonMsg = RAIDintegrityMsg.getMsg()
             self.raid_integrity_data = jsonMsg
             self.os_sensor_type["raid_integrity"] = self.raid_integrity_data
 
@@ -997,7 +1019,7 @@ class NodeDataMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         if self._uuid is not None:
             node_ipmi_data_msg.set_uuid(self._uuid)
-        jsonMsg = node_ipmi_data_msg.getJson()
+        jsonMsg = node_ipmi_data_msg.getMsg()
         self._write_internal_msgQ(EgressProcessor.name(), jsonMsg)
 
     def suspend(self):
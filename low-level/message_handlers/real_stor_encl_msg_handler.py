@@ -209,7 +209,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         real_stor_disk_data_msg = \
             RealStorDiskDataMsg(host_name, alert_type, alert_id, severity, info, specific_info)
-        json_msg = real_stor_disk_data_msg.getJson()
+        json_msg = real_stor_disk_data_msg.getMsg()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._disk_sensor_message = json_msg
@@ -226,7 +226,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         real_stor_psu_data_msg = \
             RealStorPSUDataMsg(host_name, alert_type, alert_id, severity, info, specific_info)
-        json_msg = real_stor_psu_data_msg.getJson()
+        json_msg = real_stor_psu_data_msg.getMsg()
 
         # Saves the json message in memory to serve sspl CLI sensor request
         self._psu_sensor_message = json_msg
@@ -243,7 +243,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         real_stor_fan_data_msg = \
             RealStorFanDataMsg(host_name, alert_type, alert_id, severity, info, specific_info)
-        json_msg = real_stor_fan_data_msg.getJson()
+        json_msg = real_stor_fan_data_msg.getMsg()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._fan_module_sensor_message = json_msg
@@ -262,7 +262,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         real_stor_controller_data_msg = \
             RealStorControllerDataMsg(host_name, alert_type, alert_id, severity, info,
                                       specific_info)
-        json_msg = real_stor_controller_data_msg.getJson()
+        json_msg = real_stor_controller_data_msg.getMsg()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._controller_sensor_message = json_msg
@@ -281,7 +281,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         real_stor_expander_data_msg = \
             RealStorSideplaneExpanderDataMsg(host_name, alert_type, alert_id, severity, info,
                                              specific_info)
-        json_msg = real_stor_expander_data_msg.getJson()
+        json_msg = real_stor_expander_data_msg.getMsg()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._expander_sensor_message = json_msg
@@ -300,7 +300,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
         real_stor_logical_volume_data_msg = \
             RealStorLogicalVolumeDataMsg(host_name, alert_type, alert_id, severity, info,
                                       specific_info)
-        json_msg = real_stor_logical_volume_data_msg.getJson()
+        json_msg = real_stor_logical_volume_data_msg.getMsg()
 
         # save the json message in memory to serve sspl CLI sensor request
         self._logical_volume_sensor_message = json_msg
@@ -318,7 +318,7 @@ class RealStorEnclMsgHandler(ScheduledModuleThread, InternalMsgQ):
 
         real_stor_encl_msg = RealStorEnclDataMsg(host_name, alert_type, alert_id, severity,
                                                 info, specific_info)
-        json_msg = real_stor_encl_msg.getJson()
+        json_msg = real_stor_encl_msg.getMsg()
         self._enclosure_message = json_msg
         self._fru_type[sensor_type] = self._enclosure_message
         self._write_internal_msgQ(EgressProcessor.name(), json_msg, self._event)
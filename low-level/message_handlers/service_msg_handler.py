@@ -220,7 +220,7 @@ class ServiceMsgHandler(ScheduledModuleThread, InternalMsgQ):
         elif "sensor_request_type" in jsonMsg and \
             "service_status_alert" in jsonMsg["sensor_request_type"]:
             logger.debug(f"Received alert from ServiceMonitor : {jsonMsg}")
-            jsonMsg1 = ServiceMonitorMsg(jsonMsg["sensor_request_type"]).getJson()
+            jsonMsg1 = ServiceMonitorMsg(jsonMsg["sensor_request_type"]).getMsg()
             self._write_internal_msgQ("EgressProcessor", jsonMsg1)
 
         # ... handle other service message types
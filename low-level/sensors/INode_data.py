@@ -27,3 +27,6 @@ class INodeData(Interface):
 
     def read_data(self, subset="All", debug=False):
         """Notifies module to return data based on a subset"""
+
+    def watch_links(self, callback):
+        """Calls callback(interface) when a network link changes"""
@@ -30,6 +30,7 @@ import subprocess
 import threading
 import time
 import uuid
+from collections import deque
 from datetime import datetime, timedelta
 
 import dbus
@@ -44,8 +45,12 @@ from framework.base.sspl_constants import cs_products
 from framework.messaging.egress_processor import \
     EgressProcessor
 from framework.utils.conf_utils import DATA_PATH_KEY, SSPL_CONF, Conf
+from framework.utils.glib_loop import GLibLoop
+from framework.utils.persistent_state import PersistentState
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
+from framework.utils.smart_poller import SmartPoller
+from framework.utils.smart_test_jobs import SmartTestJobs
 from framework.utils.store_factory import file_store
 from json_msgs.messages.actuators.ack_response import AckResponseMsg
 from message_handlers.disk_msg_handler import DiskMsgHandler
@@ -66,6 +71,12 @@ class DiskMonitor(SensorThread, InternalMsgQ):
     DISKMONITOR        = SENSOR_NAME.upper()
     SMART_TEST_INTERVAL= 'smart_test_interval'
     SMART_ON_START     = 'run_smart_on_start'
+    SMART_HEALTH_INTERVAL = 'smart_health_interval'
+    SMART_WORKERS_PER_HBA = 'smart_workers_per_hba'
+    SMART_MAX_WORKERS  = 'smart_max_workers'
+    SMART_TESTS_PER_ENCLOSURE = 'smart_tests_per_enclosure'
+    SMART_TEST_POLL_INTERVAL = 'smart_test_poll_interval'
+    SMART_TEST_TIMEOUT = 'smart_test_timeout'
     SYSTEM_INFORMATION = 'SYSTEM_INFORMATION'
     SETUP              = 'setup'
 
@@ -93,6 +104,12 @@ class DiskMonitor(SensorThread, InternalMsgQ):
     SMARTCTL_PASSED_RESPONSE = "SMART overall-health self-assessment test result: PASSED"
     UDISKS2_UNAVAILABLE = "org.freedesktop.UDisks2 was not provided"
 
+    # Seconds between logs of the SMART polling statistics
+    SMART_STATS_LOG_INTERVAL = 300
+
+    # Seconds between the starts of the SMART tests run at regular intervals
+    SMART_TEST_STAGGER = 10
+
     @staticmethod
     def name():
         """@return: name of the module."""
@@ -117,6 +134,10 @@ class DiskMonitor(SensorThread, InternalMsgQ):
         self._hpi_base_dir = "/tmp/dcs/hpi"
         self._start_delay = 10
 
+        # D-Bus signals received on the shared GLib loop thread
+        self._dbus_signals = deque()
+        self._loop = None
+
 
 
     def initialize(self, conf_reader, msgQlist, product):
@@ -137,6 +158,25 @@ class DiskMonitor(SensorThread, InternalMsgQ):
         self._smart_supported = self._is_smart_supported()
         self._log_debug(f"DiskMonitor, SMART supported: {self._smart_supported}")
 
+        # SMART health checks run in the background, a drive is checked
+        # again once its result is smart_health_interval seconds old
+        self._smart_poller = SmartPoller(
+            int(Conf.get(SSPL_CONF, f"{self.DISKMONITOR}>{self.SMART_HEALTH_INTERVAL}", 60)),
+            int(Conf.get(SSPL_CONF, f"{self.DISKMONITOR}>{self.SMART_WORKERS_PER_HBA}", 2)),
+            int(Conf.get(SSPL_CONF, f"{self.DISKMONITOR}>{self.SMART_MAX_WORKERS}", 8)))
+        self._next_smart_stats_tm = time.time() + self.SMART_STATS_LOG_INTERVAL
+
+        # SMART self-tests requested on SAS drives run in the background,
+        # smart_tests_per_enclosure at a time behind one controller
+        self._smart_tests = SmartTestJobs(
+            int(Conf.get(SSPL_CONF, f"{self.DISKMONITOR}>{self.SMART_TESTS_PER_ENCLOSURE}", 2)),
+            int(Conf.get(SSPL_CONF, f"{self.DISKMONITOR}>{self.SMART_TEST_POLL_INTERVAL}", 15)),
+            int(Conf.get(SSPL_CONF, f"{self.DISKMONITOR}>{self.SMART_TEST_TIMEOUT}", 900)))
+
+        # Drives waiting for their staggered SMART test
+        self._staggered_smart_tests = deque()
+        self._next_staggered_smart_tm = 0
+
         # Dict of drives by-id symlink from systemd
         self._drive_by_id = {}
 
@@ -173,11 +213,11 @@ class DiskMonitor(SensorThread, InternalMsgQ):
         self.server_cache = self.vol_ras + "server/"
         self.disk_cache_path = self.server_cache + "systemd_watchdog/disks/disks.json"
 
-        # Existing drives
-        self._existing_drive = store.get(self.disk_cache_path)
-        if self._existing_drive is None:
-            self._existing_drive = {}
-            store.put(self._existing_drive, self.disk_cache_path)
+        # Existing drives, written to the cache only when they change
+        self._drive_state = PersistentState(self.disk_cache_path, store,
+                                            default={})
+        self._existing_drive = self._drive_state.value
+        self._drive_state.save(self._existing_drive)
 
 
         # Integrate into the main dbus loop to catch events
@@ -235,9 +275,12 @@ class DiskMonitor(SensorThread, InternalMsgQ):
             self._disk_manager = Interface(disk_systemd,
                 dbus_interface='org.freedesktop.DBus.ObjectManager')
 
-            # Assign callbacks to all devices to capture signals
-            self._disk_manager.connect_to_signal('InterfacesAdded', self._interface_added)
-            self._disk_manager.connect_to_signal('InterfacesRemoved', self._interface_removed)
+            # Assign callbacks to all devices to capture signals, they are
+            #  delivered on the shared GLib loop thread and handled here
+            self._disk_manager.connect_to_signal('InterfacesAdded',
+                self._queue_signal(self._interface_added))
+            self._disk_manager.connect_to_signal('InterfacesRemoved',
+                self._queue_signal(self._interface_removed))
 
             # Notify DiskMsgHandler of available drives and schedule SMART tests
             self._init_drives()
@@ -255,14 +298,12 @@ class DiskMonitor(SensorThread, InternalMsgQ):
                         self._send_msg(self.DISK_INSERTED_ALERT_TYPE, resource_type, resource_id, specific_info)
                         self._existing_drive.update({drive_path: False})
                 self._update_drive_faults()
-                store.put(self._existing_drive, self.disk_cache_path)
-
-            # Retrieve the main loop which will be called in the run method
-            self._loop = gobject.MainLoop()
+                self._drive_state.save(self._existing_drive)
 
-            # Initialize the gobject threads and get its context
+            # The shared main loop dispatches the UDisks2 signals
             gobject.threads_init()
-            context = self._loop.get_context()
+            if self._loop is None:
+                self._loop = GLibLoop.acquire()
 
             logger.info("DiskMonitor initialization completed")
 
@@ -270,9 +311,9 @@ class DiskMonitor(SensorThread, InternalMsgQ):
             self._set_debug(True)
             self._set_debug_persist(True)
 
-            # Loop forever iterating over the context
+            # Loop forever handling the signals queued by the main loop
             while self._running == True:
-                context.iteration(False)
+                self._handle_signals()
                 time.sleep(self._thread_sleep)
 
                 # Perform SMART tests and refresh drive list on a regular interval
@@ -281,9 +322,14 @@ class DiskMonitor(SensorThread, InternalMsgQ):
 
                 # Process any msgs sent to us
                 self._check_msg_queue()
+                self._start_staggered_smart_test()
+                self._apply_smart_test_results()
                 with self._drive_info_lock:
                     self._update_drive_faults()
-                    store.put(self._existing_drive, self.disk_cache_path)
+                    self._drive_state.save(self._existing_drive)
+
+                if time.time() > self._next_smart_stats_tm:
+                    self._log_smart_stats()
 
                 # Safe guard to slow the thread down after busy exp resets
                 # self._thread_speed_safeguard += 1
@@ -310,6 +356,19 @@ class DiskMonitor(SensorThread, InternalMsgQ):
 
         self._log_debug("Finished processing successfully")
 
+    def _queue_signal(self, handler):
+        """Returns a D-Bus signal callback queueing the signal for handler,
+        to be called on this module's thread by _handle_signals"""
+        def callback(*args):
+            self._dbus_signals.append((handler, args))
+        return callback
+
+    def _handle_signals(self):
+        """Calls the handlers of the D-Bus signals queued so far"""
+        while self._dbus_signals:
+            handler, args = self._dbus_signals.popleft()
+            handler(*args)
+
     def _check_msg_queue(self):
         """Handling incoming JSON msgs"""
 
@@ -508,49 +567,61 @@ class DiskMonitor(SensorThread, InternalMsgQ):
             device_name = self._drive_by_device_name[drive_path]
             self._log_debug(f"Running SMART on SAS drive path: {drive_path}, dev name: {device_name}")
 
-            # Schedule a smart test to be run
-            command = f"/usr/sbin/smartctl -t short -d scsi {device_name}"
-            response, error = self._run_command(command)
+            # Queue the test, _apply_smart_test_results() sends the
+            # results once it completes. A test already running on the
+            # drive answers this request as well.
+            self._smart_tests.submit(drive_path, device_name, serial_number)
 
+    def _apply_smart_test_results(self):
+        """Starts and polls the SMART tests of SAS drives and sends the
+           results of the completed ones"""
+        self._smart_tests.tick()
+        for result in self._smart_tests.results():
             ack_response = "Passed"
             status_reason = "OK_None"
-            if len(error) > 0:
-                self._log_debug(f"Error running SMART on SAS drive: {error}")
-                status_reason = "Failed_smart_unknown"
-                ack_response  = "Failed"
-            else:
-                # Allow test to run
-                time.sleep(60)
-
-                # Get the results of test
-                command = f"/usr/sbin/smartctl -H -d scsi {device_name}"
-                response, error = self._run_command(command)
-
-                if "SMART Health Status: OK" not in response:
-                    self._log_debug(f"Error running SMART on SAS drive: {response}")
-                    ack_response  = "Failed"
-                    status_reason = "Failed_smart_failure"
+            if result.status != SmartTestJobs.PASSED:
+                self._log_debug(f"Error running SMART on SAS drive: {result.path}, {result.reason}")
+                ack_response = "Failed"
+                status_reason = "Failed_smart_failure" \
+                    if result.status == SmartTestJobs.FAILED else "Failed_smart_unknown"
+            self._log_debug(f"SMART test on SAS drive {result.path} completed in {result.duration:.0f}s: {ack_response}")
 
             # Generate and send an internal msg to DiskMsgHandler
-            self._notify_disk_msg_handler(drive_path, status_reason, serial_number)
-
-            # Create the request to be sent back
-            request = f"SMART_TEST: {serial_number}"
-
-            # Loop thru all the uuids awaiting a response and find matching serial number
-            for smart_uuid in self._smart_uuids:
-                uuid_serial_number = self._smart_uuids.get(smart_uuid)
-
-                # See if we have a match and send out response
-                if uuid_serial_number is not None and \
-                    serial_number == uuid_serial_number:
-
-                    # Send an Ack msg back with SMART results
-                    json_msg = AckResponseMsg(request, ack_response, smart_uuid).getJson()
-                    self._write_internal_msgQ(EgressProcessor.name(), json_msg)
-
-                    # Remove from our list
-                    self._smart_uuids[smart_uuid] = None
+            if result.path in self._drive_by_id:
+                self._notify_disk_msg_handler(result.path, status_reason, result.serial_number)
+
+            self._ack_smart_test(result.serial_number, ack_response)
+
+    def _ack_smart_test(self, serial_number, response):
+        """Answers every request waiting for the SMART test of a drive"""
+        # Create the request to be sent back
+        request = f"SMART_TEST: {serial_number}"
+
+        # Loop thru all the uuids awaiting a response and find matching serial number
+        for smart_uuid, uuid_serial_number in list(self._smart_uuids.items()):
+            # See if we have a match and send out response
+            if uuid_serial_number is not None and \
+                serial_number == uuid_serial_number:
+
+                # Send an Ack msg back with SMART results
+                json_msg = AckResponseMsg(request, response, smart_uuid).getJson()
+                self._write_internal_msgQ(EgressProcessor.name(), json_msg)
+
+                # Remove from our list
+                del self._smart_uuids[smart_uuid]
+
+    def _start_staggered_smart_test(self):
+        """Starts the next SMART test run at regular intervals, one every
+           SMART_TEST_STAGGER seconds"""
+        if not self._staggered_smart_tests or \
+                time.time() < self._next_staggered_smart_tm:
+            return
+        self._next_staggered_smart_tm = time.time() + self.SMART_TEST_STAGGER
+        drive_path = self._staggered_smart_tests.popleft()
+        try:
+            self._schedule_SMART_test(drive_path)
+        except Exception as ae:
+            self._log_debug(f"_start_staggered_smart_test, Exception: {ae}")
 
     def _run_command(self, command):
         """Run the command and get the response and error returned"""
@@ -661,8 +732,10 @@ class DiskMonitor(SensorThread, InternalMsgQ):
                     if self._smart_supported and self._run_smart_on_start:
                         # Schedule a SMART test to begin, if regular intervals then stagger
                         if stagger:
-                            time.sleep(10)
-                        self._schedule_SMART_test(drive['path'])
+                            if drive['path'] not in self._staggered_smart_tests:
+                                self._staggered_smart_tests.append(drive['path'])
+                        else:
+                            self._schedule_SMART_test(drive['path'])
 
             except Exception as ae:
                 self._log_debug(f"_init_drives, Exception: {ae}")
@@ -705,8 +778,9 @@ class DiskMonitor(SensorThread, InternalMsgQ):
 
                     # Update cache with latest info
                     self._existing_drive.update({object_path: False})
+                    self._smart_poller.recheck(object_path)
                     self._update_drive_faults()
-                    store.put(self._existing_drive, self.disk_cache_path)
+                    self._drive_state.save(self._existing_drive)
 
             # Handle jobs like SMART tests being initiated
             elif interfaces_and_properties.get("org.freedesktop.UDisks2.Job") is not None:
@@ -765,8 +839,12 @@ class DiskMonitor(SensorThread, InternalMsgQ):
 
                         # Update cache with latest info
                         del self._existing_drive[object_path]
+                        # Check the other drives behind the same path again
+                        self._smart_poller.forget(object_path)
+                        self._smart_tests.cancel(object_path)
+                        self._smart_poller.recheck()
                         self._update_drive_faults()
-                        store.put(self._existing_drive, self.disk_cache_path)
+                        self._drive_state.save(self._existing_drive)
 
                 # Handle jobs completed like SMART tests
                 elif interface == "org.freedesktop.UDisks2.Job":
@@ -821,23 +899,8 @@ class DiskMonitor(SensorThread, InternalMsgQ):
                             # Proccess the SMART result
                             self._process_smart_status(disk_path, smart_status, serial_number)
 
-                            # Create the request to be sent back
-                            request = f"SMART_TEST: {serial_number}"
-
-                            # Loop thru all the uuids awaiting a response and find matching serial number
-                            for smart_uuid in self._smart_uuids:
-                                uuid_serial_number = self._smart_uuids.get(smart_uuid)
-
-                                # See if we have a match and send out response
-                                if uuid_serial_number is not None and \
-                                    serial_number == uuid_serial_number:
-
-                                    # Send an Ack msg back with SMART results
-                                    json_msg = AckResponseMsg(request, response, smart_uuid).getJson()
-                                    self._write_internal_msgQ(EgressProcessor.name(), json_msg)
-
-                                    # Remove from our list
-                                    self._smart_uuids[smart_uuid] = None
+                            # Send the results to the requests waiting for them
+                            self._ack_smart_test(serial_number, response)
 
                 else:
                     self._log_debug("Systemd Interface Removed")
@@ -1049,37 +1112,36 @@ class DiskMonitor(SensorThread, InternalMsgQ):
         if not self._smart_supported:
             return
 
-        for object_path in self._drives.keys():
-
-            # To handle case when drive is removed, but interface_removed function is not yet
-            # called, so drive will be still in self._drives, but smartctl command will fail as
-            # device is removed.
-            if not self._drives[object_path]["node_disk"]:
-                cmd = f"sudo smartctl -d scsi -H {self._drive_by_device_name[object_path]} --json"
-            else:
-                cmd = f"sudo smartctl -H {self._drive_by_device_name[object_path]} --json"
-            response, err, retcode = self._run_command(cmd)
-            if retcode != 0 and err:
+        # Start the due health checks, they complete in the background and
+        # are applied by a later call
+        self._smart_poller.poll({
+            object_path: (self._drive_by_device_name[object_path],
+                          not drive.get("node_disk", False))
+            for object_path, drive in self._drives.items()
+            if object_path in self._drive_by_device_name})
+
+        for result in self._smart_poller.results():
+            object_path = result.path
+            # The drive was removed while it was checked
+            if object_path not in self._drives:
+                continue
+            if result.status == SmartPoller.ERROR:
+                logger.error(f"DiskMonitor, _update_drive_faults, smartctl failed for {object_path}: {result.error}")
                 self._iem.iem_fault("SMARTCTL_ERROR")
                 if self.SMARTCTL not in self._iem.fault_iems:
                     self._iem.fault_iems.append(self.SMARTCTL)
-                return
-            if retcode == 0 and response and self.SMARTCTL in self._iem.fault_iems:
+                continue
+            if self.SMARTCTL in self._iem.fault_iems:
                 self._iem.iem_fault_resolved("SMARTCTL_AVAILABLE")
                 self._iem.fault_iems.remove(self.SMARTCTL)
 
-            response = json.loads(response)
-            try:
-                if "No such device" in response["smartctl"]["message"][0]["string"]:
-                    logger.debug(f"DiskMonitor, _update_drive_faults, drive {object_path} is removed, ignoring SMART test")
-                    continue
-            # If smratctl command is not failing there will be no ["smartctl"]["message"][0]["string"] in response
-            except (KeyError, IndexError):
-                try:
-                    is_drive_faulty = not response['smart_status']['passed']
-                # If ['smart_status']['passed'] not present in response, consider it as fault
-                except KeyError:
-                    is_drive_faulty = True
+            # To handle case when drive is removed, but interface_removed function is not yet
+            # called, so drive will be still in self._drives, but smartctl command will fail as
+            # device is removed.
+            if result.status == SmartPoller.REMOVED:
+                logger.debug(f"DiskMonitor, _update_drive_faults, drive {object_path} is removed, ignoring SMART test")
+                continue
+            is_drive_faulty = result.status == SmartPoller.FAILED
 
             if not self._existing_drive[object_path] and is_drive_faulty:
                 self._existing_drive[object_path] = True
@@ -1105,15 +1167,19 @@ class DiskMonitor(SensorThread, InternalMsgQ):
                                specific_info)
             # else no change
 
-    def _is_drive_faulty(self, path):
-        if not self._drives[path]["node_disk"]:
-            cmd = f"sudo smartctl -d scsi -H {self._drive_by_device_name[path]} --json"
-        else:
-            cmd = f"sudo smartctl -H {self._drive_by_device_name[path]} --json"
-        response, _, _ = self._run_command(cmd)
-        response = json.loads(response)
-        smart_status = response['smart_status']['passed']
-        return not smart_status
+    def _log_smart_stats(self):
+        """Logs the smartctl runs and how fast failing drives were found"""
+        self._next_smart_stats_tm = time.time() + self.SMART_STATS_LOG_INTERVAL
+        stats = self._smart_poller.get_stats()
+        latency = "no failing drive detected yet"
+        if stats["detections"]:
+            latency = (f"last failing drive detected within "
+                       f"{stats['last_detect_latency']:.0f}s, slowest within "
+                       f"{stats['max_detect_latency']:.0f}s of its last "
+                       f"passing check")
+        logger.info(f"DiskMonitor, SMART health polling: "
+                    f"{stats['forks_per_minute']} smartctl runs in the last "
+                    f"minute, {stats['checks']} checks in total, {latency}")
 
     def _get_drive_fault_info(self, path):
         if not self._drives[path]["node_disk"]:
@@ -1172,6 +1238,11 @@ class DiskMonitor(SensorThread, InternalMsgQ):
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
         super(DiskMonitor, self).shutdown()
+        if self._loop is not None:
+            self._loop.quit()
+        self._smart_poller.shutdown()
+        self._smart_tests.shutdown()
+        self._drive_state.flush()
 
 def is_physical_drive(interfaces_and_property):
     """
@@ -20,6 +20,7 @@
  ****************************************************************************
 """
 
+import os
 import socket
 import time
 from collections import namedtuple
@@ -34,8 +35,10 @@ from framework.base.internal_msgQ import InternalMsgQ
 from framework.base.module_thread import SensorThread, ThreadException
 from framework.base.sspl_constants import DATA_PATH
 from framework.utils.conf_utils import (SSPL_CONF, Conf)
+from framework.utils.glib_loop import GLibLoop
 from framework.utils.iem import Iem
 from framework.utils.mon_utils import get_alert_id
+from framework.utils.persistent_state import PersistentState
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.utils.store_factory import store
@@ -153,15 +156,18 @@ class Service:
     alerts = Queue()
     non_active = set()
     monitoring_disabled = set()
+    # Called after a service handled a change of its unit, set by
+    # ServiceMonitor to raise the queued alerts
+    on_change = None
 
-    def __init__(self, unit):
+    def __init__(self, unit, name=None):
         """
-        Initialize Service.
+        Initialize Service, name is the unit Id if already known.
         """
         self.unit = unit
         self.properties_iface = Interface(self.unit,
                                           dbus_interface=PROPERTIES_IFACE)
-        self.name = str(self.properties_iface.Get(UNIT_IFACE, 'Id'))
+        self.name = name or str(self.properties_iface.Get(UNIT_IFACE, 'Id'))
         self.state = "N/A"
         self.substate = "N/A"
         self.pid = "N/A"
@@ -176,12 +182,20 @@ class Service:
         self.properties_changed_signal = None
         self._service_state = ActiveState
         self._unit_state = None
+        # Property values listed with other units, used on start up
+        # instead of reading them one by one
+        self._preloaded_properties = {}
+        self._cache = PersistentState(f"{CACHE_PATH}/{self.name}", store,
+                                      load=False)
 
     @property
     def is_enabled(self):
         return 'disabled' not in self.properties_iface.Get(
             UNIT_IFACE, 'UnitFileState')
 
+    def preload_properties(self, **properties):
+        self._preloaded_properties.update(properties)
+
     def is_nonactive_for_threshold_time(self):
         return time.time() - self.nonactive_enter_timestamp > self.nonactive_threshold
 
@@ -195,22 +209,42 @@ class Service:
             self._unit_state = new_state
             new_state.enter(self)
 
+    def changed_property(self, iface, name, interface, changed_properties,
+                         invalidated_properties):
+        """
+        Value of a property changed by a PropertiesChanged signal of
+        interface, None if the signal leaves it unchanged. The value is read
+        from systemd only if the signal invalidates it without a value, or
+        without a signal, on start up.
+        """
+        if not interface and name in self._preloaded_properties:
+            return str(self._preloaded_properties.pop(name))
+        if not interface or \
+                (interface == iface and name in invalidated_properties):
+            return str(self.properties_iface.Get(iface, name))
+        if interface == iface and name in changed_properties:
+            return str(changed_properties[name])
+        return None
+
     def properties_changed_handler(self, interface, changed_properties,
                                    invalidated_properties):
 
-        state = str(self.properties_iface.Get(
-            UNIT_IFACE, 'ActiveState'))
-        substate = str(self.properties_iface.Get(
-            UNIT_IFACE, 'SubState'))
-        pid = str(self.properties_iface.Get(
-            SERVICE_IFACE, 'ExecMainPID'))
-        if state != self.state:
+        state = self.changed_property(
+            UNIT_IFACE, 'ActiveState', interface, changed_properties,
+            invalidated_properties)
+        substate = self.changed_property(
+            UNIT_IFACE, 'SubState', interface, changed_properties,
+            invalidated_properties)
+        pid = self.changed_property(
+            SERVICE_IFACE, 'ExecMainPID', interface, changed_properties,
+            invalidated_properties)
+        if state is not None and state != self.state:
             self.previous_state = self.state
             self.state = state
-        if substate != self.substate:
+        if substate is not None and substate != self.substate:
             self.previous_substate = self.substate
             self.substate = substate
-        if pid != self.pid:
+        if pid is not None and pid != self.pid:
             self.previous_pid = self.pid
             self.pid = pid
 
@@ -231,20 +265,30 @@ class Service:
                     self.new_service_state(InactiveState)
                 self.dump_to_cache()
 
-    def handle_unit_state_change(self):
+        if Service.on_change is not None:
+            Service.on_change()
+
+    def handle_unit_state_change(self, unit_file_state=None):
         # TODO: Check if alert needs to be generated for UnitFileState change
-        if self.is_enabled:
+        if unit_file_state is None:
+            enabled = self.is_enabled
+        else:
+            enabled = 'disabled' not in unit_file_state
+        if enabled:
             self.new_unit_state(EnabledState)
         else:
             self.new_unit_state(DisabledState)
+        # Preloaded values are current for the first state only
+        self._preloaded_properties.clear()
 
     @classmethod
-    def from_cache(cls, service_name, unit):
+    def from_cache(cls, service_name, unit, data=None, name=None):
         """
-        Initialize service from cache
+        Initialize service from cache, data is the cached status if already
+        read
         """
-        data = store.get(f"{CACHE_PATH}/{service_name}")
-        service = cls(unit)
+        service = cls(unit, name)
+        data = service._cache.load(data)
         service.new_service_state(data["service_monitor_state"])
         service.state = data["service_state"]
         service.nonactive_enter_timestamp = data["nonactive_enter_timestamp"]
@@ -252,20 +296,39 @@ class Service:
 
     def dump_to_cache(self):
         """
-        Write service status to cache
+        Write service status to cache, if it changed
         """
         data = {
             "service_state": self.state,
             "service_monitor_state": self._service_state,
             "nonactive_enter_timestamp": self.nonactive_enter_timestamp
         }
-        store.put(data, f"{CACHE_PATH}/{self.name}")
+        self._cache.save(data)
+
+    def flush_cache(self):
+        """
+        Write a pending service status change to cache
+        """
+        self._cache.flush()
 
     @staticmethod
     def cache_exists(service_name):
         exists, _ = store.exists(f"{CACHE_PATH}/{service_name}")
         return exists
 
+    @staticmethod
+    def load_cache(service_names):
+        """
+        Cached status of the services by name, read in one go
+        """
+        cached = set(store.get_keys_with_prefix(CACHE_PATH))
+        keys = {f"{CACHE_PATH}/{name}": name for name in service_names
+                if name in cached}
+        if not keys:
+            return {}
+        return {keys[key]: data for key, data in store.get_many(keys).items()
+                if data}
+
 
 @implementer(ISystemMonitor)
 class ServiceMonitor(SensorThread, InternalMsgQ):
@@ -278,7 +341,6 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
     SERVICEMONITOR = SENSOR_NAME.upper()
 
     MONITORED_SERVICES = 'monitored_services'
-    THREAD_SLEEP = 'thread_sleep'
     POLLING_FREQUENCY = 'polling_frequency'
 
     # Dependency list
@@ -301,9 +363,11 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
 
         self.services = {}
 
-        self.thread_sleep = int(Conf.get(SSPL_CONF,
-                                         f"{self.SERVICEMONITOR}>{self.THREAD_SLEEP}",
-                                         "1"))
+        self._loop = None
+        self._changes_scheduled = False
+        # Service name to the GLib timer checking it when it reaches the
+        # inactivity threshold
+        self._nonactive_timers = {}
 
         self.polling_frequency = int(Conf.get(SSPL_CONF,
                                               f"{self.SERVICEMONITOR}>{self.POLLING_FREQUENCY}",
@@ -326,8 +390,8 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
         self.KAFKA = self.iem.EVENT_CODE["KAFKA_ACTIVE"][1]
 
         self.initialize_dbus()
-        for service in self.services_to_monitor:
-            self.initialize_service(service)
+        Service.on_change = self.service_changed
+        self.initialize_services(self.services_to_monitor)
         self.subscribe_unit_file_changed_signal()
 
         return True
@@ -341,29 +405,17 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
                     "No service to monitor, shutting down {}".format(
                         self.name()))
                 self.shutdown()
-            # WHILE LOOP FUNCTION : every second we check for
-            # properties change event if any generated (using context
-            # iteration) and after a delay of polling frequency we
-            # check for non_active processes.
-            iterations = 0
-            non_active_check = int(
-                self.polling_frequency / self.thread_sleep) or 1
-            while self.is_running():
-                # At interval of 'thread_sleep' check for events occurred for
-                # services and process them
-                self.process_events()
-                self.process_alerts()
-                if not iterations % non_active_check:
-                    # Initialize errored service again
-                    for service in self.services_to_monitor - set(
-                            self.services.keys()):
-                        self.initialize_service(service)
-                    for service in Service.monitoring_disabled.copy():
-                        self.services[service].new_unit_state(EnabledState)
-                    # Check for services in intermediate state(not active)
-                    self.check_nonactive_services()
-                time.sleep(self.thread_sleep)
-                iterations += 1
+            else:
+                # The shared main loop handles the PropertiesChanged signals
+                # as they arrive, the non-active services are checked by
+                # timers at their inactivity threshold and the retries run
+                # every polling_frequency seconds. All of it runs on the loop
+                # thread, this one only waits for shutdown.
+                self._loop = GLibLoop.acquire()
+                GLib.idle_add(self.start_checks)
+                GLib.timeout_add_seconds(self.polling_frequency,
+                                         self.poll_services)
+                self._loop.run()
             logger.info("ServiceMonitor gracefully breaking out " +
                         "of dbus Loop, not restarting.")
         except GLib.Error as err:
@@ -380,6 +432,62 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
                                   "Ungracefully breaking out of"
                                   "ServiceMonitor:run() with error: %s" % err)
 
+    def list_units(self, service_names):
+        """
+        Returns the ListUnitsByNames entries of the services, in the same
+        order, and their unit file states by name.
+        """
+        units = self._manager.ListUnitsByNames(service_names)
+        try:
+            unit_files = self._manager.ListUnitFilesByPatterns(
+                [], service_names)
+        except DBusException:
+            # Older systemd, the unit file states are read one by one
+            unit_files = []
+        return units, {os.path.basename(str(path)): str(state)
+                       for path, state in unit_files}
+
+    def initialize_services(self, service_names):
+        """
+        Initializes the services not initialized yet with one listing of
+        their units and unit files and one read of their cached status.
+        Falls back to one service at a time if systemd does not know the
+        listing methods.
+        """
+        service_names = sorted(set(service_names) - set(self.services))
+        if not service_names:
+            return
+        try:
+            units, unit_file_states = self.list_units(service_names)
+        except DBusException as err:
+            logger.debug(f"ServiceMonitor, listing units failed, "
+                         f"initializing services one by one: {err}")
+            for service_name in service_names:
+                self.initialize_service(service_name)
+            return
+
+        cached = Service.load_cache(service_names)
+        for service_name, unit_info in zip(service_names, units):
+            name, _, _, active_state, sub_state, _, unit_path = unit_info[:7]
+            try:
+                unit = self._bus.get_object(SYSTEMD_BUS, unit_path)
+                if service_name in cached:
+                    service = Service.from_cache(service_name, unit,
+                                                 cached[service_name],
+                                                 str(name))
+                else:
+                    service = Service(unit, str(name))
+                service.preload_properties(ActiveState=active_state,
+                                           SubState=sub_state)
+                service.handle_unit_state_change(
+                    unit_file_states.get(service_name))
+                self.services[service_name] = service
+            except DBusException:
+                logger.error("Error: {} Failed to initialize service {},"
+                             "initialization will be retried in"
+                             "{} seconds".format(DBusException, service_name,
+                                                 self.polling_frequency))
+
     def initialize_service(self, service_name):
         try:
             unit = self._bus.get_object(SYSTEMD_BUS,
@@ -412,16 +520,56 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
     def unit_file_state_change_handler(self):
         for service in self.services.values():
             service.handle_unit_state_change()
-
-    def process_events(self):
-        while self.context.pending():
-            self.context.iteration(False)
+        self.service_changed()
 
     def process_alerts(self):
         while not Service.alerts.empty():
             message = Service.alerts.get()
             self.raise_alert(message)
 
+    def service_changed(self):
+        """
+        Raises the queued alerts once the main loop handled the D-Bus
+        signals pending now, a burst of signals is handled in one batch.
+        """
+        if not self._changes_scheduled:
+            self._changes_scheduled = True
+            GLib.idle_add(self.apply_changes)
+
+    def apply_changes(self):
+        self._changes_scheduled = False
+        self.process_alerts()
+        self.schedule_nonactive_checks()
+        return False
+
+    def start_checks(self):
+        """Idle callback running the first check_services() on the loop
+        thread"""
+        self.check_services()
+        return False
+
+    def poll_services(self):
+        """Timer callback running check_services() until shutdown"""
+        if not self.is_running():
+            self._loop.quit()
+            return False
+        self.check_services()
+        return True
+
+    def check_services(self):
+        """
+        Initializes the services which failed to initialize or to register
+        for signals again and checks the non-active ones.
+        """
+        # Initialize errored service again
+        self.initialize_services(self.services_to_monitor)
+        for service in Service.monitoring_disabled.copy():
+            self.services[service].new_unit_state(EnabledState)
+        # Check for services in intermediate state(not active)
+        self.check_nonactive_services()
+        self.process_alerts()
+        self.schedule_nonactive_checks()
+
     def initialize_dbus(self):
         DBusGMainLoop(set_as_default=True)
 
@@ -431,9 +579,6 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
                                        "/org/freedesktop/systemd1")
         self._manager = Interface(systemd,
                                   dbus_interface=MANAGER_IFACE)
-        # Retrieve the main loop which will be called in the run method
-        self._loop = GLib.MainLoop()
-        self.context = self._loop.get_context()
 
     def check_nonactive_services(self):
         """
@@ -448,6 +593,27 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
                 self.raise_alert(self.get_alert(self.services[service],
                                                 FailedAlert))
 
+    def schedule_nonactive_checks(self):
+        """
+        Arms a timer for every non-active service without one, firing when
+        the service reaches the inactivity threshold.
+        """
+        for name in Service.non_active:
+            service = self.services.get(name)
+            if service is None or name in self._nonactive_timers:
+                continue
+            remaining = service.nonactive_enter_timestamp + \
+                service.nonactive_threshold - time.time()
+            self._nonactive_timers[name] = GLib.timeout_add_seconds(
+                max(int(remaining) + 1, 1), self.nonactive_timeout, name)
+
+    def nonactive_timeout(self, name):
+        self._nonactive_timers.pop(name, None)
+        self.check_nonactive_services()
+        # A service which entered a non-active state again gets a new timer
+        self.schedule_nonactive_checks()
+        return False
+
     def raise_iem(self, service, alert_type):
         """Raise iem alert for kafka service."""
         if service == "kafka.service" and alert_type == "fault":
@@ -514,3 +680,7 @@ class ServiceMonitor(SensorThread, InternalMsgQ):
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread."""
         super(ServiceMonitor, self).shutdown()
+        if self._loop is not None:
+            self._loop.quit()
+        for service in self.services.values():
+            service.flush_cache()
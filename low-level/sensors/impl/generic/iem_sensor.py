@@ -76,6 +76,9 @@ class IEMSensor(SensorThread, InternalMsgQ):
     IEC_LENGTH = 12
 
     PRIORITY = 1
+
+    # Seconds between reads of new messages in the IEM log
+    READ_INTERVAL = 10
     IEC_KEYWORD = "IEC"
 
     IEC_MAPPING_DIR_PATH=f"/opt/seagate/{PRODUCT_FAMILY}/iem/iec_mapping"
@@ -184,7 +187,14 @@ class IEMSensor(SensorThread, InternalMsgQ):
         except Exception as exception:
             logger.error(f"IEMSensor, self._read_iem, {exception.args}")
         finally:
-            self._scheduler.enter(10, self._priority, self._read_iem, ())
+            # Queued messages only switch debug mode, which reading them
+            #  does, so take them right away while waiting for the next read
+            deadline = {"read_iem": time.time() + self.READ_INTERVAL}
+            due = None
+            while not due and self.is_running():
+                _, _, due = self.wait_msg_or_deadlines(deadline)
+            if self.is_running():
+                self._scheduler.enter(0, self._priority, self._read_iem, ())
 
     def _process_iem(self, iem_log):
         log_timestamp = iem_log[:iem_log.index(" ")]
@@ -263,7 +273,7 @@ class IEMSensor(SensorThread, InternalMsgQ):
             "IEC": "".join(iem_components[:-1])
         }
         iem_data_msg = IEMDataMsg(info)
-        json_msg = iem_data_msg.getJson()
+        json_msg = iem_data_msg.getMsg()
         self._write_internal_msgQ(EgressProcessor.name(), json_msg)
 
     def _get_component(self, component):
@@ -408,3 +418,6 @@ class IEMSensor(SensorThread, InternalMsgQ):
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
         super(IEMSensor, self).shutdown()
+        # Wake _read_iem waiting for the next read so it stops right away
+        if getattr(self, "_msgQlist", None) is not None:
+            self._write_internal_msgQ(self.name(), {"iem_sensor_shutdown": True})
@@ -25,7 +25,6 @@ import os
 import re
 import socket
 import subprocess as sp
-import threading
 import time
 from datetime import datetime
 
@@ -33,7 +32,10 @@ import psutil
 from zope.interface import implementer
 
 from framework.base.debug import Debug
-from framework.utils.conf_utils import SSPL_CONF, Conf
+from framework.utils.conf_utils import NODEDATAMSGHANDLER, SSPL_CONF, Conf
+from framework.utils.cpu_sampler import CpuSampler
+from framework.utils.host_snapshot import HostCollector
+from framework.utils.netlink_monitor import LinkMonitor
 from framework.utils.config_reader import ConfigReader
 from framework.utils.service_logging import logger
 from framework.utils.sysfs_interface import SysFS
@@ -50,6 +52,9 @@ class NodeData(Debug):
 
     # conf attribute initialization
     PROBE = 'probe'
+    CPU_SAMPLING_INTERVAL = 'cpu_sampling_interval'
+    CPU_SAMPLE_RETENTION = 'cpu_sample_retention'
+    HOST_SNAPSHOT_MAX_AGE = 'host_snapshot_max_age'
 
     @staticmethod
     def name():
@@ -64,14 +69,24 @@ class NodeData(Debug):
         # Total number of CPUs
         self.cpus = psutil.cpu_count()
 
-        # Calculate the load averages on separate blocking threads
-        self.load_1min_average  = []
-        self.load_5min_average  = []
-        self.load_15min_average = []
+        # CPU usage is sampled from /proc/stat on a background thread
+        # shared by all NodeData instances
         self.prev_bmcip = None
-        load_1min_avg  = threading.Thread(target=self._load_1min_avg).start()
-        load_5min_avg  = threading.Thread(target=self._load_5min_avg).start()
-        load_15min_avg = threading.Thread(target=self._load_15min_avg).start()
+        self._cpu_sampler = CpuSampler(
+            self._conf_float(self.CPU_SAMPLING_INTERVAL, 1),
+            self._conf_float(self.CPU_SAMPLE_RETENTION, 900))
+        self._cpu_sampler.start()
+        # Memory, process and root file system figures shared by the
+        # messages of one transmit cycle
+        self._host_collector = HostCollector(
+            self._conf_float(self.HOST_SNAPSHOT_MAX_AGE, 5))
+        # Interface states follow the kernel link notifications
+        self._link_monitor = LinkMonitor()
+        try:
+            self._link_monitor.start()
+        except OSError as err:
+            logger.error(f"NodeData, netlink not available, reading network "
+                         f"interface states from sysfs: {err}")
 
         self.conf_reader = ConfigReader()
 
@@ -94,6 +109,34 @@ class NodeData(Debug):
         except Exception as err:
             logger.error(f'NodeData, Problem occured while getting the instance of {nw_fault_utility}')
 
+    def _conf_float(self, key, default):
+        try:
+            return float(Conf.get(SSPL_CONF, f"{NODEDATAMSGHANDLER}>{key}",
+                                  default))
+        except (TypeError, ValueError):
+            return default
+
+    def _host_snapshot(self):
+        """Returns the host snapshot of the current cycle"""
+        snapshot, collected = self._host_collector.get()
+        if collected:
+            stats = self._host_collector.get_stats()
+            logger.debug(f"NodeData, host snapshot took "
+                         f"{snapshot.cost * 1000:.2f} ms, "
+                         f"{snapshot.cpu_cost * 1000:.2f} ms CPU, "
+                         f"{stats['collections']} taken, "
+                         f"{stats['reuses']} reused")
+        return snapshot
+
+    def watch_links(self, callback):
+        """Calls callback(interface) as soon as the state or the cable
+        connection of a network interface changes, returns False if link
+        changes are only seen by polling"""
+        if not self._link_monitor.is_running():
+            return False
+        self._link_monitor.add_listener(callback)
+        return True
+
     def read_data(self, subset, debug, units="MB"):
         """Updates data based on a subset"""
         self._set_debug(debug)
@@ -144,66 +187,67 @@ class NodeData(Debug):
 
     def _get_host_update_data(self):
         """Retrieves node information for the host_update json message"""
+        snapshot = self._host_snapshot()
         logged_in_users = []
         uname_keys = ("sysname", "nodename", "version", "release", "machine")
-        self.up_time         = int(psutil.boot_time())
+        self.up_time         = snapshot.boot_time
         self.boot_time       = self._epoch_time
         self.uname           = dict(zip(uname_keys, os.uname()))
-        self.total_memory = dict(psutil.virtual_memory()._asdict())
-        self.process_count   = len(psutil.pids())
+        self.total_memory = dict(snapshot.memory)
+        self.process_count   = snapshot.process_count
         for users in psutil.users():
             logged_in_users.append(dict(users._asdict()))
         self.logged_in_users = logged_in_users
         # Calculate the current number of running processes at this moment
-        total_running_proc = 0
-        for proc in psutil.process_iter():
-            pinfo = proc.as_dict(attrs=['status'])
-            if pinfo['status'] not in (psutil.STATUS_ZOMBIE, psutil.STATUS_DEAD,
-                                       psutil.STATUS_STOPPED, psutil.STATUS_IDLE,
-                                       psutil.STATUS_SLEEPING):
-                total_running_proc += 1
-        self.running_process_count = total_running_proc
+        self.running_process_count = snapshot.running_count
 
     def _get_local_mount_data(self):
         """Retrieves node information for the local_mount_data json message"""
-        self.total_space = int(psutil.disk_usage("/")[0])//int(self.units_factor)
-        self.free_space  = int(psutil.disk_usage("/")[2])//int(self.units_factor)
-        self.total_swap  = int(psutil.swap_memory()[0])//int(self.units_factor)
-        self.free_swap   = int(psutil.swap_memory()[2])//int(self.units_factor)
-        self.free_inodes = int(100 - math.ceil((float(os.statvfs("/").f_files - os.statvfs("/").f_ffree) \
-                             / os.statvfs("/").f_files) * 100))
+        snapshot = self._host_snapshot()
+        self.total_space = int(snapshot.disk["total"])//int(self.units_factor)
+        self.free_space  = int(snapshot.disk["free"])//int(self.units_factor)
+        self.total_swap  = int(snapshot.swap_total)//int(self.units_factor)
+        self.free_swap   = int(snapshot.swap_free)//int(self.units_factor)
+        self.free_inodes = int(100 - math.ceil((float(snapshot.files - snapshot.files_free) \
+                             / snapshot.files) * 100))
 
     def _get_cpu_data(self):
         """Retrieves node information for the cpu_data json message"""
-        cpu_core_usage_dict = dict()
-        cpu_data = psutil.cpu_times_percent()
-        self._log_debug("_get_cpu_data, cpu_data: %s %s %s %s %s %s %s %s %s %s" % cpu_data)
+        cpu_data = self._cpu_sampler.times_percent()
+        self._log_debug("_get_cpu_data, cpu_data: %s" % cpu_data)
 
         self.csps           = 0  # What the hell is csps - cycles per second?
-        self.user_time      = int(cpu_data[0])
-        self.nice_time      = int(cpu_data[1])
-        self.system_time    = int(cpu_data[2])
-        self.idle_time      = int(cpu_data[3])
-        self.iowait_time    = int(cpu_data[4])
-        self.interrupt_time = int(cpu_data[5])
-        self.softirq_time   = int(cpu_data[6])
-        self.steal_time     = int(cpu_data[7])
-
-        self.cpu_usage = psutil.cpu_percent(interval=1, percpu=False)
+        self.user_time      = int(cpu_data["user"])
+        self.nice_time      = int(cpu_data["nice"])
+        self.system_time    = int(cpu_data["system"])
+        self.idle_time      = int(cpu_data["idle"])
+        self.iowait_time    = int(cpu_data["iowait"])
+        self.interrupt_time = int(cpu_data["irq"])
+        self.softirq_time   = int(cpu_data["softirq"])
+        self.steal_time     = int(cpu_data["steal"])
+
+        self.cpu_usage = self._cpu_sampler.current()
+        # Averages of the samples taken so far until the interval has
+        # passed, -1 before the first sample
+        load_1min_average  = self._cpu_sampler.averages(60)
+        load_5min_average  = self._cpu_sampler.averages(300)
+        load_15min_average = self._cpu_sampler.averages(900)
         # Array to hold data about each CPU core
         self.cpu_core_data = []
         index = 0
         while index < self.cpus:
+            if index < len(load_1min_average):
+                load = (load_1min_average[index], load_5min_average[index],
+                        load_15min_average[index])
+            else:
+                load = (-1, -1, -1)
             self._log_debug("_get_cpu_data, index: %s, 1 min: %s, 5 min: %s, 15 min: %s" %
-                            (index,
-                            self.load_1min_average[index],
-                            self.load_5min_average[index],
-                            self.load_15min_average[index]))
+                            ((index,) + load))
 
             cpu_core_data = {"coreId"      : index,
-                             "load1MinAvg" : int(self.load_1min_average[index]),
-                             "load5MinAvg" : int(self.load_5min_average[index]),
-                             "load15MinAvg": int(self.load_15min_average[index]),
+                             "load1MinAvg" : int(load[0]),
+                             "load5MinAvg" : int(load[1]),
+                             "load15MinAvg": int(load[2]),
                              "ips" : 0
                              }
             self.cpu_core_data.append(cpu_core_data)
@@ -215,9 +259,9 @@ class NodeData(Debug):
         # Array to hold data about each network interface
         self.if_data = []
         bmc_data = self._get_bmc_info()
+        nw_status = self._fetch_nw_status()
         for interface, if_data in net_data.items():
             self._log_debug("_get_if_data, interface: %s %s" % (interface, net_data))
-            nw_status = self._fetch_nw_status()
             nw_cable_conn_status = self.fetch_nw_cable_conn_status(interface)
             if_data = {"ifId" : interface,
                        "networkErrors"      : (net_data[interface].errin +
@@ -236,19 +280,34 @@ class NodeData(Debug):
         self.if_data.append(bmc_data)
 
     def _fetch_nw_status(self):
+        """Returns {interface: [operational state, first address]}"""
         nw_dict = {}
-        nws = os.popen("ip --br a | awk '{print $1, $2, $3}'").read().split('\n')[:-1]
-        for nw in nws:
-            if nw.split(' ')[2]:
-                ip = nw.split(' ')[2].split("/")[0]
-            else:
-                ip = ""
-            nw_dict[nw.split(' ')[0]] = [nw.split(' ')[1], ip]
+        if self._link_monitor.is_running():
+            for interface, link in self._link_monitor.get_links().items():
+                nw_dict[interface] = [link[0], link[1]]
+        else:
+            addrs = psutil.net_if_addrs()
+            for interface in os.listdir(self.nw_interface_path):
+                try:
+                    with open(os.path.join(self.nw_interface_path, interface,
+                                           "operstate")) as operstate:
+                        state = operstate.read().strip().upper()
+                except OSError:
+                    state = "UNKNOWN"
+                ips = [addr.address.split("%")[0]
+                       for family in (socket.AF_INET, socket.AF_INET6)
+                       for addr in addrs.get(interface, [])
+                       if addr.family == family]
+                nw_dict[interface] = [state, ips[0] if ips else ""]
         logger.debug("network info going is : {}".format(nw_dict))
         return nw_dict
 
     def fetch_nw_cable_conn_status(self, interface):
         carrier_status = None
+        if self._link_monitor.is_running():
+            link = self._link_monitor.get_links().get(interface)
+            if link is not None:
+                return link[2]
         try:
             carrier_status = self._utility_instance.fetch_nw_cable_status(self.nw_interface_path, interface)
         except Exception as e:
@@ -304,42 +363,7 @@ class NodeData(Debug):
 
     def _get_disk_space_alert_data(self):
         """Retrieves node information for the disk_space_alert_data json message"""
-        self.total_space = int(psutil.disk_usage("/")[0])//int(self.units_factor)
-        self.free_space  = int(psutil.disk_usage("/")[2])//int(self.units_factor)
-        self.disk_used_percentage  = psutil.disk_usage("/")[3]
-
-    def _load_1min_avg(self):
-        """Loop forever calculating the one minute average load"""
-        # Initialize list to -1 indicating the time interval has not occurred yet
-        index = 0
-        while index < self.cpus:
-            self.load_1min_average.append(-1)
-            index += 1
-
-        while True:
-            # API call blocks for one minute and then returns the value
-            self.load_1min_average = psutil.cpu_percent(interval=1, percpu=True)
-
-    def _load_5min_avg(self):
-        """Loop forever calculating the five minute average load"""
-        # Initialize list to -1 indicating the time interval has not occurred yet
-        index = 0
-        while index < self.cpus:
-            self.load_5min_average.append(-1)
-            index += 1
-
-        while True:
-            # API call blocks for five minutes and then returns the value
-            self.load_5min_average = psutil.cpu_percent(interval=5, percpu=True)
-
-    def _load_15min_avg(self):
-        """Loop forever calculating the fifteen minute average load"""
-        # Initialize list to -1 indicating the time interval has not occurred yet
-        index = 0
-        while index < self.cpus:
-            self.load_15min_average.append(-1)
-            index += 1
-
-        while True:
-            # API call blocks for fifteen minutes and then returns the value
-            self.load_15min_average = psutil.cpu_percent(interval=15, percpu=True)
+        snapshot = self._host_snapshot()
+        self.total_space = int(snapshot.disk["total"])//int(self.units_factor)
+        self.free_space  = int(snapshot.disk["free"])//int(self.units_factor)
+        self.disk_used_percentage  = snapshot.disk["percent"]
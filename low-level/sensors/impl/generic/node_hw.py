@@ -33,12 +33,10 @@ from zope.interface import implementer
 from framework.base.debug import Debug
 from framework.base.internal_msgQ import InternalMsgQ
 from framework.base.module_thread import SensorThread
-from framework.base.sspl_constants import (PRODUCT_FAMILY, ServiceTypes,
-                                           node_key_id)
-from framework.utils import encryptor
+from framework.base.sspl_constants import PRODUCT_FAMILY, node_key_id
 from framework.utils.conf_utils import (GLOBAL_CONF, IP, SECRET,
-    SSPL_CONF, USER, Conf, NODE_ID_KEY, BMC_IP_KEY, BMC_USER_KEY,
-    BMC_SECRET_KEY, MACHINE_ID, NODEHWSENSOR, IPMI_CLIENT)
+    SSPL_CONF, USER, Conf, NODE_ID_KEY, BMC_USER_KEY, NODEHWSENSOR,
+    IPMI_CLIENT)
 from framework.utils.config_reader import ConfigReader
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
@@ -83,10 +81,14 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
     SEL_INFO_PERC_USED = "Percent Used"
     SEL_INFO_FREESPACE = "Free Space"
     SEL_INFO_ENTRIES = "Entries"
+    SEL_INFO_LAST_ADD = "Last Add Time"
+    SEL_INFO_LAST_DEL = "Last Del Time"
 
     CACHE_DIR_NAME  = "server"
     # This file stores the last index from the SEL list for which we have issued an event.
     INDEX_FILE = "last_sel_index"
+    # This file stores the SEL position the list file was read up to
+    SEL_CURSOR_FILE = "sel_cursor"
     LIST_FILE  = "sel_list"
     LIST_FILE_COLLECT = "sel_list_collect"
 
@@ -124,7 +126,6 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
     POLLING_INTERVAL = "polling_interval"
     DEFAULT_POLLING_INTERVAL = "30"
 
-    IPMITOOL = "sudo ipmitool "
     IPMISIMTOOL = "ipmisimtool "
 
     DYNAMIC_KEYS = {
@@ -209,6 +210,12 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
         self.list_file_collect_name = os.path.join(self.cache_dir_path, self.LIST_FILE_COLLECT)
 
+        self.sel_cursor_path = os.path.join(self.cache_dir_path,
+            f'{self.SEL_CURSOR_FILE}_{self._node_id}')
+        self.sel_cursor = store.get(self.sel_cursor_path)
+        if not isinstance(self.sel_cursor, dict):
+            self.sel_cursor = {}
+
     def _write_index_file(self, index):
         if not isinstance(index, int):
             index = int(index, base=16)
@@ -241,19 +248,12 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
         self._node_id = Conf.get(GLOBAL_CONF, NODE_ID_KEY,'SN01')
         self._bmc_user = Conf.get(GLOBAL_CONF, BMC_USER_KEY, 'ADMIN')
-        _bmc_secret = Conf.get(GLOBAL_CONF, BMC_SECRET_KEY, 'ADMIN')
-        self._bmc_ip = Conf.get(GLOBAL_CONF, BMC_IP_KEY, '')
         self._channel_interface = Conf.get(SSPL_CONF,
             f"{self.BMC_INTERFACE}>{self.BMC_CHANNEL_IF}", 'system')
         self.iem = Iem()
         self.iem.check_exsisting_fault_iems()
         self.IPMI = self.iem.EVENT_CODE["IPMITOOL_AVAILABLE"][1]
 
-        # Decrypt bmc secret
-        decryption_key = encryptor.gen_key(MACHINE_ID,
-            ServiceTypes.SERVER_NODE.value)
-        self.__bmc_passwd = encryptor.decrypt(decryption_key,
-            _bmc_secret, self.SENSOR_NAME)
         data_dir =  Conf.get(SSPL_CONF, f"{self.SYSINFO}>{self.DATA_PATH_KEY}", self.DATA_PATH_VALUE_DEFAULT)
         self.cache_dir_path = os.path.join(data_dir, self.CACHE_DIR_NAME)
 
@@ -292,25 +292,24 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
         # check  for lan falut resolved alert
         if self.lan_channel_err or self.lan_fault == "fault":
-            command = self.IPMITOOL + " -H " + self._bmc_ip + " -U " + self._bmc_user + \
-                        " -P " + self.__bmc_passwd + " -I " + "lan " + "channel info"
-            res, retcode = self._run_command(command)
+            _, _, retcode = self.ipmi_client._run_lan_subcommand("channel info")
             self.lan_cmd_retcode = retcode
 
     def _update_list_file(self):
+        new_lines, cursor, cleared = self._read_new_sel_lines()
         with open(self.list_file_collect_name, self.UPDATE_CREATE_MODE) as f:
             # make sel list filter only for available frus. no extra data needed
             # 'Power Supply|Power Unit|Fan|Drive Slot / Bay'
             f.seek(0)
             f.truncate()
             available_fru = '|'.join(self.fru_types.keys())
-            _, err, retcode = self._run_ipmitool_subcommand(
-                    "sel list", grep_args=f"{available_fru}",
-                    out_file=f)
-            if retcode != 0:
-                msg = f"ipmitool sel list command failed: {err}"
-                logger.error(msg)
-                raise Exception(msg)
+            for line in new_lines:
+                if re.search(available_fru, line) is not None:
+                    f.write(line + "\n")
+
+        if cleared:
+            # Record ids start over, the last index must not match them
+            self._write_index_file(0)
 
         # os.rename() is required to be atomic on POSIX,
         # (from here: https://docs.python.org/2/library/os.html#os.rename)
@@ -322,12 +321,107 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
         self.list_file.close()
         self.list_file = self._get_file(self.list_file_name)
 
+        if cursor != self.sel_cursor:
+            self.sel_cursor = cursor
+            store.put(self.sel_cursor, self.sel_cursor_path)
+
+    def _read_new_sel_lines(self):
+        """Returns the SEL lines added since the previous poll, the new SEL
+        cursor and whether the SEL was cleared or wrapped past the cursor.
+
+        'sel info' tells whether entries were added or deleted since the
+        previous poll. Added entries are read with 'sel list last <n>'
+        together with the last entry read before, which anchors them, so
+        the cost of a poll depends on the new entries only. The whole SEL
+        is listed when the anchor is not among them, after the SEL was
+        cleared or wrapped around, and with the simulator."""
+        cursor = self.sel_cursor
+        info = {}
+        if self.IPMISIMTOOL not in (self.ipmi_client.ACTIVE_IPMI_TOOL or ""):
+            sel_info, _, retcode = self._run_ipmitool_subcommand("sel info")
+            if retcode == 0:
+                info = self._parse_sel_info(sel_info)
+        try:
+            entries = int(info.get(self.SEL_INFO_ENTRIES))
+        except (TypeError, ValueError):
+            entries = None
+        new_cursor = {
+            "entries": entries,
+            "last_add": info.get(self.SEL_INFO_LAST_ADD),
+            "last_del": info.get(self.SEL_INFO_LAST_DEL),
+            "last_record": cursor.get("last_record")
+        }
+
+        lines = None
+        if entries is not None and cursor.get("entries") is not None and \
+                cursor.get("last_del") == new_cursor["last_del"] and \
+                entries >= cursor["entries"]:
+            added = entries - cursor["entries"]
+            if added == 0 and cursor.get("last_add") == new_cursor["last_add"]:
+                return [], new_cursor, False
+            if added and cursor.get("last_record") is not None:
+                lines = self._entries_after(
+                    self._list_sel(f"sel list last {added + 1}"),
+                    cursor["last_record"])
+
+        cleared = False
+        if lines is None:
+            lines = self._list_sel("sel list")
+            after = self._entries_after(lines, cursor.get("last_record"))
+            if after is not None:
+                lines = after
+            elif cursor.get("last_record") is not None:
+                cleared = True
+                logger.info(f"{self.SENSOR_NAME}: SEL entry "
+                    f"{cursor['last_record']} is gone, SEL cleared or "
+                    "wrapped around, reading all entries")
+
+        if self.channel_err:
+            # Nothing was read, try again from the same position
+            return [], cursor, False
+        if lines:
+            new_cursor["last_record"] = self._sel_record_id(lines[-1])
+        elif cleared:
+            new_cursor["last_record"] = None
+        return lines, new_cursor, cleared
+
+    def _list_sel(self, subcommand):
+        """Returns the entry lines of a 'sel list' command"""
+        res, err, retcode = self._run_ipmitool_subcommand(subcommand)
+        if retcode != 0:
+            msg = f"ipmitool {subcommand} command failed: {err}"
+            logger.error(msg)
+            raise Exception(msg)
+        return [line for line in res.split("\n") if "|" in line]
+
+    @staticmethod
+    def _sel_record_id(sel_line):
+        return sel_line.split("|")[0].strip()
+
+    def _entries_after(self, lines, record_id):
+        """Returns the lines after the entry record_id, None if it is not
+        among them"""
+        if record_id is None:
+            return None
+        for position, line in enumerate(lines):
+            if self._sel_record_id(line) == record_id:
+                return lines[position + 1:]
+        return None
+
+    @staticmethod
+    def _parse_sel_info(sel_info):
+        """Returns the fields of 'sel info' output as a dict"""
+        info_dict = {}
+        for info in sel_info.split("\n"):
+            if ':' in info:
+                key, val = [f.strip() for f in info.split(":", 1)]
+                info_dict[key] = val
+        return info_dict
+
     def _check_and_clear_sel(self):
         """ Clear SEL Table if SEL used memory seen above threshold
             SEL_USAGE_THRESHOLD """
 
-        info_dict = {}
-
         if self.sel_last_queried:
             last_checked = time.time() - self.sel_last_queried
 
@@ -344,13 +438,7 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
             # record SEL last queried time
             self.sel_last_queried = time.time()
 
-            key = val = None
-            info_list = sel_info.split("\n")
-
-            for info in info_list:
-                if ':' in info:
-                    key, val = [f.strip() for f in info.split(":", 1)]
-                    info_dict[key] = val
+            info_dict = self._parse_sel_info(sel_info)
 
             if self.SEL_INFO_PERC_USED in info_dict:
                 '''strip '%' or any unwanted char from value'''
@@ -458,8 +546,11 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
 
         # Copying object to avoid RuntimeError: dictionary changed size during iteration
         faulty_res = self.faulty_resources.copy()
+        sdr_props = self._get_sensor_sdr_props_many(faulty_res)
         for sensor_id in faulty_res:
-            dynamic, static = self._get_sensor_sdr_props(sensor_id)
+            if sensor_id not in sdr_props:
+                continue
+            dynamic, static = sdr_props[sensor_id]
             if dynamic and 'States Asserted' in dynamic:
                 #  'States Asserted': 'Power Supply, Presence detected'
                 resource_state = re.sub(',  +', ', ', re.sub('[\[\]]','',
@@ -587,12 +678,6 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
         self.list_file.seek(0)
         self.list_file.truncate()
 
-    def _run_command(self, command, out_file=subprocess.PIPE):
-        """executes commands"""
-        process = subprocess.Popen(command, shell=True, stdout=out_file, stderr=subprocess.PIPE)
-        result = process.communicate()
-        return result, process.returncode
-
     def _run_ipmitool_subcommand(self, subcommand, grep_args=None, out_file=subprocess.PIPE):
         """executes ipmitool sub-commands, and optionally greps the output"""
 
@@ -690,6 +775,7 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
                                 ipmitool fallback to KCS interface if local server is being monitored")
                 self.active_bmc_if = self.ipmi_client.SYSTEM_IF
                 store.put(self.active_bmc_if,self.ACTIVE_BMC_IF)
+                self.ipmi_client.invalidate_target()
                 if self.lan_fault is None:
                     self.lan_fault = alert_type
                     store.put(self.lan_fault, self.LAN_ALERT)
@@ -810,8 +896,21 @@ class NodeHWsensor(SensorThread, InternalMsgQ):
             msg = f"ipmitool sensor get command failed: {err}"
             logger.warning(msg)
             return
-        props_list = props_list_out.split("\n")
-
+        return self._parse_sensor_sdr_props(props_list_out.split("\n"))
+
+    def _get_sensor_sdr_props_many(self, sensor_ids):
+        """get _get_sensor_sdr_props of several sensors by sensor id, with
+           one 'sdr get' per SENSORS_PER_COMMAND sensors. Sensors which
+           could not be read are left out."""
+        sdr_props = {}
+        for _, records, _ in self.ipmi_client.get_records_many(
+                "sdr get", sensor_ids, run=self._run_ipmitool_subcommand):
+            for sensor_id, props_list in records.items():
+                sdr_props[sensor_id] = \
+                    self._parse_sensor_sdr_props(props_list)
+        return sdr_props
+
+    def _parse_sensor_sdr_props(self, props_list):
         static_keys = {}
         dynamic = {}
         curr_key = None
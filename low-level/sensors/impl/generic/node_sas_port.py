@@ -32,6 +32,7 @@ from framework.base.sspl_constants import DATA_PATH
 from framework.utils.conf_utils import (GLOBAL_CONF, SSPL_CONF, Conf,
     NODE_ID_KEY)
 from framework.utils.config_reader import ConfigReader
+from framework.utils.persistent_state import PersistentState
 from framework.utils.service_logging import logger
 from framework.utils.severity_reader import SeverityReader
 from framework.utils.store_factory import file_store
@@ -116,6 +117,7 @@ class SASPortSensor(SensorThread, InternalMsgQ):
         self.sas_ports_status = {}
         self.port_phy_list_dict = {}
         self.sas_phy_stored_alert = None
+        self._stored_alert = None
 
     def initialize(self, conf_reader, msgQlist, product):
         """initialize configuration reader and internal msg queues"""
@@ -170,8 +172,11 @@ class SASPortSensor(SensorThread, InternalMsgQ):
                 link_value_phy_status_collection = (value, phy_status)
                 self.phy_dir_to_linkrate_mapping[phy] = link_value_phy_status_collection
 
-            # Get the stored previous alert info
-            self.sas_phy_stored_alert = store.get(self.SAS_PORT_SENSOR_DATA)
+            # Get the stored previous alert info, kept in memory from now on
+            # and written back only when it changes
+            self._stored_alert = PersistentState(self.SAS_PORT_SENSOR_DATA,
+                                                 store)
+            self.sas_phy_stored_alert = self._stored_alert.value
             self.check_and_send_alert()
 
         except KeyError as key_error:
@@ -291,7 +296,7 @@ class SASPortSensor(SensorThread, InternalMsgQ):
         # See if conn failure/conn resolved alert needs to be sent
         self.check_and_send_conn_alert()
         # Save data to store
-        store.put(self.sas_phy_stored_alert, self.SAS_PORT_SENSOR_DATA)
+        self._stored_alert.save(self.sas_phy_stored_alert)
 
     def check_and_send_alert(self):
         """Checks whether conditions are met and sends alert if required
@@ -320,7 +325,7 @@ class SASPortSensor(SensorThread, InternalMsgQ):
             for i in range(0,self.NUM_SAS_PORTS):
                 self.sas_phy_stored_alert[i] = 'fault_resolved'
             # Save data to store
-            store.put(self.sas_phy_stored_alert, self.SAS_PORT_SENSOR_DATA)
+            self._stored_alert.save(self.sas_phy_stored_alert)
 
         if version == self.CURRENT_DATA_VERSION:
             self.handle_current_version_data()
@@ -384,7 +389,7 @@ class SASPortSensor(SensorThread, InternalMsgQ):
                 new_phy_link_count = self.phy_link_count + new_phy_up - new_phy_down
 
                 # Get the last sent alert info
-                self.sas_phy_stored_alert = store.get(self.SAS_PORT_SENSOR_DATA)
+                self.sas_phy_stored_alert = self._stored_alert.value
                 self.check_and_send_alert()
                 # Update current active phy count for next iteration
                 self.phy_link_count = new_phy_link_count
@@ -502,3 +507,5 @@ class SASPortSensor(SensorThread, InternalMsgQ):
     def shutdown(self):
         """Clean up scheduler queue and gracefully shutdown thread"""
         super(SASPortSensor, self).shutdown()
+        if self._stored_alert is not None:
+            self._stored_alert.flush()
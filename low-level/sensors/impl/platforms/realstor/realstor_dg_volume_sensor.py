@@ -133,6 +133,8 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
         self._previously_faulty_disk_groups = {}
         # Holds Logical Volumes with faults. Used for future reference.
         self._previously_faulty_logical_volumes = {}
+        # Seconds taken by the last sweep over disk groups and volumes
+        self._last_sweep_time = None
 
         self.pollfreq_DG_logical_volume_sensor = \
             int(Conf.get(SSPL_CONF, f"{self.rssencl.CONF_REALSTORLOGICALVOLUMESENSOR}>{POLLING_FREQUENCY_OVERRIDE}",
@@ -167,22 +169,27 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
         self._faulty_disk_group_file_path = os.path.join(
             self._disk_group_prcache, "disk_group_data.json")
 
-        # Load faulty Logical Volume data from file if available
-        self._previously_faulty_logical_volumes = store.get(\
+        # Load faulty Logical Volume and Disk Group data from file if available
+        faulty_data = store.get_many([self._faulty_logical_volume_file_path,
+                                      self._faulty_disk_group_file_path])
+        self._previously_faulty_logical_volumes = faulty_data.get(
                                                   self._faulty_logical_volume_file_path)
-        # Load faulty Disk Group data from file if available
-        self._previously_faulty_disk_groups = store.get(\
+        self._previously_faulty_disk_groups = faulty_data.get(
                                                   self._faulty_disk_group_file_path)
 
+        missing = {}
         if self._previously_faulty_logical_volumes is None:
             self._previously_faulty_logical_volumes = {}
-            store.put(self._previously_faulty_logical_volumes,\
-                self._faulty_logical_volume_file_path)
+            missing[self._faulty_logical_volume_file_path] = \
+                self._previously_faulty_logical_volumes
 
         if self._previously_faulty_disk_groups is None:
             self._previously_faulty_disk_groups = {}
-            store.put(self._previously_faulty_disk_groups,\
-                self._faulty_disk_group_file_path)
+            missing[self._faulty_disk_group_file_path] = \
+                self._previously_faulty_disk_groups
+
+        if missing:
+            store.put_many(missing)
 
         return True
 
@@ -204,21 +211,27 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
 
         disk_groups = None
         logical_volumes = None
+        sweep_start = time.time()
 
         try:
             disk_groups = self._get_disk_groups()
 
             if disk_groups:
                 self._get_msgs_for_faulty_disk_groups(disk_groups)
+                # One /show/volumes request for all pools instead of one
+                # request per disk group
+                volumes_by_pool = self._get_logical_volumes_by_pool()
                 for disk_group in disk_groups:
                     pool_serial_number = disk_group["pool-serial-number"]
-                    logical_volumes = self._get_logical_volumes(pool_serial_number)
+                    logical_volumes = volumes_by_pool.get(pool_serial_number)
                     if logical_volumes:
                         self._get_msgs_for_faulty_logical_volumes(logical_volumes, disk_group)
 
         except Exception as exception:
             logger.exception(exception)
 
+        self._report_sweep_time(time.time() - sweep_start, disk_groups)
+
         # Reset debug mode if persistence is not enabled
         self._disable_debug_if_persist_false()
 
@@ -248,29 +261,47 @@ class RealStorLogicalVolumeSensor(SensorThread, InternalMsgQ):
         disk_groups = response_data.get("disk-groups")
         return disk_groups
 
-    def _get_logical_volumes(self, pool_serial_number):
-        """Receives list of Logical Volumes from API.
-           URL: http://<host>/api/show/volumes/pool/<pool_serial_number>
+    def _report_sweep_time(self, sweep_time, disk_groups):
+        """Log the time taken to check every disk group and volume"""
+        self._last_sweep_time = sweep_time
+        if sweep_time > self.pollfreq_DG_logical_volume_sensor:
+            logger.warn(f"RealStorLogicalVolumeSensor, sweep of "
+                f"{len(disk_groups or [])} disk groups took {sweep_time:.3f} "
+                f"seconds, longer than polling interval "
+                f"{self.pollfreq_DG_logical_volume_sensor} seconds")
+        else:
+            logger.debug(f"RealStorLogicalVolumeSensor, sweep of "
+                f"{len(disk_groups or [])} disk groups took {sweep_time:.3f} seconds")
+
+    def get_last_sweep_time(self):
+        """Seconds taken by the last disk group and volume sweep"""
+        return self._last_sweep_time
+
+    def _get_logical_volumes_by_pool(self):
+        """Receives list of all Logical Volumes from API and groups them by
+           the serial number of the pool holding them.
+           URL: http://<host>/api/show/volumes
         """
         url = self.rssencl.build_url(self.rssencl.URI_CLIAPI_SHOWVOLUMES)
 
-        url = f"{url}/pool/{pool_serial_number}"
-
         response = self.rssencl.ws_request(url, self.rssencl.ws.HTTP_GET)
 
         if not response:
             logger.warn(f"{self.rssencl.LDR_R1_ENCL}:: Logical Volume status unavailable as ws request {url}"
                 " failed")
-            return
+            return {}
 
         if response.status_code != self.rssencl.ws.HTTP_OK:
             logger.error(f"{self.rssencl.LDR_R1_ENCL}:: http request {url} to get logical volumes failed with \
                  err {response.status_code}")
-            return
+            return {}
 
         response_data = json.loads(response.text)
-        logical_volumes = response_data.get("volumes")
-        return logical_volumes
+        volumes_by_pool = {}
+        for logical_volume in response_data.get("volumes") or []:
+            volumes_by_pool.setdefault(
+                logical_volume.get("container-serial"), []).append(logical_volume)
+        return volumes_by_pool
 
     def _get_msgs_for_faulty_disk_groups(self, disk_groups, send_message=True):
         """Checks for health of disk groups and returns list of messages to be
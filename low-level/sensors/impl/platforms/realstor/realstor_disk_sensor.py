@@ -338,6 +338,12 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
                 self.latest_disks = {}
                 self.invalidate_latest_disks_info = False
 
+                # Read the persistent cache of every drive at once
+                dcache_paths = [f"{self.disks_prcache}disk_{drive['slot']}.json"
+                                for drive in drives if drive.get("slot", -1) != -1]
+                cached_drives = store.get_many(dcache_paths)
+                updates = {}
+
                 for drive in drives:
                     slot = drive.get("slot", -1)
                     sn = drive.get("serial-number", "NA")
@@ -349,30 +355,28 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
                         #dump drive data to persistent cache
                         dcache_path = f"{self.disks_prcache}disk_{slot}.json"
 
+                        if dcache_path not in cached_drives:
+                            # Invalidate latest disks info if persistence store error encountered
+                            logger.warn(f"store.get_many failed to read {dcache_path}")
+                            self.invalidate_latest_disks_info = True
+                            break
+
                         # If drive is replaced, previous drive info needs
                         # to be retained in disk_<slot>.json.prev file and
                         # then only dump new data to disk_<slot>.json
-                        path_exists, ret_val = store.exists(dcache_path)
-                        if path_exists and ret_val == "Success":
-                            prevdrive = store.get(dcache_path)
-
-                            if prevdrive is not None:
-                                prevsn = prevdrive.get("serial-number","NA")
-                                prevhealth = prevdrive.get("health", "NA")
-
-                                if prevsn != sn or prevhealth != health:
-                                    # Rename path
-                                    store.put(store.get(dcache_path), dcache_path + ".prev")
-                                    store.delete(dcache_path)
-
-                                    store.put(drive, dcache_path)
-                        elif not path_exists and ret_val == "Success":
-                            store.put(drive, dcache_path)
+                        prevdrive = cached_drives[dcache_path]
+                        if prevdrive is None:
+                            updates[dcache_path] = drive
                         else:
-                            # Invalidate latest disks info if persistence store error encountered
-                            logger.warn(f"store.exists {dcache_path} return value {ret_val}")
-                            self.invalidate_latest_disks_info = True
-                            break
+                            prevsn = prevdrive.get("serial-number","NA")
+                            prevhealth = prevdrive.get("health", "NA")
+
+                            if prevsn != sn or prevhealth != health:
+                                updates[dcache_path + ".prev"] = prevdrive
+                                updates[dcache_path] = drive
+
+                if updates:
+                    store.put_many(updates)
 
                 if self.invalidate_latest_disks_info is True:
                     # Reset latest disks info
@@ -396,22 +400,28 @@ class RealStorDiskSensor(SensorThread, InternalMsgQ):
             logger.debug("No files in Disk cache folder, ignoring")
             return
 
+        filenames = []
         for filename in files:
             if filename.startswith('disk_') and filename.endswith('.json'):
                 if f"{filename}.prev" in files:
                     filename = f"{filename}.prev"
-                drive = store.get(self.disks_prcache + filename)
-                slotstr = re.findall("disk_(\d+).json", filename)[0]
+                filenames.append(filename)
+        drives = store.get_many([self.disks_prcache + filename
+                                 for filename in filenames])
+
+        for filename in filenames:
+            drive = drives.get(self.disks_prcache + filename)
+            slotstr = re.findall("disk_(\d+).json", filename)[0]
 
-                if not slotstr.isdigit():
-                    logger.debug(f"slot {slotstr} not numeric, ignoring")
-                    continue
+            if not slotstr.isdigit():
+                logger.debug(f"slot {slotstr} not numeric, ignoring")
+                continue
 
-                slot = int(slotstr)
+            slot = int(slotstr)
 
-                if drive :
-                    sn = drive.get("serial-number","NA")
-                    self.memcache_disks[slot] = {"serial-number":sn}
+            if drive :
+                sn = drive.get("serial-number","NA")
+                self.memcache_disks[slot] = {"serial-number":sn}
 
         #logger.debug("Disk cache built from persistent cache {0}".
         #    format(self.memcache_disks))
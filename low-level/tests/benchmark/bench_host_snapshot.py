@@ -0,0 +1,90 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the data NodeData collects for the
+                    host_update, local_mount_data and disk_space_alert
+                    messages of one transmit cycle. Compares the psutil
+                    calls, including the status of every process, against
+                    one HostSnapshot and reports the cost per cycle. The
+                    gap grows with the number of processes on the node.
+
+  Usage:             cd low-level && python3 -m tests.benchmark.bench_host_snapshot [cycles]
+ ****************************************************************************
+"""
+
+import os
+import sys
+import time
+
+import psutil
+
+from framework.utils.host_snapshot import HostSnapshot
+
+
+def _psutil_cycle():
+    # host_update
+    psutil.boot_time()
+    dict(psutil.virtual_memory()._asdict())
+    len(psutil.pids())
+    psutil.users()
+    running = 0
+    for proc in psutil.process_iter():
+        pinfo = proc.as_dict(attrs=['status'])
+        if pinfo['status'] not in (psutil.STATUS_ZOMBIE, psutil.STATUS_DEAD,
+                                   psutil.STATUS_STOPPED, psutil.STATUS_IDLE,
+                                   psutil.STATUS_SLEEPING):
+            running += 1
+    # local_mount_data
+    psutil.disk_usage("/")
+    psutil.disk_usage("/")
+    psutil.swap_memory()
+    psutil.swap_memory()
+    os.statvfs("/")
+    os.statvfs("/")
+    os.statvfs("/")
+    # disk_space_alert
+    psutil.disk_usage("/")
+    psutil.disk_usage("/")
+    psutil.disk_usage("/")
+
+
+def _snapshot_cycle():
+    HostSnapshot()
+    psutil.users()
+
+
+def _per_cycle(func, cycles):
+    start, cpu_start = time.time(), time.process_time()
+    for _ in range(cycles):
+        func()
+    return ((time.time() - start) / cycles,
+            (time.process_time() - cpu_start) / cycles)
+
+
+def main(cycles):
+    print("processes: %d, cycles: %d" % (len(psutil.pids()), cycles))
+    for name, func in (("psutil", _psutil_cycle),
+                       ("snapshot", _snapshot_cycle)):
+        wall, cpu = _per_cycle(func, cycles)
+        print("%-9s %8.2f ms/cycle  %8.2f ms CPU/cycle" %
+              (name, wall * 1000, cpu * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,67 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of ipmitool command latency. Runs 'sdr type
+                    Fan' as one process per command, like IPMITool did for
+                    every call, and through an IpmiShellPool session, and
+                    reports the average time per command. Against a LAN
+                    BMC most of the process time is opening the RMCP+
+                    session.
+
+  Usage:             cd low-level && python3 -m tests.benchmark.bench_ipmi_shell [count] [ipmitool command...]
+                    e.g. ... bench_ipmi_shell 20 sudo ipmitool -I lanplus -H <bmc> -U <user> -P <pass>
+ ****************************************************************************
+"""
+
+import subprocess
+import sys
+import time
+
+from framework.utils.ipmi_shell import IpmiShellPool
+
+SUBCOMMAND = ["sdr", "type", "Fan"]
+
+
+def main(count, command):
+    start = time.time()
+    for _ in range(count):
+        subprocess.run(command + SUBCOMMAND, stdout=subprocess.PIPE,
+                       stderr=subprocess.PIPE, check=True)
+    process = (time.time() - start) / count
+
+    pool = IpmiShellPool(1, 30, "utf8")
+    pool.reset(command)
+    # Start the shell outside of the measurement
+    if pool.run(" ".join(SUBCOMMAND)) is None:
+        sys.exit("ipmitool shell is not available: %s" % " ".join(command))
+    start = time.time()
+    for _ in range(count):
+        assert pool.run(" ".join(SUBCOMMAND)) is not None
+    shell = (time.time() - start) / count
+    pool.reset()
+
+    print("%d commands: %s" % (count, " ".join(command + SUBCOMMAND)))
+    print("process per command: %8.1f ms" % (process * 1000))
+    print("ipmitool shell:      %8.1f ms" % (shell * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         sys.argv[2:] or ["sudo", "/usr/bin/ipmitool"])
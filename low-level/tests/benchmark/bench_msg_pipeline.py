@@ -0,0 +1,127 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the internal message pipeline. Takes a
+                    validated enclosure disk alert from a handler through
+                    the internal queue and the egress signing and
+                    serialization, once as a getJson() string (dumps, loads
+                    in _check_debug, dumps at egress) and once as a
+                    getMsg() InternalMsg, and reports the CPU time per
+                    message. Schema validation is the same in both and is
+                    left out.
+
+  Usage:             cd low-level && python3 -m tests.benchmark.bench_msg_pipeline [count]
+ ****************************************************************************
+"""
+
+import json
+import queue
+import sys
+import time
+
+from framework.base.debug import Debug
+from framework.base.internal_msg import InternalMsg
+from framework.messaging.egress_processor import EgressProcessor
+from framework.messaging.message_signing import MessageSigner
+from json_msgs.messages.sensors.realstor_disk_data import RealStorDiskDataMsg
+
+SPECIFIC_INFO = {
+    "durable-id": "disk_00.01", "serial-number": "ZC20ABCD0000E1234567",
+    "vendor": "SEAGATE", "model": "ST10000NM0226", "revision": "TT55",
+    "health": "Fault", "health-reason": "The disk is not present.",
+    "health-recommendation": "- Replace the disk.", "size": "10.0TB",
+    "location": "0.1", "enclosure-id": 0, "slot": 1, "status": "Up",
+    "usage": "LINEAR POOL", "disk-group": "dg01", "temperature": "34 C",
+    "power-on-hours": 9000, "rpm": 7200, "blocks": 19532873728,
+    "error": "", "extended-status": [0, 0, 0, 0]
+}
+
+
+class Module(Debug):
+    """The part of a module thread the message passes through"""
+
+    def name(self):
+        return "EgressProcessor"
+
+
+def _egress():
+    egress = EgressProcessor.__new__(EgressProcessor)
+    egress._signature_user = "sspl-ll"
+    egress._signature_token = "ALOIUD986798df69a8koDISLKJ282983"
+    egress._signature_expires = "3600"
+    egress._signer = MessageSigner(egress._signature_user,
+                                   egress._signature_token,
+                                   egress._signature_expires)
+    return egress
+
+
+def _validated_msg():
+    info = {"resource_type": "enclosure:hw:disk", "event_time": "1600000000",
+            "resource_id": "disk_00.01"}
+    msg = RealStorDiskDataMsg("srvnode-1", "fault", "16000000000001",
+                              "critical", info, dict(SPECIFIC_INFO))
+    msg._json = msg.validateMsg(msg._json)
+    return msg._json
+
+
+def _legacy(module, egress, q, validated):
+    # getJson() after validation
+    q.put((json.dumps(validated), None))
+    jsonMsg, _ = q.get()
+    _, jsonMsg = module._check_debug(jsonMsg)
+    return egress._serialize(jsonMsg)
+
+
+def _internal_msg(module, egress, q, validated):
+    # getMsg() after validation
+    q.put((InternalMsg(validated), None))
+    jsonMsg, _ = q.get()
+    _, jsonMsg = module._check_debug(jsonMsg)
+    return egress._serialize(jsonMsg)
+
+
+def _cpu_per_msg(func, count, *args):
+    start = time.process_time()
+    for _ in range(count):
+        func(*args)
+    return (time.process_time() - start) / count
+
+
+def main(count):
+    module, egress, q = Module(), _egress(), queue.Queue()
+    validated = _validated_msg()
+    # Both paths transmit the same message
+    assert json.loads(_legacy(module, egress, q, validated)).keys() == \
+        json.loads(_internal_msg(module, egress, q, validated)).keys()
+
+    legacy = _cpu_per_msg(_legacy, count, module, egress, q, validated)
+    internal = _cpu_per_msg(_internal_msg, count, module, egress, q,
+                            validated)
+    print("message size: %d bytes, %d messages" %
+          (len(json.dumps(validated)), count))
+    print("getJson() string: %7.1f us/msg" % (legacy * 1e6))
+    print("getMsg() object:  %7.1f us/msg" % (internal * 1e6))
+    print("CPU saved:        %7.1f us/msg (%.0f%%)" %
+          ((legacy - internal) * 1e6, 100 * (legacy - internal) / legacy))
+    print("signing:          %7.1f us/msg" %
+          egress._signer.get_stats()["sign_us_per_msg"])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,121 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Micro-benchmark of JSON message validation. For every
+                    message class under json_msgs/messages it reports the
+                    messages per second when the schema is re-read and
+                    compiled per message (legacy) and when the cached
+                    validator from SchemaValidator is used.
+
+  Usage:             cd low-level && python3 -m tests.benchmark.bench_msg_validation [count]
+ ****************************************************************************
+"""
+
+import importlib
+import inspect
+import json
+import pkgutil
+import sys
+import time
+
+from jsonschema import Draft3Validator, validate
+
+import json_msgs.messages.actuators as actuators
+import json_msgs.messages.sensors as sensors
+from json_msgs.messages.actuators.base_actuators_msg import BaseActuatorMsg
+from json_msgs.messages.schema_validator import SchemaValidator
+from json_msgs.messages.sensors.base_sensors_msg import BaseSensorMsg
+
+# Constructor arguments which have to be a dict for the message to build
+DICT_ARGS = ("info", "specific_info", "fru", "jsonMsg", "trap_data",
+             "sensor_response", "actuator_response")
+
+
+def _message_classes():
+    """Yields every concrete message class found under json_msgs/messages"""
+    for package in (sensors, actuators):
+        for module_info in pkgutil.iter_modules(package.__path__):
+            module = importlib.import_module(
+                "%s.%s" % (package.__name__, module_info.name))
+            for _, klass in inspect.getmembers(module, inspect.isclass):
+                if klass.__module__ != module.__name__:
+                    continue
+                if issubclass(klass, (BaseSensorMsg, BaseActuatorMsg)) and \
+                        klass not in (BaseSensorMsg, BaseActuatorMsg):
+                    yield klass
+
+
+class _Placeholder(dict):
+    """A dict argument which answers every lookup with a string"""
+
+    def get(self, key, default=None):
+        return super(_Placeholder, self).get(key, "NA")
+
+
+def _build(klass):
+    """Instantiates klass with placeholder values for required arguments"""
+    args = []
+    for name, param in inspect.signature(klass.__init__).parameters.items():
+        if name == "self" or param.default is not inspect.Parameter.empty:
+            continue
+        args.append(_Placeholder() if name in DICT_ARGS else "NA")
+    return klass(*args)
+
+
+def _legacy_validate(msg):
+    """Per message cost before the validator registry"""
+    with open(msg._schema_file, 'r') as f:
+        _schema = f.read()
+    schema = json.loads(' '.join(_schema.split()))
+    Draft3Validator.check_schema(schema)
+    validate(msg._json, schema)
+    return json.dumps(msg._json)
+
+
+def _rate(func, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def main(count):
+    # Measure the cost of validating every message, not the sampled rate
+    SchemaValidator._mode = SchemaValidator.MODE_ALL
+
+    print("%-32s %14s %14s %8s" % ("message", "legacy msg/s", "cached msg/s",
+                                   "speedup"))
+    for klass in sorted(_message_classes(), key=lambda k: k.__name__):
+        try:
+            msg = _build(klass)
+            msg.getJson()
+        except Exception as err:
+            print("%-32s skipped: %r" % (klass.__name__, err))
+            continue
+
+        legacy = _rate(lambda: _legacy_validate(msg), count)
+        cached = _rate(msg.getJson, count)
+        print("%-32s %14.0f %14.0f %7.1fx" % (klass.__name__, legacy,
+                                              cached, cached / legacy))
+
+    SchemaValidator.clear()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
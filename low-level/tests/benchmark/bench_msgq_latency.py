@@ -0,0 +1,102 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the request latency of a module which
+                    serves requests between periodic transmits, like
+                    NodeDataMsgHandler. Compares polling the queue with
+                    _read_my_msgQ_noWait and sleep(1) against
+                    wait_msg_or_deadlines and reports the time from
+                    queueing a request to handling it.
+
+  Usage:             cd low-level && python3 -m tests.benchmark.bench_msgq_latency [requests]
+ ****************************************************************************
+"""
+
+import queue
+import random
+import sys
+import threading
+import time
+
+from framework.base.debug import Debug
+from framework.base.internal_msgQ import InternalMsgQ
+
+TRANSMIT_INTERVAL = 5
+
+
+class Module(InternalMsgQ, Debug):
+    """Handles node_data requests until the transmit interval is over"""
+
+    def __init__(self, msgQlist):
+        super(Module, self).__init__()
+        self.initialize_msgQ(msgQlist)
+        self.latencies = []
+        self.done = threading.Event()
+
+    def name(self):
+        return "NodeDataMsgHandler"
+
+    def _process_msg(self, jsonMsg):
+        if jsonMsg.get("stop"):
+            self.done.set()
+        else:
+            self.latencies.append(time.time() - jsonMsg["sent"])
+
+    def run_polling(self):
+        while not self.done.is_set():
+            timer = TRANSMIT_INTERVAL
+            while timer > 0 and not self.done.is_set():
+                jsonMsg, _ = self._read_my_msgQ_noWait()
+                if jsonMsg is not None:
+                    self._process_msg(jsonMsg)
+                time.sleep(1)
+                timer -= 1
+
+    def run_deadline(self):
+        while not self.done.is_set():
+            deadline = {"transmit": time.time() + TRANSMIT_INTERVAL}
+            while not self.done.is_set():
+                jsonMsg, _, due = self.wait_msg_or_deadlines(deadline)
+                if jsonMsg is not None:
+                    self._process_msg(jsonMsg)
+                if due:
+                    break
+
+
+def measure(mode, requests):
+    msgQlist = {"NodeDataMsgHandler": queue.Queue()}
+    module = Module(msgQlist)
+    thread = threading.Thread(target=getattr(module, "run_" + mode))
+    thread.start()
+    for _ in range(requests):
+        time.sleep(random.uniform(0.1, 0.9))
+        msgQlist["NodeDataMsgHandler"].put(({"sent": time.time()}, None))
+    msgQlist["NodeDataMsgHandler"].put(({"stop": True}, None))
+    thread.join()
+
+    latencies = sorted(module.latencies)
+    print("%-9s requests: %3d  avg: %8.2f ms  max: %8.2f ms" %
+          (mode, len(latencies), 1000 * sum(latencies) / len(latencies),
+           1000 * latencies[-1]))
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for mode in ("polling", "deadline"):
+        measure(mode, requests)
@@ -0,0 +1,118 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the module schedulers. Runs a set of
+                    modules rescheduling run() every 1 to 30 seconds on
+                    their own sched.scheduler threads and then on the
+                    shared scheduler, each in a fresh process, and reports
+                    thread count, RSS and context switches per second.
+
+  Usage:             cd low-level && python3 -m tests.benchmark.bench_scheduler [modules] [seconds]
+ ****************************************************************************
+"""
+
+import resource
+import subprocess
+import sys
+import threading
+import time
+from sched import scheduler
+
+from framework.base.shared_scheduler import ModuleScheduler, SharedScheduler
+
+# Reschedule intervals of the modules in seconds, cycled over the modules
+INTERVALS = [1, 1, 5, 10, 10, 15, 30, 30]
+
+
+class FakeModule(object):
+    """Does a little work and reschedules itself, like a sensor's run()"""
+
+    def __init__(self, sched, interval):
+        self._scheduler = sched
+        self._interval = interval
+        self.runs = 0
+
+    def run(self):
+        self.runs += 1
+        sum(range(1000))
+        self._scheduler.enter(self._interval, 0, self.run, ())
+
+
+def _rss_kb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _context_switches():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def run_engine(engine, modules, seconds):
+    shared = SharedScheduler() if engine == "shared" else None
+    fakes = []
+    for index in range(modules):
+        if shared:
+            sched = ModuleScheduler(shared, f"module-{index}")
+        else:
+            sched = scheduler(time.time, time.sleep)
+        fake = FakeModule(sched, INTERVALS[index % len(INTERVALS)])
+        sched.enter(0, 0, fake.run, ())
+        fakes.append(fake)
+        if shared:
+            sched.run()
+        else:
+            threading.Thread(target=sched.run, daemon=True).start()
+
+    time.sleep(1)
+    switches = _context_switches()
+    start = time.time()
+    time.sleep(seconds)
+    elapsed = time.time() - start
+    switches = _context_switches() - switches
+
+    print("%-7s threads: %3d  rss: %6d kB  context switches/sec: %8.1f  "
+          "runs: %d" % (engine, threading.active_count(), _rss_kb(),
+                        switches / elapsed, sum(f.runs for f in fakes)))
+    if shared:
+        print("%-7s timer wake-ups/sec: %.1f" %
+              (engine, shared.get_stats()["wakeups"] / (elapsed + 1)))
+
+
+def main(modules, seconds):
+    for engine in ("thread", "shared"):
+        subprocess.check_call([sys.executable, "-m",
+                               "tests.benchmark.bench_scheduler",
+                               "--engine", engine, str(modules), str(seconds)])
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    engine = None
+    if args[:1] == ["--engine"]:
+        engine, args = args[1], args[2:]
+    modules = int(args[0]) if len(args) > 0 else 25
+    seconds = int(args[1]) if len(args) > 1 else 60
+    if engine:
+        run_engine(engine, modules, seconds)
+    else:
+        main(modules, seconds)
@@ -0,0 +1,91 @@
+#!/usr/bin/python3.6
+
+# Copyright (c) 2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+"""
+ ****************************************************************************
+  Description:       Benchmark of the unsent message queue. Measures the
+                    enqueue and dequeue rate of the journal queue and the
+                    time it takes to recover a journal holding all the
+                    queued messages.
+
+  Usage:             cd low-level && python3 -m tests.benchmark.bench_store_queue [count]
+ ****************************************************************************
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+from framework.utils.journal_queue import JournalQueue
+
+# A typical sensor alert once serialized
+ALERT = json.dumps({
+    "username": "sspl-ll", "signature": "None", "time": "1618833431",
+    "expires": 3600, "title": "SSPL Sensor Response",
+    "description": "Seagate Storage Platform Library - Sensor Response",
+    "message": {"sensor_response_type": {
+        "alert_type": "fault", "severity": "critical",
+        "alert_id": "16188334313ed6d38ddc8f4ad0a3f0f1c1b6ce3b5c",
+        "host_id": "srvnode-1.mgmt.public",
+        "info": {"resource_type": "enclosure:hw:disk",
+                 "resource_id": "0.23", "event_time": "1618833431",
+                 "description": "The disk has a critical error."},
+        "specific_info": {"health-reason": "The disk is missing."}}}})
+
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed else float("inf")
+
+
+def main(count):
+    path = tempfile.mkdtemp()
+    try:
+        queue = JournalQueue(path, max_size=count * len(ALERT) * 2)
+
+        start = time.perf_counter()
+        for _ in range(count):
+            queue.put(ALERT)
+        queue.flush()
+        enqueue = time.perf_counter() - start
+        queue.close()
+
+        start = time.perf_counter()
+        queue = JournalQueue(path, max_size=count * len(ALERT) * 2)
+        recovery = time.perf_counter() - start
+        queued = queue.current_size
+
+        start = time.perf_counter()
+        dequeued = 0
+        while queue.get() is not None:
+            dequeued += 1
+        queue.flush()
+        dequeue = time.perf_counter() - start
+        queue.close()
+
+        print("messages:       %d (%d bytes journaled)" % (count, queued))
+        print("enqueue:        %.0f msgs/sec" % _rate(count, enqueue))
+        print("recovery:       %.3f sec" % recovery)
+        print("dequeue:        %.0f msgs/sec (%d read)" %
+              (_rate(dequeued, dequeue), dequeued))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
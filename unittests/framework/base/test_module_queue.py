@@ -0,0 +1,93 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+import threading
+import unittest
+
+from framework.base.module_queue import (ACK as ACK_LANE, CRITICAL,
+                                         INFORMATIONAL, NORMAL, ModuleQueue,
+                                         message_lane)
+
+
+def _alert(severity):
+    return {"message": {"sensor_response_type": {"severity": severity}}}
+
+
+ACK = {"message": {"actuator_response_type": {"ack": {}}}}
+
+
+class TestModuleQueue(unittest.TestCase):
+    """Test the ordering, priority lanes and overflow policies of module
+    queues."""
+
+    def test_acks_first_alerts_in_order(self):
+        q = ModuleQueue("Test")
+        for msg in (_alert("informational"), _alert("warning"),
+                    _alert("critical"), ACK):
+            q.put((msg, None))
+        self.assertEqual(q.qsize(), 4)
+        self.assertEqual(q.get()[0], ACK)
+        self.assertEqual(q.get()[0], _alert("informational"))
+        self.assertEqual(q.get()[0], _alert("warning"))
+        self.assertEqual(q.get()[0], _alert("critical"))
+        self.assertTrue(q.empty())
+
+    def test_message_lane(self):
+        self.assertEqual(message_lane(ACK), ACK_LANE)
+        self.assertEqual(message_lane(_alert("error")), CRITICAL)
+        self.assertEqual(message_lane('{"severity":"critical"}'), CRITICAL)
+        self.assertEqual(message_lane(b'{"alert_type": "fault"}'), CRITICAL)
+        self.assertEqual(message_lane('{"severity" : "informational"}'),
+                         INFORMATIONAL)
+        self.assertEqual(message_lane('not json "severity": "critical"'),
+                         NORMAL)
+
+    def test_drop_evicts_least_important(self):
+        q = ModuleQueue("Test", capacity=2)
+        event = threading.Event()
+        q.put((_alert("informational"), event))
+        q.put((_alert("warning"), None))
+        q.put((_alert("critical"), None))
+        self.assertTrue(event.is_set())
+        q.put((_alert("informational"), None))
+        stats = q.get_stats()
+        self.assertEqual(stats["depth"], 2)
+        self.assertEqual(stats["dropped"], 2)
+        self.assertEqual([item[0] for item in q.queue],
+                         [_alert("warning"), _alert("critical")])
+        self.assertEqual(stats["lanes"]["critical"], 1)
+
+    def test_spill(self):
+        spilled = []
+        q = ModuleQueue("Test", capacity=1, policy=ModuleQueue.SPILL,
+                        spill=spilled.append)
+        q.put(('{"severity": "warning"}', None))
+        q.put(('{"severity": "critical"}', None))
+        self.assertEqual(spilled, ['{"severity": "warning"}'])
+        self.assertEqual(q.get_stats()["spilled"], 1)
+
+    def test_block_waits_for_space(self):
+        q = ModuleQueue("Test", capacity=1, policy=ModuleQueue.BLOCK,
+                        block_timeout=5)
+        q.put((_alert("warning"), None))
+        reader = threading.Timer(0.1, q.get)
+        reader.start()
+        q.put((_alert("informational"), None))
+        reader.join()
+        self.assertEqual(q.get_nowait()[0], _alert("informational"))
+        self.assertEqual(q.get_stats()["dropped"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from framework.utils.cached_store import CachedStore
+from framework.utils.filestore import FileStore
+
+
+class CountingFileStore(FileStore):
+    """FileStore recording how often the disk is read."""
+
+    def __init__(self):
+        super(CountingFileStore, self).__init__()
+        self.reads = 0
+
+    def get(self, key, option=None):
+        self.reads += 1
+        return super(CountingFileStore, self).get(key, option)
+
+
+class TestCachedStore(unittest.TestCase):
+    """Test the write-through cache placed in front of the store."""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.inner = CountingFileStore()
+        self.store = CachedStore(self.inner, max_entries=2, default_ttl=60,
+                                 prefix_ttl={os.path.join(self.path, "nocache"): 0})
+
+    def _key(self, name):
+        return os.path.join(self.path, name)
+
+    def test_get_served_from_cache(self):
+        self.inner.put({"state": "OK"}, self._key("a"))
+        self.assertEqual(self.store.get(self._key("a")), {"state": "OK"})
+        value = self.store.get(self._key("a"))
+        self.assertEqual(value, {"state": "OK"})
+        self.assertEqual(self.inner.reads, 1)
+        # Callers get their own copy
+        value["state"] = "changed"
+        self.assertEqual(self.store.get(self._key("a")), {"state": "OK"})
+        self.assertEqual(self.store.get_stats()["hits"], 2)
+
+    def test_write_through_and_delete(self):
+        self.store.put(1, self._key("a"))
+        self.assertEqual(self.inner.get(self._key("a")), 1)
+        self.assertEqual(self.store.get(self._key("a")), 1)
+        self.assertEqual(self.inner.reads, 1)
+        self.store.delete(self._key("a"))
+        self.assertFalse(os.path.exists(self._key("a")))
+        self.assertEqual(self.store.exists(self._key("a")), (False, "Success"))
+
+    def test_unpickled_values_not_cached(self):
+        self.store.put("raw", self._key("a"), pickled=False)
+        self.assertEqual(self.store.get_stats()["entries"], 0)
+        self.store.get(self._key("a"))
+        self.assertEqual(self.inner.reads, 1)
+
+    def test_lru_and_zero_ttl(self):
+        for name in ("a", "b", "c"):
+            self.store.put(name, self._key(name))
+        stats = self.store.get_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.store.put("x", self._key("nocache"))
+        self.assertEqual(self.store.get_stats()["entries"], 2)
+
+    def test_many(self):
+        self.store.put_many({self._key("a"): 1, self._key("b"): 2})
+        self.assertEqual(self.store.get_many([self._key("a"), self._key("b"),
+                                              self._key("missing")]),
+                         {self._key("a"): 1, self._key("b"): 2,
+                          self._key("missing"): None})
+        self.assertEqual(self.inner.reads, 0)
+        self.store.delete_many([self._key("a"), self._key("b")])
+        self.assertEqual(self.inner.get_many([self._key("a")]),
+                         {self._key("a"): None})
+
+    def test_wrapped_store_exposed(self):
+        self.assertIs(self.store.wrapped, self.inner)
+        self.assertIsInstance(self.store.wrapped, FileStore)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
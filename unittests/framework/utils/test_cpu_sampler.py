@@ -0,0 +1,87 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import os
+import tempfile
+import unittest
+
+from framework.utils.cpu_sampler import CpuSampler, RingBuffer
+
+
+class TestCpuSampler(unittest.TestCase):
+    """Test the usage computed from /proc/stat readings."""
+
+    def setUp(self):
+        CpuSampler._instance = None
+        fd, self.proc_stat = tempfile.mkstemp()
+        os.close(fd)
+        self.times = [[0] * 8, [0] * 8]
+        self._write()
+        self.sampler = CpuSampler(1, 4, self.proc_stat)
+        self.sampler._prev = self.sampler._read()
+
+    def tearDown(self):
+        CpuSampler._instance = None
+        os.remove(self.proc_stat)
+
+    def _write(self):
+        with open(self.proc_stat, "w") as proc_stat:
+            total = [sum(field) for field in zip(*self.times)]
+            for name, times in [("cpu", total), ("cpu0", self.times[0]),
+                                ("cpu1", self.times[1])]:
+                proc_stat.write(f"{name} {' '.join(map(str, times))} 0 0\n")
+            proc_stat.write("intr 12345\n")
+
+    def _tick(self, busy0, busy1):
+        # 100 jiffies per CPU, busy ones split between user and system
+        for cpu, busy in enumerate((busy0, busy1)):
+            self.times[cpu][0] += busy // 2
+            self.times[cpu][2] += busy - busy // 2
+            self.times[cpu][3] += 100 - busy
+        self._write()
+        self.sampler.sample()
+
+    def test_no_samples(self):
+        self.assertEqual(self.sampler.current(), -1)
+        self.assertEqual(self.sampler.averages(60), [])
+        self.assertEqual(self.sampler.percentile(90, 60), -1)
+
+    def test_usage(self):
+        self._tick(100, 0)
+        self.assertEqual(self.sampler.current(), 50)
+        self.assertEqual(self.sampler.current(0), 100)
+        self.assertEqual(self.sampler.current(1), 0)
+        self.assertEqual(self.sampler.times_percent()["idle"], 50)
+        self.assertEqual(self.sampler.times_percent()["user"], 25)
+
+    def test_windows(self):
+        for busy in (10, 20, 30, 40, 50, 60):
+            self._tick(busy, 0)
+        # Only the last 4 samples are kept
+        self.assertEqual(self.sampler.averages(2), [55, 0])
+        self.assertEqual(self.sampler.averages(60), [45, 0])
+        self.assertEqual(self.sampler.percentile(100, 60, 0), 60)
+        self.assertEqual(self.sampler.percentile(0, 60, 0), 30)
+
+    def test_ring_buffer_wraps(self):
+        ring = RingBuffer(3)
+        for value in range(5):
+            ring.append(value)
+        self.assertEqual(list(ring.last(10)), [2, 3, 4])
+        self.assertEqual(list(ring.last(2)), [3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from framework.utils.ipmi_shell import IpmiShell
+
+# Stand-in for 'ipmitool shell' with stdout block buffered on the pipe,
+# flushed only when the prompt is printed, and errors on stderr
+FAKE_IPMITOOL = """\
+import os, sys
+out = os.fdopen(1, "w", buffering=65536)
+while True:
+    out.write("ipmitool> ")
+    out.flush()
+    line = sys.stdin.readline()
+    if not line or line.strip() == "exit":
+        break
+    args = line.split()
+    if args[0] == "echo":
+        out.write(" ".join(args[1:]) + " \\n")
+    elif args[0] == "sdr":
+        out.write("".join(f"Sensor {i} | ok\\n" for i in range(500)))
+    else:
+        sys.stderr.write(f"Invalid command: {args[0]}\\n")
+        sys.stderr.flush()
+"""
+
+
+class TestIpmiShell(unittest.TestCase):
+    """Test commands run in a long-lived ipmitool shell."""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        script = os.path.join(self.path, "ipmitool.py")
+        with open(script, "w") as fh:
+            fh.write(FAKE_IPMITOOL)
+        self.shell = IpmiShell([sys.executable, script], "utf8", 5)
+
+    def test_buffered_output_complete(self):
+        expected = "\n".join(f"Sensor {i} | ok" for i in range(500))
+        for _ in range(3):
+            self.assertEqual(self.shell.run("sdr"), (expected, ""))
+
+    def test_error_on_stderr(self):
+        self.assertEqual(self.shell.run("bogus"),
+                         ("", "Invalid command: bogus"))
+        self.assertEqual(self.shell.run("sdr")[0].count("\n"), 499)
+
+    def tearDown(self):
+        self.shell.close()
+        shutil.rmtree(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
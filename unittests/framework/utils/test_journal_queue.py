@@ -0,0 +1,116 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from framework.utils.journal_queue import JournalQueue
+
+
+class TestJournalQueue(unittest.TestCase):
+    """Test the segmented append only journal used for unsent messages."""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.queue = self._open()
+
+    def _open(self, max_size=1024 * 1024, segment_size=256):
+        return JournalQueue(self.path, max_size, segment_size=segment_size,
+                            fsync_batch=4, fsync_interval=0)
+
+    def _segments(self):
+        return [f for f in os.listdir(self.path) if f.endswith(".log")]
+
+    def test_fifo_across_segments(self):
+        self.assertTrue(self.queue.is_empty())
+        for i in range(50):
+            self.queue.put("message-%d" % i)
+        self.assertFalse(self.queue.is_empty())
+        self.assertGreater(len(self._segments()), 1)
+        for i in range(50):
+            self.assertEqual(self.queue.get(), b"message-%d" % i)
+        self.assertTrue(self.queue.is_empty())
+        self.assertIsNone(self.queue.get())
+        self.assertEqual(len(self._segments()), 1)
+        self.assertEqual(self.queue.current_size, 0)
+
+    def test_recovery_keeps_unread_messages(self):
+        for i in range(20):
+            self.queue.put("message-%d" % i)
+        for i in range(5):
+            self.queue.get()
+        self.queue.close()
+
+        self.queue = self._open()
+        for i in range(5, 20):
+            self.assertEqual(self.queue.get(), b"message-%d" % i)
+        self.assertTrue(self.queue.is_empty())
+
+    def test_torn_record_is_truncated(self):
+        self.queue.put("complete")
+        self.queue.close()
+        segment = os.path.join(self.path, sorted(self._segments())[-1])
+        with open(segment, "ab") as f:
+            f.write(b"\x10\x00\x00\x00\x00")
+
+        self.queue = self._open()
+        self.assertEqual(self.queue.get(), b"complete")
+        self.assertTrue(self.queue.is_empty())
+
+    def test_oldest_messages_dropped_when_full(self):
+        self.queue.close()
+        self.queue = self._open(max_size=200)
+        for i in range(100):
+            self.queue.put("message-%03d" % i)
+        self.assertLess(self.queue.current_size, 200)
+        self.assertEqual(self.queue.get(), b"message-%03d" % 90)
+
+    def test_batch_consumed_only_on_commit(self):
+        for i in range(30):
+            self.queue.put("message-%d" % i)
+        batch = self.queue.get_batch(10)
+        self.assertEqual([item for _, item in batch],
+                         [b"message-%d" % i for i in range(10)])
+        # Nothing is consumed until the batch is committed
+        self.assertEqual(self.queue.get_batch(1)[0][1], b"message-0")
+        self.queue.commit(batch[-1][0])
+        batch = self.queue.get_batch(100)
+        self.assertEqual(len(batch), 20)
+        self.assertEqual(batch[0][1], b"message-10")
+        self.queue.commit(batch[-1][0])
+        self.assertTrue(self.queue.is_empty())
+        self.assertEqual(self.queue.current_size, 0)
+
+    def test_idle_put_synced_by_timer(self):
+        self.queue.close()
+        self.queue = JournalQueue(self.path, 1024 * 1024, fsync_batch=100,
+                                  fsync_interval=0.1)
+        self.queue.put("message")
+        self.assertEqual(self.queue._unsynced_writes, 1)
+        deadline = time.time() + 5
+        while self.queue._unsynced_writes and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.queue._unsynced_writes, 0)
+
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import socket
+import unittest
+
+from framework.utils.netlink_monitor import (
+    IFA_LOCAL, IFADDRMSG, IFF_UP, IFINFOMSG, IFLA_CARRIER, IFLA_IFNAME,
+    IFLA_OPERSTATE, NLMSG_DONE, NLMSGHDR, RTATTR, RTM_DELLINK, RTM_GETADDR,
+    RTM_GETLINK, RTM_NEWADDR, RTM_NEWLINK, LinkMonitor, _align, _attributes)
+
+
+def rtattr(attr_type, payload):
+    data = RTATTR.pack(RTATTR.size + len(payload), attr_type) + payload
+    return data + b"\0" * (_align(len(data)) - len(data))
+
+
+def link(index, name, operstate=6, carrier=1, flags=IFF_UP):
+    return IFINFOMSG.pack(socket.AF_UNSPEC, 1, index, flags, 0) + \
+        rtattr(IFLA_IFNAME, name.encode() + b"\0") + \
+        rtattr(IFLA_OPERSTATE, bytes([operstate])) + \
+        rtattr(IFLA_CARRIER, bytes([carrier]))
+
+
+def addr(index, address):
+    return IFADDRMSG.pack(socket.AF_INET, 24, 0, 0, index) + \
+        rtattr(IFA_LOCAL, socket.inet_aton(address))
+
+
+def message(msg_type, body, seq=0):
+    return NLMSGHDR.pack(NLMSGHDR.size + len(body), msg_type, 0, seq, 0) + body
+
+
+class FakeSocket(object):
+    """Netlink socket replaying canned buffers, recording the requests"""
+
+    def __init__(self):
+        self.buffers = []
+        self.sent = []
+
+    def recv(self, size):
+        return self.buffers.pop(0)
+
+    def send(self, data):
+        self.sent.append(NLMSGHDR.unpack_from(data)[1])
+
+
+class TestLinkMonitor(unittest.TestCase):
+    """Test the netlink message parsing and the interface table."""
+
+    def setUp(self):
+        self.monitor = LinkMonitor()
+        self.monitor._setup()
+        self.monitor._sock = FakeSocket()
+        self.events = []
+        self.monitor.add_listener(self.events.append)
+
+    def _update_link(self, msg_type, body):
+        return self.monitor._update_link(msg_type, body, self.monitor._links,
+                                         self.monitor._addrs)
+
+    def _receive(self, *messages):
+        self.monitor._sock.buffers.append(b"".join(messages))
+        self.monitor._receive(notify=True)
+
+    def test_attributes(self):
+        data = b"head" + rtattr(IFLA_IFNAME, b"eth0\0") + \
+            rtattr(IFLA_OPERSTATE, b"\x06") + rtattr(IFLA_IFNAME, b"eth9\0")
+        attrs = _attributes(data, 4)
+        self.assertEqual(attrs, {IFLA_IFNAME: b"eth0\0",
+                                 IFLA_OPERSTATE: b"\x06"})
+        # A malformed attribute ends the parsing
+        data = b"head" + RTATTR.pack(2, IFLA_IFNAME) + \
+            rtattr(IFLA_OPERSTATE, b"\x06")
+        self.assertEqual(_attributes(data, 4), {})
+
+    def test_update_link(self):
+        self.assertIsNone(self._update_link(RTM_NEWLINK, link(2, "eth0")))
+        self.assertEqual(self.monitor._links[2], ["eth0", "UP", "UP"])
+        # Same state again is no change
+        self.assertIsNone(self._update_link(RTM_NEWLINK, link(2, "eth0")))
+        self.assertEqual(
+            self._update_link(RTM_NEWLINK, link(2, "eth0", 2, 0)), "eth0")
+        self.assertEqual(self.monitor._links[2], ["eth0", "DOWN", "DOWN"])
+        # Administratively down, the carrier is not known
+        self.assertEqual(
+            self._update_link(RTM_NEWLINK, link(2, "eth0", 2, 0, flags=0)),
+            "eth0")
+        self.assertEqual(self.monitor._links[2], ["eth0", "DOWN", "UNKNOWN"])
+        self.assertIsNone(self._update_link(RTM_DELLINK, link(2, "eth0")))
+        self.assertEqual(self.monitor._links, {})
+
+    def test_get_links(self):
+        self._receive(message(RTM_NEWLINK, link(2, "eth0")),
+                      message(RTM_NEWADDR, addr(2, "10.0.0.5")),
+                      message(RTM_NEWLINK, link(3, "eth1", 2, 0)))
+        self.assertEqual(self.monitor.get_links(),
+                         {"eth0": ("UP", "10.0.0.5", "UP"),
+                          "eth1": ("DOWN", "", "DOWN")})
+        self._receive(message(RTM_NEWLINK, link(3, "eth1")))
+        self.assertEqual(self.events, ["eth1"])
+
+    def test_reload_replaces_table(self):
+        self._receive(message(RTM_NEWLINK, link(2, "eth0")),
+                      message(RTM_NEWADDR, addr(2, "10.0.0.5")),
+                      message(RTM_NEWLINK, link(3, "eth1")),
+                      message(RTM_NEWADDR, addr(3, "10.0.1.5")))
+        # Notifications were lost: eth1 went away and eth0 went down and
+        # changed its address
+        self.monitor._dump()
+        self.assertEqual(self.monitor._sock.sent, [RTM_GETLINK])
+        self._receive(message(RTM_NEWLINK, link(2, "eth0", 2, 0), seq=1),
+                      message(NLMSG_DONE, b"", seq=1))
+        self.assertEqual(self.monitor._sock.sent, [RTM_GETLINK, RTM_GETADDR])
+        # The table in use is kept until the dump is complete
+        self.assertIn("eth1", self.monitor.get_links())
+        self._receive(message(RTM_NEWADDR, addr(2, "10.0.0.6"), seq=2),
+                      message(NLMSG_DONE, b"", seq=2))
+        self.assertEqual(self.monitor.get_links(),
+                         {"eth0": ("DOWN", "10.0.0.6", "DOWN")})
+        self.assertEqual(self.events, ["eth0"])
+        self.assertIsNone(self.monitor._reload)
+
+    def test_notification_during_reload(self):
+        self._receive(message(RTM_NEWLINK, link(2, "eth0")))
+        self.monitor._dump()
+        self._receive(message(RTM_NEWLINK, link(2, "eth0"), seq=1),
+                      message(NLMSG_DONE, b"", seq=1),
+                      message(RTM_NEWLINK, link(2, "eth0", 2, 0)))
+        self.assertEqual(self.events, ["eth0"])
+        self._receive(message(NLMSG_DONE, b"", seq=2))
+        self.assertEqual(self.monitor.get_links(),
+                         {"eth0": ("DOWN", "", "DOWN")})
+        self.assertEqual(self.events, ["eth0"])
+
+    def test_lost_during_dump(self):
+        self.monitor._dump()
+        self._receive(message(RTM_NEWLINK, link(2, "eth0"), seq=1))
+        # Replies of the dump in progress were lost as well
+        self.monitor._dump()
+        self.assertEqual(self.monitor._sock.sent, [RTM_GETLINK])
+        self._receive(message(NLMSG_DONE, b"", seq=1))
+        self.assertEqual(self.monitor._sock.sent, [RTM_GETLINK, RTM_GETLINK])
+        self._receive(message(RTM_NEWLINK, link(3, "eth1"), seq=2),
+                      message(NLMSG_DONE, b"", seq=2))
+        self._receive(message(NLMSG_DONE, b"", seq=3))
+        self.assertEqual(self.monitor.get_links(),
+                         {"eth1": ("UP", "", "UP")})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from framework.utils.filestore import FileStore
+from framework.utils.persistent_state import PersistentState
+
+
+class CountingFileStore(FileStore):
+    """FileStore recording how often the disk is written."""
+
+    def __init__(self):
+        super(CountingFileStore, self).__init__()
+        self.writes = 0
+
+    def put(self, value, key, pickled=True):
+        super(CountingFileStore, self).put(value, key, pickled)
+        self.writes += 1
+
+
+class TestPersistentState(unittest.TestCase):
+    """Test the state written to the store only when it changes."""
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.key = os.path.join(self.path, "state", "disks.json")
+        self.store = CountingFileStore()
+
+    def tearDown(self):
+        # Nothing may be written to the directory while it is removed
+        PersistentState.flush_all()
+        shutil.rmtree(self.path)
+
+    def test_unchanged_state_not_written(self):
+        state = PersistentState(self.key, self.store, default={},
+                                flush_interval=0, load=False)
+        drives = state.value
+        drives["/dev/sda"] = False
+        self.assertTrue(state.save(drives))
+        self.assertFalse(state.save(drives))
+        self.assertEqual(self.store.writes, 1)
+        drives["/dev/sda"] = True
+        self.assertTrue(state.save(drives))
+        self.assertEqual(self.store.writes, 2)
+        # No temporary file is left next to the state
+        self.assertEqual(os.listdir(os.path.dirname(self.key)),
+                         ["disks.json"])
+
+        loaded = PersistentState(self.key, self.store, flush_interval=0)
+        self.assertEqual(loaded.value, {"/dev/sda": True})
+        self.assertFalse(loaded.save())
+        self.assertEqual(self.store.writes, 2)
+
+    def test_changes_coalesced(self):
+        state = PersistentState(self.key, self.store, default={},
+                                flush_interval=0.2, load=False)
+        for count in range(5):
+            state.save({"count": count})
+        # The first change is written at once, the last one after the
+        # interval and the ones in between never
+        self.assertEqual(state.get_stats()["writes"], 1)
+        deadline = time.time() + 5
+        while state.get_stats()["writes"] < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(state.get_stats()["writes"], 2)
+        self.assertEqual(self.store.writes, 2)
+        self.assertEqual(self.store.get(self.key), {"count": 4})
+
+    def test_flush_all_writes_pending(self):
+        state = PersistentState(self.key, self.store, default={},
+                                flush_interval=60, load=False)
+        state.save({"conn": "fault_resolved"})
+        state.save({"conn": "fault"})
+        PersistentState.flush_all()
+        self.assertEqual(self.store.get(self.key), {"conn": "fault"})
+        self.assertEqual(state.get_stats()["writes"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
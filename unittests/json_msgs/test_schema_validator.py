@@ -0,0 +1,96 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from jsonschema import ValidationError
+
+from json_msgs.messages.schema_validator import SchemaValidator
+
+
+class TestSchemaValidator(unittest.TestCase):
+    """Test the process wide registry of compiled schema validators."""
+
+    SCHEMA = {
+        "$schema": "http://json-schema.org/draft-03/schema#",
+        "type": "object",
+        "properties": {
+            "username": {"type": "string", "required": True}
+        }
+    }
+
+    def setUp(self):
+        fd, self.schema_file = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.SCHEMA, f, indent=4)
+        SchemaValidator.clear()
+        self.mocked_values = {
+            "MESSAGE_VALIDATION>mode": "all",
+            "MESSAGE_VALIDATION>sample_rate": 1
+        }
+        patcher = patch("json_msgs.messages.schema_validator.Conf.get",
+                        new=Mock(side_effect=self.mocked_conf))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def mocked_conf(self, *args, **kwargs):
+        return self.mocked_values.get(args[1], args[2])
+
+    def test_schema_is_loaded_once(self):
+        with patch("builtins.open", wraps=open) as mocked_open:
+            first = SchemaValidator.get_validator(self.schema_file)
+            second = SchemaValidator.get_validator(self.schema_file)
+        self.assertIs(first, second)
+        self.assertEqual(mocked_open.call_count, 1)
+        self.assertEqual(SchemaValidator.get_schema(self.schema_file),
+                         self.SCHEMA)
+
+    def test_invalid_message_raises(self):
+        SchemaValidator.validate({"username": "sspl-ll"}, self.schema_file)
+        with self.assertRaises(ValidationError):
+            SchemaValidator.validate({}, self.schema_file)
+
+    def test_sample_mode_validates_one_in_n(self):
+        self.mocked_values["MESSAGE_VALIDATION>mode"] = "sample"
+        self.mocked_values["MESSAGE_VALIDATION>sample_rate"] = 3
+        failures = 0
+        for _ in range(9):
+            try:
+                SchemaValidator.validate({}, self.schema_file)
+            except ValidationError:
+                failures += 1
+        self.assertEqual(failures, 3)
+
+    def test_debug_mode_skips_validation_without_debug_logging(self):
+        self.mocked_values["MESSAGE_VALIDATION>mode"] = "debug"
+        with patch("json_msgs.messages.schema_validator.logger.isEnabledFor",
+                   return_value=False):
+            SchemaValidator.validate({}, self.schema_file)
+        with patch("json_msgs.messages.schema_validator.logger.isEnabledFor",
+                   return_value=True):
+            with self.assertRaises(ValidationError):
+                SchemaValidator.validate({}, self.schema_file)
+
+    def tearDown(self):
+        SchemaValidator.clear()
+        os.remove(self.schema_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+# Copyright (c) 2001-2020 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the GNU Affero General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License along
+# with this program. If not, see <https://www.gnu.org/licenses/>. For any questions
+# about this software or licensing, please email opensource@seagate.com or
+# cortx-questions@seagate.com.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+PROJECT_ROOT = "/".join(os.path.abspath(__file__).split("/")
+                        [:-2]) + "/low-level"
+sys.path.append(PROJECT_ROOT)
+
+from sensors.impl.generic.node_hw import NodeHWsensor
+
+SEL_INFO = """SEL Information
+Version          : 1.5 (v1.5, v2 compliant)
+Entries          : {entries}
+Free Space       : 16336 bytes
+Percent Used     : 0%
+Last Add Time    : {last_add}
+Last Del Time    : {last_del}
+Overflow         : false
+"""
+
+SEL_LINES = [
+    "   1 | 04/16/2019 | 05:29:09 | Fan #0x30 | Lower Critical going low  | Asserted",
+    "   2 | 04/16/2019 | 05:30:11 | Power Supply #0x51 | Failure detected | Asserted",
+    "   3 | 04/16/2019 | 05:31:02 | Fan #0x30 | Lower Critical going low  | Deasserted",
+    "   4 | 04/16/2019 | 05:32:40 | Power Supply #0x51 | Failure detected | Deasserted",
+    "   5 | 04/16/2019 | 05:33:15 | Drive Slot / Bay #0xb2 | Drive Present | Asserted",
+]
+
+
+class TestNodeHWSelCursor(unittest.TestCase):
+    """Test reading the new SEL entries from 'sel info' and 'sel list'."""
+
+    def setUp(self):
+        self.sensor = NodeHWsensor.__new__(NodeHWsensor)
+        self.sensor.ipmi_client = Mock(ACTIVE_IPMI_TOOL="ipmitool ")
+        self.sensor.channel_err = False
+        self.sensor.sel_cursor = {}
+        self.sensor._run_ipmitool_subcommand = Mock(side_effect=self._ipmitool)
+        self.sel = list(SEL_LINES[:3])
+        self.last_add = "04/16/2019 05:31:02"
+        self.last_del = "Not Available"
+        self.commands = []
+
+    def _ipmitool(self, subcommand, *args):
+        self.commands.append(subcommand)
+        if subcommand == "sel info":
+            return SEL_INFO.format(entries=len(self.sel),
+                                   last_add=self.last_add,
+                                   last_del=self.last_del), "", 0
+        if subcommand == "sel list":
+            return "\n".join(self.sel) + "\n", "", 0
+        if subcommand.startswith("sel list last "):
+            count = int(subcommand.split()[-1])
+            return "\n".join(self.sel[-count:]) + "\n", "", 0
+        return "", "unexpected command", 1
+
+    def _poll(self):
+        self.commands = []
+        lines, cursor, cleared = self.sensor._read_new_sel_lines()
+        self.sensor.sel_cursor = cursor
+        return lines, cleared
+
+    def _add(self, *lines):
+        self.sel.extend(lines)
+        self.last_add = lines[-1].split("|")[1].strip() + " " + \
+            lines[-1].split("|")[2].strip()
+
+    def test_first_poll_lists_all(self):
+        lines, cleared = self._poll()
+        self.assertEqual(lines, SEL_LINES[:3])
+        self.assertFalse(cleared)
+        self.assertEqual(self.commands, ["sel info", "sel list"])
+        self.assertEqual(self.sensor.sel_cursor, {
+            "entries": 3, "last_add": "04/16/2019 05:31:02",
+            "last_del": "Not Available", "last_record": "3"})
+
+    def test_no_change_lists_nothing(self):
+        self._poll()
+        lines, cleared = self._poll()
+        self.assertEqual(lines, [])
+        self.assertFalse(cleared)
+        self.assertEqual(self.commands, ["sel info"])
+
+    def test_added_only(self):
+        self._poll()
+        self._add(*SEL_LINES[3:])
+        lines, cleared = self._poll()
+        self.assertEqual(lines, SEL_LINES[3:])
+        self.assertFalse(cleared)
+        # The added entries and the anchor only
+        self.assertEqual(self.commands, ["sel info", "sel list last 3"])
+        self.assertEqual(self.sensor.sel_cursor["last_record"], "5")
+        self.assertEqual(self.sensor.sel_cursor["entries"], 5)
+
+    def test_anchor_missing_lists_all(self):
+        self._poll()
+        # The anchor deleted and three added, the delete time left alone
+        del self.sel[2]
+        self._add(*SEL_LINES[3:])
+        self.sel.append(SEL_LINES[2].replace("   3 |", "   6 |"))
+        lines, cleared = self._poll()
+        self.assertEqual(self.commands,
+                         ["sel info", "sel list last 3", "sel list"])
+        self.assertTrue(cleared)
+        self.assertEqual(lines, self.sel)
+        self.assertEqual(self.sensor.sel_cursor["last_record"], "6")
+
+    def test_anchor_found_in_full_list(self):
+        self._poll()
+        # An entry before the anchor deleted, two added
+        del self.sel[0]
+        self.last_del = "04/16/2019 05:32:00"
+        self._add(*SEL_LINES[3:])
+        lines, cleared = self._poll()
+        self.assertEqual(self.commands, ["sel info", "sel list"])
+        self.assertEqual(lines, SEL_LINES[3:])
+        self.assertFalse(cleared)
+
+    def test_cleared(self):
+        self._poll()
+        self.sel = []
+        self.last_del = "04/16/2019 05:40:00"
+        lines, cleared = self._poll()
+        self.assertEqual(lines, [])
+        self.assertTrue(cleared)
+        self.assertIsNone(self.sensor.sel_cursor["last_record"])
+        # Record ids start over after the clear
+        self._add("   1 | 04/16/2019 | 05:41:00 | Fan #0x30 | Lower Critical going low  | Asserted")
+        lines, cleared = self._poll()
+        self.assertEqual(lines, self.sel)
+        self.assertFalse(cleared)
+        self.assertEqual(self.sensor.sel_cursor["last_record"], "1")
+
+    def test_wrapped(self):
+        self._poll()
+        # The oldest entries overwritten, fewer entries than before
+        self.sel = [line.replace("   ", "  1", 1) for line in SEL_LINES[3:]]
+        self.last_add = "04/16/2019 05:33:15"
+        lines, cleared = self._poll()
+        self.assertEqual(self.commands, ["sel info", "sel list"])
+        self.assertEqual(lines, self.sel)
+        self.assertTrue(cleared)
+
+    def test_channel_error_keeps_cursor(self):
+        self._poll()
+        cursor = dict(self.sensor.sel_cursor)
+        self._add(*SEL_LINES[3:])
+        self.sensor.channel_err = True
+        lines, cleared = self._poll()
+        self.assertEqual(lines, [])
+        self.assertFalse(cleared)
+        self.assertEqual(self.sensor.sel_cursor, cursor)
+
+    def test_index_reset_after_clear(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        sensor = self.sensor
+        sensor.fru_types = {"Fan": None, "Power Supply": None}
+        sensor.index_file_name = os.path.join(path, NodeHWsensor.INDEX_FILE)
+        sensor.list_file_name = os.path.join(path, NodeHWsensor.LIST_FILE)
+        sensor.list_file_collect_name = \
+            os.path.join(path, NodeHWsensor.LIST_FILE_COLLECT)
+        sensor.sel_cursor_path = os.path.join(path, "sel_cursor")
+        sensor.list_file = sensor._get_file(sensor.list_file_name)
+        self.addCleanup(lambda: sensor.list_file.close())
+        with patch("sensors.impl.generic.node_hw.store") as store:
+            sensor._update_list_file()
+            sensor._write_index_file("3")
+            self.assertEqual(sensor._read_index_file(), 3)
+            with open(sensor.list_file_name) as list_file:
+                self.assertEqual(list_file.read().splitlines(),
+                                 SEL_LINES[:3])
+            # New entries keep the index
+            self._add(*SEL_LINES[3:])
+            sensor._update_list_file()
+            self.assertEqual(sensor._read_index_file(), 3)
+            with open(sensor.list_file_name) as list_file:
+                self.assertEqual(list_file.read().splitlines(),
+                                 SEL_LINES[3:4])
+            # The SEL cleared, the index starts over
+            self.sel = []
+            self.last_del = "04/16/2019 05:40:00"
+            sensor._update_list_file()
+            self.assertEqual(sensor._read_index_file(), 0)
+            store.put.assert_called_with(sensor.sel_cursor,
+                                         sensor.sel_cursor_path)
+            self.assertIsNone(sensor.sel_cursor["last_record"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,7 +31,8 @@ from sensors.impl.centos_7.service_monitor import (ServiceMonitor, Conf,
                                                    InactiveState, SystemBus,
                                                    Interface,
                                                    MonitoringDisabled,
-                                                   EnabledState, DisabledState)
+                                                   EnabledState, DisabledState,
+                                                   UNIT_IFACE)
 
 
 class TestServiceMonitor(unittest.TestCase):
@@ -59,10 +60,16 @@ class TestServiceMonitor(unittest.TestCase):
             self.service_monitor = ServiceMonitor()
         self.service_monitor._write_internal_msgQ = Mock()
         self.service_monitor.is_running = Mock(return_value=True)
-        time.sleep = Mock(side_effect=self.terminate_run)
+        # systemd without ListUnitsByNames, services load one by one
+        self.service_monitor.list_units = Mock(
+            side_effect=dbus.exceptions.DBusException)
+        # D-Bus signals delivered by one main loop run
+        self.events = Mock()
 
     def mocked_conf(self, *args, **kwargs):
         key = args[1]
+        if key not in self.mocked_conf_values and len(args) > 2:
+            return args[2]
         return self.mocked_conf_values[key]
 
     def mocked_properties(self, *args, **kwargs):
@@ -70,11 +77,19 @@ class TestServiceMonitor(unittest.TestCase):
         return self.mocked_properties_value[key]
 
     def service_monitor_run_iteration(self):
-        self.service_monitor.is_running.return_value = True
-        self.service_monitor.run()
+        loop = Mock()
+        loop.run = Mock(side_effect=self.run_loop)
+        # Idle callbacks run right away instead of on the loop thread
+        with patch("sensors.impl.centos_7.service_monitor.GLibLoop.acquire",
+                   new=Mock(return_value=loop)), \
+                patch("sensors.impl.centos_7.service_monitor.GLib.idle_add",
+                      new=Mock(side_effect=lambda func, *args: func(*args))):
+            self.service_monitor.run()
 
-    def terminate_run(self, *args, **kwargs):
-        self.service_monitor.is_running.return_value = False
+    def run_loop(self):
+        """Delivers the signals, then fires the polling timer once"""
+        self.events()
+        self.service_monitor.poll_services()
 
     @patch(
         'sensors.impl.centos_7.service_monitor.Service.is_nonactive_for_threshold_time',
@@ -126,7 +141,7 @@ class TestServiceMonitor(unittest.TestCase):
         self.service_monitor.services[
             "spam.service"].is_nonactive_for_threshold_time = Mock(
             return_value=True)
-        self.service_monitor.process_events = Mock(
+        self.events = Mock(
             side_effect=partial(self.service_monitor.services[
                                     "spam.service"].properties_changed_handler,
                                 "", "", ""))
@@ -144,7 +159,7 @@ class TestServiceMonitor(unittest.TestCase):
         self.fail_service_at_start()
         self.assert_fault_is_raised()
         self.mocked_properties_value["ActiveState"] = "active"
-        self.service_monitor.process_events = Mock(
+        self.events = Mock(
             side_effect=partial(self.service_monitor.services[
                                     "spam.service"].properties_changed_handler,
                                 "", "", ""))
@@ -163,6 +178,18 @@ class TestServiceMonitor(unittest.TestCase):
             resolved_alert["sensor_request_type"]["service_status_alert"][
                 "specific_info"]["state"], "active")
 
+    def test_signal_payload_used_without_reading_properties(self):
+        self.service_active_at_start()
+        Interface.Get.reset_mock()
+        self.events = partial(self.service_monitor.services[
+                                  "spam.service"].properties_changed_handler,
+                              UNIT_IFACE,
+                              {"ActiveState": "failed", "SubState": "failed"},
+                              [])
+        self.service_monitor_run_iteration()
+        self.assert_failed_fault_is_raised()
+        Interface.Get.assert_not_called()
+
     def fail_service_at_start(self):
         self.mocked_properties_value["ActiveState"] = "failed"
         self.service_monitor.initialize(Mock(), Mock(), Mock())
@@ -182,7 +209,7 @@ class TestServiceMonitor(unittest.TestCase):
     def service_active_at_start(self):
         self.mocked_properties_value["ActiveState"] = "active"
         self.service_monitor.initialize(Mock(), Mock(), Mock())
-        self.service_monitor.process_events = Mock(
+        self.events = Mock(
             side_effect=partial(self.service_monitor.services[
                                     "spam.service"].properties_changed_handler,
                                 "", "", ""))
@@ -204,6 +231,24 @@ class TestServiceMonitor(unittest.TestCase):
         self.service_monitor_run_iteration()
         self.service_monitor._write_internal_msgQ.assert_called_once()
 
+    @patch(
+        'sensors.impl.centos_7.service_monitor.Service.load_cache',
+        new=Mock(return_value={}))
+    def test_services_initialized_from_one_listing(self):
+        self.service_monitor.list_units = Mock(return_value=(
+            [("spam.service", "", "loaded", "failed", "failed", "",
+              "/org/freedesktop/systemd1/unit/spam_2eservice", 0, "", "/")],
+            {"spam.service": "enabled"}))
+        self.service_monitor.initialize(Mock(), Mock(), Mock())
+        self.service_monitor.list_units.assert_called_once()
+        # Only the PID is not part of the listing
+        self.assertEqual([call[0][1] for call in Interface.Get.call_args_list],
+                         ["ExecMainPID"])
+        self.assertIs(self.service_monitor.services[
+                          "spam.service"]._unit_state, EnabledState)
+        self.service_monitor_run_iteration()
+        self.assert_failed_fault_is_raised()
+
     def test_no_alert_for_disabled_service(self):
         self.mocked_properties_value["UnitFileState"] = "disabled"
         self.mocked_properties_value["ActiveState"] = "failed"